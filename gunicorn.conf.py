@@ -0,0 +1,25 @@
+"""Settings of `make serve`, from the `server` section of config.yml"""
+
+import os
+from typing import Any
+
+from standup_report.exceptions import SettingsError
+from standup_report.processes import WORKERS_ENV_VAR
+from standup_report.settings import ServerSettings
+from standup_report.settings import get_settings
+
+try:
+    _server_settings = get_settings().SERVER
+except SettingsError:
+    # The workers still start, their home page shows what is missing
+    _server_settings = ServerSettings.default()
+
+bind = _server_settings.BIND
+workers = _server_settings.WORKERS
+threads = _server_settings.THREADS
+worker_class = "gthread"
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    # Before the worker loads the app, also with `--workers` given on the command line
+    os.environ[WORKERS_ENV_VAR] = str(server.cfg.workers)
@@ -1,16 +1,34 @@
+import atexit
 import logging
 
 from flask import Flask
 from flask import render_template
+from flask.helpers import get_debug_flag
 from werkzeug.exceptions import HTTPException
+from werkzeug.serving import is_running_from_reloader
 
+from standup_report.duckdb_client import close_database
+from standup_report.duckdb_client import close_local_store
+from standup_report.duckdb_client import open_database
+from standup_report.duckdb_client import stop_note_writer
+from standup_report.exceptions import SettingsError
 from standup_report.exceptions import StandupReportError
+from standup_report.executor import shutdown_executor
+from standup_report.executor import submit
+from standup_report.google.auth import get_credentials
+from standup_report.prefetch import get_prefetch_scheduler
+from standup_report.processes import hold_file_lock
+from standup_report.processes import is_multi_process
+from standup_report.remote.sessions import close_sessions
+from standup_report.remote.sessions import warm_up_session
+from standup_report.routes.changes_api import changes_api
 from standup_report.routes.db import db
 from standup_report.routes.google_auth import google_auth_bp
 from standup_report.routes.home import home_bp
 from standup_report.routes.ignore_api import ignore_api
 from standup_report.routes.notes_api import notes_api
 from standup_report.routes.report import report_bp
+from standup_report.settings import get_settings
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(
@@ -18,16 +36,33 @@ logging.basicConfig(
     format="%(levelname)s %(asctime)s %(message)s",
 )
 
+# With several workers, the one holding this lock prefetches for all of them
+_PREFETCH_LOCK_FILE = "standup_report.prefetch.lock"
+
 
 def create_app() -> Flask:
     """Application factory pattern"""
     app = Flask(__name__)
 
+    # Registered first, so it runs last: after the pools and the prefetch stopped writing
+    atexit.register(close_database)
+    atexit.register(close_local_store)
+    atexit.register(stop_note_writer)
+    atexit.register(shutdown_executor)
+    atexit.register(close_sessions)
+    if _is_serving_process():
+        # Creates the tables now, rather than in the first request
+        open_database()
+        _prewarm_connections()
+        _load_google_credentials()
+        _start_prefetch()
+
     app.register_blueprint(home_bp)
     app.register_blueprint(db)
     app.register_blueprint(report_bp)
     app.register_blueprint(ignore_api)
     app.register_blueprint(notes_api)
+    app.register_blueprint(changes_api)
     app.register_blueprint(google_auth_bp)
 
     @app.errorhandler(StandupReportError)
@@ -139,5 +174,49 @@ def create_app() -> Flask:
     return app
 
 
+def _is_serving_process() -> bool:
+    # With the debug reloader the app is created in the watcher process too, only the child serves
+    return not get_debug_flag() or is_running_from_reloader()
+
+
+def _prewarm_connections() -> None:
+    try:
+        providers = get_settings().REMOTE.PREWARM
+    except SettingsError as exc:
+        logger.warning(f"Not warming up connections, the settings are invalid: {exc}")
+        return
+    for provider in providers:
+        submit(warm_up_session, provider)
+
+
+def _load_google_credentials() -> None:
+    # An expired token is then refreshed now, rather than in the first report
+    try:
+        if not get_settings().GOOGLE.is_setup:
+            return
+    except SettingsError:
+        return
+    submit(get_credentials)
+
+
+def _start_prefetch() -> None:
+    try:
+        prefetch_settings = get_settings().PREFETCH
+    except SettingsError as exc:
+        logger.warning(f"Not prefetching, the settings are invalid: {exc}")
+        return
+    if not prefetch_settings.ENABLED or not prefetch_settings.has_triggers:
+        return
+    # Only the history is shared: the other workers' caches stay cold, but they read what
+    # this one fetched from DuckDB, and fetch only what changed since
+    if is_multi_process() and not hold_file_lock(_PREFETCH_LOCK_FILE):
+        logger.info("Another worker prefetches")
+        return
+
+    scheduler = get_prefetch_scheduler()
+    scheduler.start()
+    atexit.register(scheduler.stop)
+
+
 # For direct execution
 app = create_app()
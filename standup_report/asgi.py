@@ -0,0 +1,168 @@
+"""The app for ASGI servers, e.g. `uvicorn standup_report.asgi:app` (see `make serve-async`).
+
+`/` and `/report` are served by async views: a report waits for its sources on the
+event loop, so one worker builds many reports at once without a thread for each.
+The sources themselves are still fetched with `requests`, on the shared executor,
+through the same cache and history as the Flask app. Only the home page's checks
+use the async HTTP/2 client. Every other page is served by the Flask app, on the
+threads of the ASGI adapter.
+"""
+
+import io
+import sys
+from collections.abc import AsyncIterator
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+from flask import Response
+from flask import request
+
+from standup_report.app import app as flask_app
+from standup_report.exceptions import StandupReportError
+from standup_report.routes.home import index_async
+from standup_report.routes.report import build_report_async
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+
+    from standup_report.remote.async_sessions import close_async_clients
+except ImportError as exc:
+    raise StandupReportError(
+        "The ASGI app needs the `async` extra, install it with `uv sync --extra async`"
+    ) from exc
+
+type Scope = dict[str, Any]
+type Message = dict[str, Any]
+type Receive = Callable[[], Awaitable[Message]]
+type Send = Callable[[Message], Awaitable[None]]
+type AsyncView = Callable[..., AsyncIterator[str]]  # view args -> chunks of the page
+
+
+def _one_chunk(view: Callable[..., Awaitable[str]]) -> AsyncView:
+    async def chunks(**view_args: Any) -> AsyncIterator[str]:
+        yield await view(**view_args)
+
+    return chunks
+
+
+# Flask endpoint -> its async view, both are routed by the Flask app's URL map
+_ASYNC_VIEWS: dict[str, AsyncView] = {
+    "home.index": _one_chunk(index_async),
+    "report.build_report": build_report_async,
+}
+
+_wsgi_app = WsgiToAsgi(flask_app)  # type: ignore[no-untyped-call]
+
+
+async def app(scope: Scope, receive: Receive, send: Send) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if (
+        scope["type"] == "http"
+        and scope["method"] == "GET"
+        and await _serve_async(scope, send)
+    ):
+        return
+    await _wsgi_app(scope, receive, send)
+
+
+async def _serve_async(scope: Scope, send: Send) -> bool:
+    """Serve the request with its async view, False if it has none."""
+    with flask_app.request_context(_wsgi_environ(scope)):
+        view = _ASYNC_VIEWS.get(request.url_rule.endpoint) if request.url_rule else None
+        if view is None:
+            return False
+        chunks = view(**(request.view_args or {}))
+        try:
+            first_chunk = await anext(chunks, "")
+        except Exception as exc:  # noqa: BLE001
+            # Nothing was sent yet: the Flask app's handlers log it and render the error page
+            await _send_response(send, _error_response(exc))
+            return True
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/html; charset=utf-8")],
+            }
+        )
+        await _send_chunk(send, first_chunk)
+        async for chunk in chunks:
+            await _send_chunk(send, chunk)
+        await send({"type": "http.response.body", "body": b""})
+    return True
+
+
+def _wsgi_environ(scope: Scope) -> dict[str, Any]:
+    """The WSGI environ of an ASGI request without a body, as the Flask app would get it."""
+    root_path: str = scope.get("root_path", "")
+    path: str = scope["path"]
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": root_path.encode().decode("latin-1"),
+        "PATH_INFO": path.removeprefix(root_path).encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if client := scope.get("client"):
+        environ["REMOTE_ADDR"] = client[0]
+    for raw_name, raw_value in scope["headers"]:
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        if name not in {"CONTENT_TYPE", "CONTENT_LENGTH"}:
+            name = f"HTTP_{name}"
+        value = raw_value.decode("latin-1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+def _error_response(exc: Exception) -> Response:
+    """The error page of `exc`, rendered by the Flask app's error handlers."""
+    try:
+        return flask_app.make_response(flask_app.handle_user_exception(exc))
+    except Exception as unhandled:  # noqa: BLE001
+        # Not one of ours, Flask logs it and renders the 500 page
+        return flask_app.handle_exception(unhandled)
+
+
+async def _send_response(send: Send, response: Response) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in response.headers.items()
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": response.get_data()})
+
+
+async def _send_chunk(send: Send, chunk: str) -> None:
+    await send(
+        {"type": "http.response.body", "body": chunk.encode(), "more_body": True}
+    )
+
+
+async def _lifespan(receive: Receive, send: Send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            # The rest is closed at exit, as with every other server of the Flask app
+            await close_async_clients()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
@@ -1,3 +1,4 @@
+import sys
 from dataclasses import dataclass
 from dataclasses import field
 from datetime import datetime
@@ -8,13 +9,18 @@ from standup_report.ignore_mixin import ItemType
 from standup_report.note_utils import NoteMixin
 
 
-@dataclass
+@dataclass(slots=True)
 class Calendar:
     title: str
     remote_id: str
 
+    def __post_init__(self) -> None:
+        # Every meeting of a calendar loaded from the history has its own Calendar
+        self.title = sys.intern(self.title)
+        self.remote_id = sys.intern(self.remote_id)
 
-@dataclass
+
+@dataclass(slots=True)
 class Meeting(IgnoreMixin, NoteMixin):
     title: str
     calendar: Calendar
@@ -23,6 +29,11 @@ class Meeting(IgnoreMixin, NoteMixin):
     start_time: datetime
     attendees: list[str] = field(default_factory=list)
 
+    def __post_init__(self) -> None:
+        # Recurring meetings repeat their titles, and the same people attend them
+        self.title = sys.intern(self.title)
+        self.attendees = [sys.intern(email) for email in self.attendees]
+
     ignore_item_type: ClassVar[ItemType] = ItemType.MEETING
 
     @property
@@ -32,3 +43,15 @@ class Meeting(IgnoreMixin, NoteMixin):
     @property
     def ignore_item_title(self) -> str:
         return self.title
+
+
+@dataclass(slots=True)
+class CalendarDelta:
+    """What changed in a calendar since its last sync."""
+
+    calendar: Calendar
+    meetings: list[Meeting]  # new or changed
+    removed_ids: list[str]  # cancelled meetings, or meetings that are now ignored
+    sync_token: str | None  # for the next sync, None if there should be a full one
+    # Set for a full sync: everything of the calendar from then on is replaced
+    full_since: datetime | None = None
@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from datetime import datetime
+from datetime import timedelta
+
+from standup_report.exceptions import SettingsError
+
+# (name, lowest, highest) of the 5 cron fields
+_FIELDS = [
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day of month", 1, 31),
+    ("month", 1, 12),
+    ("day of week", 0, 7),  # 0 and 7 are both Sunday
+]
+# How far ahead to look for the next run, a schedule like "0 0 29 2 *" can be years away
+_MAX_DAYS_AHEAD = 4 * 366
+
+
+@dataclass(frozen=True)
+class CronSchedule:
+    """A standard 5-field cron expression: `*`, `*/n`, `a-b`, `a-b/n` and lists of those."""
+
+    expression: str
+    minutes: frozenset[int]
+    hours: frozenset[int]
+    days: frozenset[int]
+    months: frozenset[int]
+    weekdays: frozenset[int]  # 0 is Monday, like datetime.weekday()
+    # Like cron: if both days and weekdays are restricted, either one has to match
+    days_restricted: bool
+    weekdays_restricted: bool
+
+    @classmethod
+    def parse(cls, expression: str) -> "CronSchedule":
+        parts = expression.split()
+        if len(parts) != len(_FIELDS):
+            raise SettingsError(
+                f"Cron expression `{expression}` should have {len(_FIELDS)} fields"
+            )
+
+        values = [
+            _parse_field(part, name, lowest, highest, expression)
+            for part, (name, lowest, highest) in zip(parts, _FIELDS, strict=True)
+        ]
+        return cls(
+            expression=expression,
+            minutes=values[0],
+            hours=values[1],
+            days=values[2],
+            months=values[3],
+            weekdays=frozenset((day + 6) % 7 for day in values[4]),
+            days_restricted=parts[2] != "*",
+            weekdays_restricted=parts[4] != "*",
+        )
+
+    def next_after(self, after: datetime) -> datetime:
+        """The first matching minute after `after`, in the timezone of `after`."""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        for days_ahead in range(_MAX_DAYS_AHEAD):
+            day = (start + timedelta(days=days_ahead)).date()
+            if not self._matches_day(day.month, day.day, day.weekday()):
+                continue
+            for hour in sorted(self.hours):
+                for minute in sorted(self.minutes):
+                    candidate = start.replace(
+                        year=day.year,
+                        month=day.month,
+                        day=day.day,
+                        hour=hour,
+                        minute=minute,
+                    )
+                    if candidate >= start:
+                        return candidate
+        raise SettingsError(f"Cron expression `{self.expression}` never runs")
+
+    def _matches_day(self, month: int, day: int, weekday: int) -> bool:
+        if month not in self.months:
+            return False
+        if self.days_restricted and self.weekdays_restricted:
+            return day in self.days or weekday in self.weekdays
+        return day in self.days and weekday in self.weekdays
+
+
+def _parse_field(
+    part: str, name: str, lowest: int, highest: int, expression: str
+) -> frozenset[int]:
+    values: set[int] = set()
+    for item in part.split(","):
+        range_part, _, step_part = item.partition("/")
+        try:
+            step = int(step_part) if step_part else 1
+            if range_part == "*":
+                start, end = lowest, highest
+            elif "-" in range_part:
+                start_str, end_str = range_part.split("-", 1)
+                start, end = int(start_str), int(end_str)
+            else:
+                start = int(range_part)
+                end = highest if step_part else start
+        except ValueError:
+            raise SettingsError(
+                f"Invalid {name} `{item}` in cron expression `{expression}`"
+            ) from None
+
+        if step < 1 or not lowest <= start <= end <= highest:
+            raise SettingsError(
+                f"Invalid {name} `{item}` in cron expression `{expression}`"
+            )
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
@@ -4,16 +4,14 @@ from datetime import timedelta
 
 
 def parse_str_to_date(date_str: str) -> datetime:
-    if date_str.endswith("Z"):
-        date_str = date_str.replace("Z", "+00:00")
+    # Since Python 3.11 fromisoformat reads the `...Z` of the APIs' UTC timestamps itself,
+    # in C, about twice as fast as replacing the Z with +00:00 first
     return datetime.fromisoformat(date_str)
 
 
 def parse_optional_str_to_date(date_str: str | None) -> datetime | None:
     if not date_str:
         return None
-    if date_str.endswith("Z"):
-        date_str = date_str.replace("Z", "+00:00")
     return datetime.fromisoformat(date_str)
 
 
@@ -21,6 +19,10 @@ def parse_datetime_to_str(dt: datetime) -> str:
     return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+def round_down_to_minute(dt: datetime) -> datetime:
+    return dt.replace(second=0, microsecond=0)
+
+
 ONE_MIN = timedelta(seconds=60)
 ONE_HOUR = timedelta(hours=1)
 ONE_DAY = timedelta(days=1)
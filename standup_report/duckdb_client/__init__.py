@@ -1,22 +1,70 @@
 # Public API for DuckDB client
-from .client import health_check as duckdb_health_check
-from .client import recreate_tables
+from .changes import ChangeAction
+from .changes import LocalChange
+from .client import close_database
+from .client import open_database
+from .history import compact_pr_history
+from .history import delete_history_before
+from .history import forget_calendars_except
+from .history import get_calendar_list
+from .history import get_calendar_sync_tokens
+from .history import get_issue_activities_between
+from .history import get_meetings_between
+from .history import get_prs_between
+from .history import get_sync_state
+from .history import save_calendar_deltas
+from .history import save_calendar_list
+from .history import save_issue_activities
+from .history import save_meetings
+from .history import save_prs
+from .history import set_sync_state
 from .ignoring import add_ignored_item
 from .ignoring import get_ignored_items
 from .ignoring import remove_ignored_item
+from .local_store import apply_local_changes
+from .local_store import close_local_store
+from .local_store import get_local_store
+from .local_store import health_checks as storage_health_checks
+from .local_store import recreate_tables
+from .note_writer import get_note_writer
+from .note_writer import stop_note_writer
 from .notes import add_note
 from .notes import delete_all_notes
 from .notes import get_notes
 from .notes import remove_note
 
 __all__ = [
+    "ChangeAction",
+    "LocalChange",
     "add_ignored_item",
     "add_note",
+    "apply_local_changes",
+    "close_database",
+    "close_local_store",
+    "compact_pr_history",
     "delete_all_notes",
-    "duckdb_health_check",
+    "delete_history_before",
+    "forget_calendars_except",
+    "get_calendar_list",
+    "get_calendar_sync_tokens",
     "get_ignored_items",
+    "get_issue_activities_between",
+    "get_local_store",
+    "get_meetings_between",
+    "get_note_writer",
     "get_notes",
+    "get_prs_between",
+    "get_sync_state",
+    "open_database",
     "recreate_tables",
     "remove_ignored_item",
     "remove_note",
+    "save_calendar_deltas",
+    "save_calendar_list",
+    "save_issue_activities",
+    "save_meetings",
+    "save_prs",
+    "set_sync_state",
+    "stop_note_writer",
+    "storage_health_checks",
 ]
@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+from standup_report.enum_utils import SafeStrEnum
+from standup_report.ignore_mixin import ItemType
+from standup_report.note_utils import NoteCategory
+
+
+class ChangeAction(SafeStrEnum):
+    IGNORE = "ignore"
+    UNIGNORE = "unignore"
+    NOTE = "note"  # an empty note removes it
+
+
+@dataclass(frozen=True)
+class LocalChange:
+    """One edit of the ignored items or notes, as the report page makes them."""
+
+    action: ChangeAction
+    item_type: ItemType
+    item_id: str
+    item_title: str = ""  # of IGNORE
+    category: NoteCategory | None = None  # of NOTE
+    note: str = ""  # of NOTE
+
+    @property
+    def clean_note(self) -> str:
+        return self.note.strip()
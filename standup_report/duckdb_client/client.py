@@ -2,76 +2,208 @@ import logging
 import os
 from collections.abc import Iterator
 from contextlib import contextmanager
+from contextlib import nullcontext
 from dataclasses import dataclass
 from dataclasses import field
+from threading import Lock
+from threading import local
 
 import duckdb
 
+from standup_report.processes import file_lock
+from standup_report.processes import is_multi_process
+
 logger = logging.getLogger(__name__)
 
 # Use a file-based DuckDB for persistence
 DB_FILE_PATH = "standup_report.duckdb"
+# Only one process at a time can open the file, the workers take turns with this lock
+LOCK_FILE_PATH = f"{DB_FILE_PATH}.lock"
+
+# The one connection of the process, every thread queries it through a cursor of its own
+_database: duckdb.DuckDBPyConnection | None = None
+# Bumped whenever the database is closed, cursors of an older generation are closed with it
+_generation = 0
+_database_lock = Lock()
+# Readers don't block each other, but two writers of the same rows would conflict
+_write_lock = Lock()
+_local = local()
+
+
+def open_database() -> None:
+    """Create the tables, and in a single process keep the connection open for all threads."""
+    if is_multi_process():
+        with _shared_connection() as conn:
+            _create_tables(conn)
+        return
+    if _database is not None:
+        return
+    with _database_lock:
+        _open_database()
+
+
+def _open_database() -> duckdb.DuckDBPyConnection:
+    global _database  # noqa: PLW0603
+    if _database is None:
+        database = duckdb.connect(database=DB_FILE_PATH)
+        _create_tables(database)
+        _database = database
+        logger.info(f"Opened DuckDB database {DB_FILE_PATH}")
+    return _database
+
+
+def close_database() -> None:
+    """Close the connection, and with it the cursors of all threads."""
+    with _write_lock, _database_lock:
+        _close_database()
+
+
+def _close_database() -> None:
+    global _database, _generation  # noqa: PLW0603
+    if _database is None:
+        return
+    _database.close()
+    _database = None
+    _generation += 1
+    logger.info(f"Closed DuckDB database {DB_FILE_PATH}")
+
 
+@contextmanager
+def get_connection(*, write: bool = False) -> Iterator[duckdb.DuckDBPyConnection]:
+    """The cursor of the current thread, it stays open for the thread's next query.
 
-def get_connection_obj() -> duckdb.DuckDBPyConnection:
-    return duckdb.connect(database=DB_FILE_PATH)
+    With several worker processes it's a connection of its own, closed after the query.
+    """
+    if is_multi_process():
+        with _shared_connection() as conn:
+            yield conn
+        return
+    with _write_lock if write else nullcontext():
+        yield _get_cursor()
 
 
 @contextmanager
-def get_connection() -> Iterator[duckdb.DuckDBPyConnection]:
-    conn = get_connection_obj()
-    try:
-        yield conn
-    finally:
-        conn.close()
+def _shared_connection() -> Iterator[duckdb.DuckDBPyConnection]:
+    # DuckDB locks the file for the process that opens it, the others would fail to
+    with file_lock(LOCK_FILE_PATH):
+        conn = duckdb.connect(database=DB_FILE_PATH)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
 
+def _get_cursor() -> duckdb.DuckDBPyConnection:
+    cursor: duckdb.DuckDBPyConnection | None = getattr(_local, "cursor", None)
+    if cursor is None or _local.generation != _generation:
+        with _database_lock:
+            cursor = _open_database().cursor()
+            _local.cursor = cursor
+            _local.generation = _generation
+    return cursor
 
-# Table definitions
+
+# Table definitions, the ignored items and notes are in the local store's tables
 TABLE_SCHEMAS = {
-    "ignored_items": """
-        CREATE TABLE IF NOT EXISTS ignored_items (
-            item_type VARCHAR NOT NULL,
-            item_id VARCHAR NOT NULL,
-            item_title VARCHAR NOT NULL,
-            ignored_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
-            PRIMARY KEY (item_type, item_id)
+    # Local history of everything fetched from GitHub, Linear and Google
+    "pr_history": """
+        CREATE TABLE IF NOT EXISTS pr_history (
+            uid VARCHAR NOT NULL,
+            number INTEGER NOT NULL,
+            repo_slug VARCHAR NOT NULL,
+            title VARCHAR NOT NULL,
+            url VARCHAR NOT NULL,
+            created_at TIMESTAMP NOT NULL,
+            merged_at TIMESTAMP,
+            state VARCHAR NOT NULL,
+            last_change TIMESTAMP NOT NULL,
+            review_decision VARCHAR,
+            PRIMARY KEY (uid, last_change)
+        )
+    """,
+    "issue_activity_history": """
+        CREATE TABLE IF NOT EXISTS issue_activity_history (
+            ident VARCHAR NOT NULL,
+            activity_type VARCHAR NOT NULL,
+            activity_at TIMESTAMP NOT NULL,
+            title VARCHAR NOT NULL,
+            url VARCHAR NOT NULL,
+            state VARCHAR,
+            pr_attachments JSON NOT NULL,
+            PRIMARY KEY (ident, activity_type, activity_at)
+        )
+    """,
+    "meeting_history": """
+        CREATE TABLE IF NOT EXISTS meeting_history (
+            remote_id VARCHAR NOT NULL,
+            start_time TIMESTAMP NOT NULL,
+            title VARCHAR NOT NULL,
+            url VARCHAR NOT NULL,
+            calendar_id VARCHAR NOT NULL,
+            calendar_title VARCHAR NOT NULL,
+            attendees JSON NOT NULL,
+            -- A shared meeting is in each of the calendars it's on
+            PRIMARY KEY (calendar_id, remote_id, start_time)
         )
     """,
-    "notes": """
-        CREATE TABLE IF NOT EXISTS notes (
-            item_type VARCHAR NOT NULL,
-            item_id VARCHAR NOT NULL,
-            category VARCHAR NOT NULL,
-            note TEXT,
-            PRIMARY KEY (item_type, item_id, category)
+    # Google Calendar incremental sync, the meetings themselves are in meeting_history
+    "google_calendar_list": """
+        CREATE TABLE IF NOT EXISTS google_calendar_list (
+            id INTEGER PRIMARY KEY,  -- there is only one list, its id is always 1
+            etag VARCHAR NOT NULL,
+            calendars JSON NOT NULL,
+            fetched_at TIMESTAMP NOT NULL
+        )
+    """,
+    "google_calendar_sync": """
+        CREATE TABLE IF NOT EXISTS google_calendar_sync (
+            calendar_id VARCHAR PRIMARY KEY,
+            sync_token VARCHAR NOT NULL,
+            synced_at TIMESTAMP NOT NULL
+        )
+    """,
+    "sync_state": """
+        CREATE TABLE IF NOT EXISTS sync_state (
+            source VARCHAR PRIMARY KEY,
+            covered_from TIMESTAMP NOT NULL,
+            high_water_mark TIMESTAMP NOT NULL
         )
     """,
 }
 
 
-def create_tables() -> None:
+def _create_tables(conn: duckdb.DuckDBPyConnection) -> None:
     """Create all required DuckDB tables."""
-    with get_connection() as conn:
-
-        for table_name, schema in TABLE_SCHEMAS.items():
-            conn.execute(schema)
-            logger.debug(f"Created/verified table: {table_name}")
+    for table_name, schema in TABLE_SCHEMAS.items():
+        conn.execute(schema)
+        logger.debug(f"Created/verified table: {table_name}")
 
-        logger.info("All DuckDB tables created/verified")
+    logger.info("All DuckDB tables created/verified")
 
 
 def recreate_tables() -> None:
     """Drop the database file and recreate all tables."""
+    if is_multi_process():
+        with file_lock(LOCK_FILE_PATH):
+            _remove_database_files()
+            conn = duckdb.connect(database=DB_FILE_PATH)
+            try:
+                _create_tables(conn)
+            finally:
+                conn.close()
+        return
 
-    # Close any existing connections by creating a temporary one and closing it
-    with get_connection():
-        pass
+    with _write_lock, _database_lock:
+        _close_database()
+        _remove_database_files()
+        _open_database()
 
-    if os.path.exists(DB_FILE_PATH):
-        os.remove(DB_FILE_PATH)
-        logger.debug(f"Deleted database file: {DB_FILE_PATH}")
 
-    create_tables()
+def _remove_database_files() -> None:
+    for path in [DB_FILE_PATH, f"{DB_FILE_PATH}.wal"]:
+        if os.path.exists(path):
+            os.remove(path)
+            logger.debug(f"Deleted database file: {path}")
 
 
 @dataclass
@@ -80,22 +212,20 @@ class HealthState:
     tables: list[str] = field(default_factory=list)
     row_counts: dict[str, int] = field(default_factory=dict)
     error_msg: str = field(default="")
-
-    @property
-    def database_file(self) -> str:
-        return DB_FILE_PATH
+    backend: str = field(default="DuckDB")
+    database_file: str = field(default=DB_FILE_PATH)
+    # Backend specific, e.g. SQLite's journal mode
+    details: dict[str, str] = field(default_factory=dict)
 
 
 def health_check() -> HealthState:
     """Check DuckDB connection and basic functionality."""
-    with get_connection() as conn:
-        try:
+    try:
+        with get_connection() as conn:
             # Test basic query
             result = conn.execute("SELECT 1 as test").fetchone()
             test_passed = result is not None and result[0] == 1
 
-            create_tables()
-
             tables = conn.execute(
                 "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
             ).fetchall()
@@ -103,19 +233,19 @@ def health_check() -> HealthState:
             table_names: list[str] = [table[0] for table in tables]
 
             row_counts: dict[str, int] = {}
-            for table_name in ["ignored_items", "notes"]:
-                if table_name in table_names:
-                    count_result = conn.execute(
-                        f"SELECT COUNT(*) FROM {table_name}"
-                    ).fetchone()
-                    if count_result:
-                        row_counts[table_name] = count_result[0]
-
-            return HealthState(
-                status="healthy" if test_passed else "error",
-                tables=table_names,
-                row_counts=row_counts,
-            )
-
-        except Exception as e:
-            return HealthState(status="error", error_msg=str(e))
+            # Also the local store's tables, when it's DuckDB too
+            for table_name in table_names:
+                count_result = conn.execute(
+                    f"SELECT COUNT(*) FROM {table_name}"
+                ).fetchone()
+                if count_result:
+                    row_counts[table_name] = count_result[0]
+
+        return HealthState(
+            status="healthy" if test_passed else "error",
+            tables=table_names,
+            row_counts=row_counts,
+        )
+
+    except Exception as e:
+        return HealthState(status="error", error_msg=str(e))
@@ -0,0 +1,29 @@
+from contextlib import AbstractContextManager
+
+from standup_report.settings import StorageBackend
+
+from .client import DB_FILE_PATH
+from .client import HealthState
+from .client import get_connection
+from .client import health_check
+from .storage import Connection
+from .storage import LocalStore
+
+
+class DuckDBStore(LocalStore):
+    """The ignored items and notes next to the history, in the one DuckDB database."""
+
+    backend = StorageBackend.DUCKDB
+
+    def __init__(self) -> None:
+        super().__init__(DB_FILE_PATH)
+
+    def connection(self, *, write: bool = False) -> AbstractContextManager[Connection]:
+        return get_connection(write=write)
+
+    def health_check(self) -> HealthState:
+        return health_check()
+
+    def close(self) -> None:
+        # The connection is shared with the history, see `close_database`
+        pass
@@ -0,0 +1,415 @@
+import json
+import logging
+from collections.abc import Iterable
+from datetime import UTC
+from datetime import datetime
+from operator import attrgetter
+
+from standup_report.calendar_type import Calendar
+from standup_report.calendar_type import CalendarDelta
+from standup_report.calendar_type import Meeting
+from standup_report.issue_type import ActivityType
+from standup_report.issue_type import IssueActivity
+from standup_report.issue_type import IssueAttachment
+from standup_report.issue_type import LinearState
+from standup_report.issue_type import most_important_per_issue
+from standup_report.pr_type import PR
+from standup_report.pr_type import PRReviewDecision
+from standup_report.pr_type import PRState
+
+from .client import get_connection
+
+logger = logging.getLogger(__name__)
+
+# Timestamps are stored as naive UTC, DuckDB's TIMESTAMPTZ needs pytz to be read back.
+
+
+def _to_db(dt: datetime) -> datetime:
+    return dt.astimezone(UTC).replace(tzinfo=None)
+
+
+def _from_db(dt: datetime) -> datetime:
+    return dt.replace(tzinfo=UTC)
+
+
+def _optional_from_db(dt: datetime | None) -> datetime | None:
+    return _from_db(dt) if dt else None
+
+
+# --- Sync state
+
+
+def get_sync_state(source: str) -> tuple[datetime, datetime] | None:
+    """(covered_from, high_water_mark) of a source: the history is complete in between."""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT covered_from, high_water_mark FROM sync_state WHERE source = ?",
+            [source],
+        ).fetchone()
+    if row is None:
+        return None
+    return _from_db(row[0]), _from_db(row[1])
+
+
+def set_sync_state(
+    source: str, covered_from: datetime, high_water_mark: datetime
+) -> None:
+    with get_connection(write=True) as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO sync_state (source, covered_from, high_water_mark)
+            VALUES (?, ?, ?)
+            """,
+            [source, _to_db(covered_from), _to_db(high_water_mark)],
+        )
+
+
+# --- PRs
+
+
+def save_prs(prs: Iterable[PR]) -> int:
+    """Store a version of every PR, one row per PR and last_change."""
+    rows = [
+        [
+            pr.uid,
+            pr.number,
+            pr.repo_slug,
+            pr.title,
+            pr.url,
+            _to_db(pr.created_at),
+            _to_db(pr.merged_at) if pr.merged_at else None,
+            pr.state.value,
+            _to_db(pr.last_change),
+            pr.review_decision.value if pr.review_decision else None,
+        ]
+        for pr in prs
+    ]
+    if not rows:
+        return 0
+    with get_connection(write=True) as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO pr_history (
+                uid, number, repo_slug, title, url, created_at, merged_at,
+                state, last_change, review_decision
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return len(rows)
+
+
+def get_prs_between(start: datetime, end: datetime) -> list[PR]:
+    """Every PR that changed in the range, as it was at its last change in the range."""
+    with get_connection() as conn:
+        result = conn.execute(
+            """
+            SELECT number, repo_slug, title, url, created_at, merged_at,
+                   state, last_change, review_decision
+            FROM pr_history
+            WHERE last_change > ? AND last_change <= ?
+            QUALIFY row_number() OVER (PARTITION BY uid ORDER BY last_change DESC) = 1
+            ORDER BY last_change DESC
+            """,
+            [_to_db(start), _to_db(end)],
+        ).fetchall()
+    return [
+        PR(
+            number=row[0],
+            repo_slug=row[1],
+            title=row[2],
+            url=row[3],
+            created_at=_from_db(row[4]),
+            merged_at=_optional_from_db(row[5]),
+            state=PRState(row[6]),
+            last_change=_from_db(row[7]),
+            review_decision=PRReviewDecision.from_string(row[8]),
+        )
+        for row in result
+    ]
+
+
+# --- Linear issue activity
+
+
+def save_issue_activities(activities: Iterable[IssueActivity]) -> int:
+    rows = [
+        [
+            activity.ident,
+            activity.activity_type.name,
+            _to_db(activity.activity_at),
+            activity.title,
+            activity.url,
+            activity.state.name if activity.state else None,
+            json.dumps(
+                [
+                    {
+                        "url": a.url,
+                        "title": a.title,
+                        "last_updated": a.last_updated.isoformat(),
+                    }
+                    for a in activity.pr_attachments
+                ]
+            ),
+        ]
+        for activity in activities
+    ]
+    if not rows:
+        return 0
+    with get_connection(write=True) as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO issue_activity_history (
+                ident, activity_type, activity_at, title, url, state, pr_attachments
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows,
+        )
+    return len(rows)
+
+
+def get_issue_activities_between(start: datetime, end: datetime) -> list[IssueActivity]:
+    """The most important activity on every issue in the range, like Linear's fetcher returns it."""
+    with get_connection() as conn:
+        result = conn.execute(
+            """
+            SELECT ident, activity_type, activity_at, title, url, state, pr_attachments
+            FROM issue_activity_history
+            WHERE activity_at > ? AND activity_at <= ?
+            """,
+            [_to_db(start), _to_db(end)],
+        ).fetchall()
+
+    activities = [
+        IssueActivity(
+            ident=row[0],
+            activity_type=ActivityType[row[1]],
+            activity_at=_from_db(row[2]),
+            title=row[3],
+            url=row[4],
+            state=LinearState.from_string(row[5]),
+            pr_attachments=[
+                IssueAttachment(
+                    url=a["url"],
+                    title=a["title"],
+                    last_updated=datetime.fromisoformat(a["last_updated"]),
+                )
+                for a in json.loads(row[6])
+            ],
+        )
+        for row in result
+    ]
+    # Every activity is kept, a report shows the most important one per issue
+    sorted_by_title = sorted(
+        most_important_per_issue(activities), key=attrgetter("title")
+    )
+    return sorted(sorted_by_title, key=attrgetter("activity_type"), reverse=True)
+
+
+# --- Meetings
+
+
+def save_meetings(meetings: Iterable[Meeting]) -> int:
+    rows = [_meeting_row(meeting) for meeting in meetings]
+    if not rows:
+        return 0
+    with get_connection(write=True) as conn:
+        conn.executemany(_INSERT_MEETING, rows)
+    return len(rows)
+
+
+_INSERT_MEETING = """
+    INSERT OR REPLACE INTO meeting_history (
+        remote_id, start_time, title, url, calendar_id, calendar_title, attendees
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _meeting_row(meeting: Meeting) -> list:
+    return [
+        meeting.remote_id,
+        _to_db(meeting.start_time),
+        meeting.title,
+        meeting.url,
+        meeting.calendar.remote_id,
+        meeting.calendar.title,
+        json.dumps(meeting.attendees),
+    ]
+
+
+def get_meetings_between(start: datetime, end: datetime) -> list[Meeting]:
+    with get_connection() as conn:
+        result = conn.execute(
+            """
+            SELECT remote_id, start_time, title, url, calendar_id, calendar_title, attendees
+            FROM meeting_history
+            WHERE start_time >= ? AND start_time <= ?
+            ORDER BY start_time
+            """,
+            [_to_db(start), _to_db(end)],
+        ).fetchall()
+    return [
+        Meeting(
+            remote_id=row[0],
+            start_time=_from_db(row[1]),
+            title=row[2],
+            url=row[3],
+            calendar=Calendar(remote_id=row[4], title=row[5]),
+            attendees=json.loads(row[6]),
+        )
+        for row in result
+    ]
+
+
+# --- Google Calendar sync
+
+
+def get_calendar_list() -> tuple[str, list[Calendar]] | None:
+    """(etag, calendars) of the last calendar list Google sent, ignored calendars included."""
+    with get_connection() as conn:
+        row = conn.execute(
+            "SELECT etag, calendars FROM google_calendar_list WHERE id = 1"
+        ).fetchone()
+    if row is None:
+        return None
+    return row[0], [Calendar(**raw_cal) for raw_cal in json.loads(row[1])]
+
+
+def save_calendar_list(etag: str, calendars: list[Calendar]) -> None:
+    with get_connection(write=True) as conn:
+        conn.execute(
+            """
+            INSERT OR REPLACE INTO google_calendar_list (id, etag, calendars, fetched_at)
+            VALUES (1, ?, ?, ?)
+            """,
+            [
+                etag,
+                json.dumps(
+                    [
+                        {"title": cal.title, "remote_id": cal.remote_id}
+                        for cal in calendars
+                    ]
+                ),
+                _to_db(datetime.now(UTC)),
+            ],
+        )
+
+
+def get_calendar_sync_tokens() -> dict[str, str]:
+    """calendar id -> the sync token of its next incremental sync"""
+    with get_connection() as conn:
+        result = conn.execute(
+            "SELECT calendar_id, sync_token FROM google_calendar_sync"
+        ).fetchall()
+    return {row[0]: row[1] for row in result}
+
+
+def save_calendar_deltas(deltas: Iterable[CalendarDelta]) -> int:
+    """Apply synced changes to the meeting history, with the sync tokens, in one transaction."""
+    saved = 0
+    now = _to_db(datetime.now(UTC))
+    with get_connection(write=True) as conn:
+        conn.begin()
+        try:
+            for delta in deltas:
+                calendar_id = delta.calendar.remote_id
+                if delta.full_since is not None:
+                    conn.execute(
+                        "DELETE FROM meeting_history WHERE calendar_id = ? AND start_time >= ?",
+                        [calendar_id, _to_db(delta.full_since)],
+                    )
+                # A changed meeting may have moved, and start_time is part of the key
+                if replaced_ids := [
+                    *delta.removed_ids,
+                    *(meeting.remote_id for meeting in delta.meetings),
+                ]:
+                    conn.executemany(
+                        "DELETE FROM meeting_history WHERE calendar_id = ? AND remote_id = ?",
+                        [[calendar_id, remote_id] for remote_id in replaced_ids],
+                    )
+                if delta.meetings:
+                    conn.executemany(
+                        _INSERT_MEETING,
+                        [_meeting_row(meeting) for meeting in delta.meetings],
+                    )
+                if delta.sync_token:
+                    conn.execute(
+                        """
+                        INSERT OR REPLACE INTO google_calendar_sync (calendar_id, sync_token, synced_at)
+                        VALUES (?, ?, ?)
+                        """,
+                        [calendar_id, delta.sync_token, now],
+                    )
+                else:
+                    conn.execute(
+                        "DELETE FROM google_calendar_sync WHERE calendar_id = ?",
+                        [calendar_id],
+                    )
+                saved += len(delta.meetings)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return saved
+
+
+def forget_calendars_except(calendar_ids: list[str]) -> None:
+    """Drop the meetings and sync tokens of calendars that are gone or ignored now."""
+    condition = (
+        f"calendar_id NOT IN ({', '.join('?' * len(calendar_ids))})"
+        if calendar_ids
+        else "true"
+    )
+    with get_connection(write=True) as conn:
+        for table_name in ["meeting_history", "google_calendar_sync"]:
+            conn.execute(f"DELETE FROM {table_name} WHERE {condition}", calendar_ids)
+
+
+# --- Retention and compaction
+
+
+def delete_history_before(cutoff: datetime) -> int:
+    """Retention: drop everything older than `cutoff`, returns the number of deleted rows."""
+    deleted = 0
+    with get_connection(write=True) as conn:
+        for table_name, column in [
+            ("pr_history", "last_change"),
+            ("issue_activity_history", "activity_at"),
+            ("meeting_history", "start_time"),
+        ]:
+            result = conn.execute(
+                f"DELETE FROM {table_name} WHERE {column} < ? RETURNING 1",
+                [_to_db(cutoff)],
+            ).fetchall()
+            deleted += len(result)
+        conn.execute(
+            "UPDATE sync_state SET covered_from = ? WHERE covered_from < ?",
+            [_to_db(cutoff), _to_db(cutoff)],
+        )
+    logger.info(f"Deleted {deleted} history rows from before {cutoff}")
+    return deleted
+
+
+def compact_pr_history(before: datetime) -> int:
+    """Compaction: before `before`, keep only the last version of a PR per day."""
+    with get_connection(write=True) as conn:
+        result = conn.execute(
+            """
+            DELETE FROM pr_history
+            WHERE last_change < ?
+              AND (uid, last_change) NOT IN (
+                SELECT uid, max(last_change)
+                FROM pr_history
+                WHERE last_change < ?
+                GROUP BY uid, date_trunc('day', last_change)
+              )
+            RETURNING 1
+            """,
+            [_to_db(before), _to_db(before)],
+        ).fetchall()
+        conn.execute("CHECKPOINT")
+    logger.info(f"Compacted {len(result)} PR versions from before {before}")
+    return len(result)
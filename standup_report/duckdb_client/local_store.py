@@ -0,0 +1,68 @@
+import logging
+from collections.abc import Sequence
+from functools import cache
+
+from standup_report.exceptions import SettingsError
+from standup_report.processes import is_multi_process
+from standup_report.settings import StorageBackend
+from standup_report.settings import get_settings
+
+from . import client
+from .changes import LocalChange
+from .client import HealthState
+from .duckdb_store import DuckDBStore
+from .sqlite_store import SQLiteStore
+from .storage import LocalStore
+
+logger = logging.getLogger(__name__)
+
+
+@cache
+def get_local_store() -> LocalStore:
+    """The store of the ignored items and notes, as `storage.backend` picks it."""
+    try:
+        storage_settings = get_settings().STORAGE
+    except SettingsError as exc:
+        logger.warning(f"Keeping ignored items and notes in DuckDB: {exc}")
+        store: LocalStore = DuckDBStore()
+    else:
+        match storage_settings.BACKEND:
+            case StorageBackend.SQLITE:
+                store = SQLiteStore(storage_settings.SQLITE_FILE)
+            case StorageBackend.DUCKDB:
+                store = DuckDBStore()
+    store.create_tables()
+    logger.info(f"Keeping ignored items and notes in {store.backend}")
+    if is_multi_process() and store.backend == StorageBackend.DUCKDB:
+        logger.warning(
+            "With several workers every read of the ignored items and notes waits for "
+            "the DuckDB file lock, `storage.backend: sqlite` doesn't"
+        )
+    return store
+
+
+def close_local_store() -> None:
+    if get_local_store.cache_info().currsize == 0:
+        return
+    get_local_store().close()
+    get_local_store.cache_clear()
+
+
+def apply_local_changes(changes: Sequence[LocalChange]) -> None:
+    """Apply the changes in order, in one transaction: all of them or none."""
+    get_local_store().apply_local_changes(changes)
+
+
+def recreate_tables() -> None:
+    """Drop the history and the ignored items and notes, and recreate all tables."""
+    client.recreate_tables()
+    get_local_store().reset()
+
+
+def health_checks() -> list[HealthState]:
+    """DuckDB with the history, and the local store when it's a database of its own."""
+    history_health = client.health_check()
+    store = get_local_store()
+    if store.database_file == history_health.database_file:
+        return [history_health]
+    return [history_health, store.health_check()]
@@ -0,0 +1,126 @@
+import logging
+from collections.abc import Iterable
+from functools import cache
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+from standup_report.ignore_mixin import ItemType
+from standup_report.note_utils import NoteCategory
+
+from .changes import ChangeAction
+from .changes import LocalChange
+from .local_store import apply_local_changes
+
+logger = logging.getLogger(__name__)
+
+# Notes typed within this long of each other are committed together
+_WRITE_DELAY_SECONDS = 0.5
+# After a failed write, the notes are kept and tried again this much later
+_RETRY_DELAY_SECONDS = 5
+
+type NoteKey = tuple[ItemType, str, NoteCategory | None]
+
+
+class NoteWriter:
+    """Writes notes to the local store on a background thread, behind the requests that set them.
+
+    Only the latest note of every (item type, item id, category) is kept, so a
+    note that is edited while typing is written once, with its final text.
+    """
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._pending: dict[NoteKey, LocalChange] = {}
+        # The batch being written, until it's committed
+        self._writing: dict[NoteKey, LocalChange] = {}
+        self._lock = Lock()
+        # Held while writing, so a newer batch never lands before an older one
+        self._flush_lock = Lock()
+        self._wake = Event()
+        self._stopping = Event()
+        self._thread = Thread(
+            target=self._run, name="standup-report-notes", daemon=True
+        )
+        self._thread.start()
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending)
+
+    def queued(self) -> list[LocalChange]:
+        """The notes that are not committed yet, oldest first."""
+        with self._lock:
+            return [*self._writing.values(), *self._pending.values()]
+
+    def put(self, changes: Iterable[LocalChange]) -> None:
+        with self._lock:
+            for change in changes:
+                if change.action != ChangeAction.NOTE:
+                    raise ValueError(f"Only notes are written behind, not {change}")
+                key = (change.item_type, change.item_id, change.category)
+                # Moved to the end, the notes are written in the order of their last edit
+                self._pending.pop(key, None)
+                self._pending[key] = change
+        self._wake.set()
+
+    def flush(self) -> None:
+        """Write the queued notes now, in one transaction."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                self._writing = batch
+            if not batch:
+                return
+            try:
+                apply_local_changes(list(batch.values()))
+            except Exception:
+                with self._lock:
+                    # Notes edited in the meantime are newer than the ones that failed
+                    self._pending = {**batch, **self._pending}
+                    self._writing = {}
+                raise
+            with self._lock:
+                self._writing = {}
+            logger.debug(f"Wrote {len(batch)} notes behind")
+
+    def discard(self) -> None:
+        """Drop the queued notes, e.g. because all notes are being deleted."""
+        with self._flush_lock, self._lock:
+            self._pending.clear()
+
+    def stop(self) -> None:
+        """Stop the background thread and write what is still queued."""
+        self._stopping.set()
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wake.wait()
+            # Give the next keystrokes a chance to land in the same batch
+            if self._stopping.wait(self.delay):
+                return
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as exc:  # noqa: BLE001
+                logger.error(
+                    f"Could not write {self.pending_count} notes, "
+                    f"retrying in {_RETRY_DELAY_SECONDS}s: {exc}"
+                )
+                self._stopping.wait(_RETRY_DELAY_SECONDS)
+                self._wake.set()
+
+
+@cache
+def get_note_writer() -> NoteWriter:
+    return NoteWriter(delay=_WRITE_DELAY_SECONDS)
+
+
+def stop_note_writer() -> None:
+    if get_note_writer.cache_info().currsize == 0:
+        return
+    get_note_writer().stop()
+    get_note_writer.cache_clear()
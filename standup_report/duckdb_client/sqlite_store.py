@@ -0,0 +1,154 @@
+import logging
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextlib import nullcontext
+from threading import Lock
+from threading import local
+
+from standup_report.settings import StorageBackend
+
+from .client import HealthState
+from .client import get_connection as get_duckdb_connection
+from .storage import LocalStore
+
+logger = logging.getLogger(__name__)
+
+# Another process writing holds the lock at most for one small transaction
+_BUSY_TIMEOUT_MS = 5000
+# In the column order of LOCAL_TABLE_SCHEMAS, timestamps as text (reading DuckDB's TIMESTAMPTZ needs pytz)
+_COPY_FROM_DUCKDB = {
+    "ignored_items": (
+        "SELECT item_type, item_id, item_title, CAST(ignored_at AS VARCHAR) FROM ignored_items"
+    ),
+    "notes": "SELECT item_type, item_id, category, note FROM notes",
+}
+
+
+class SQLiteStore(LocalStore):
+    """The ignored items and notes in SQLite, in WAL mode.
+
+    Point reads and writes of single rows are what SQLite is built for: with the
+    write-ahead log, readers never wait for the writer, and other processes can
+    use the same file.
+    """
+
+    backend = StorageBackend.SQLITE
+    # Takes the write lock right away, rather than failing to upgrade a read lock
+    begin_sql = "BEGIN IMMEDIATE"
+
+    def __init__(self, database_file: str):
+        super().__init__(database_file)
+        self._is_new = not os.path.exists(database_file)
+        self._connections: list[sqlite3.Connection] = []
+        self._local = local()
+        self._lock = Lock()
+        self._write_lock = Lock()
+
+    @contextmanager
+    def connection(self, *, write: bool = False) -> Iterator[sqlite3.Connection]:
+        with self._write_lock if write else nullcontext():
+            yield self._get_connection()
+
+    def create_tables(self) -> None:
+        super().create_tables()
+        if self._is_new:
+            self._is_new = False
+            self._copy_from_duckdb()
+
+    def close(self) -> None:
+        with self._write_lock, self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+            self._local = local()
+        logger.info(f"Closed SQLite database {self.database_file}")
+
+    def health_check(self) -> HealthState:
+        try:
+            with self.connection() as conn:
+                journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+                table_names = [
+                    row[0]
+                    for row in conn.execute(
+                        "SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name"
+                    ).fetchall()
+                ]
+                row_counts = {
+                    table_name: conn.execute(
+                        f"SELECT COUNT(*) FROM {table_name}"
+                    ).fetchone()[0]
+                    for table_name in table_names
+                }
+        except sqlite3.Error as e:
+            return HealthState(
+                status="error",
+                error_msg=str(e),
+                backend="SQLite",
+                database_file=self.database_file,
+            )
+        return HealthState(
+            status="healthy" if journal_mode == "wal" else "error",
+            tables=table_names,
+            row_counts=row_counts,
+            error_msg=(
+                "" if journal_mode == "wal" else f"journal mode is {journal_mode}"
+            ),
+            backend="SQLite",
+            database_file=self.database_file,
+            details={"journal mode": journal_mode},
+        )
+
+    def _get_connection(self) -> sqlite3.Connection:
+        conn: sqlite3.Connection | None = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        # Every thread has its own connection, so it's only ever used by that thread,
+        # they're all kept to be closed together
+        conn = sqlite3.connect(
+            self.database_file,
+            isolation_level=None,  # transactions are started explicitly
+            check_same_thread=False,
+        )
+        conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        # With WAL, NORMAL syncs at checkpoints: a crash can lose the last commits, not the file
+        conn.execute("PRAGMA synchronous = NORMAL")
+        with self._lock:
+            self._connections.append(conn)
+        self._local.conn = conn
+        return conn
+
+    def _copy_from_duckdb(self) -> None:
+        """A new SQLite file starts with the ignored items and notes kept in DuckDB so far."""
+        with get_duckdb_connection() as duckdb_conn:
+            existing = {
+                row[0]
+                for row in duckdb_conn.execute(
+                    "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'"
+                ).fetchall()
+            }
+            rows = {
+                table_name: duckdb_conn.execute(query).fetchall()
+                for table_name, query in _COPY_FROM_DUCKDB.items()
+                if table_name in existing
+            }
+        if not any(rows.values()):
+            return
+
+        with self.connection(write=True) as conn:
+            conn.execute(self.begin_sql)
+            for table_name, table_rows in rows.items():
+                if table_rows:
+                    placeholders = ", ".join("?" * len(table_rows[0]))
+                    conn.executemany(
+                        f"INSERT OR REPLACE INTO {table_name} VALUES ({placeholders})",
+                        table_rows,
+                    )
+            conn.commit()
+        logger.info(
+            "Copied "
+            + ", ".join(f"{len(r)} {name}" for name, r in rows.items())
+            + f" from DuckDB to {self.database_file}"
+        )
@@ -0,0 +1,186 @@
+import logging
+from abc import ABC
+from abc import abstractmethod
+from collections.abc import Sequence
+from contextlib import AbstractContextManager
+from typing import Any
+from typing import ClassVar
+from typing import Protocol
+from uuid import uuid4
+
+from standup_report.ignore_mixin import ItemType
+from standup_report.note_utils import NoteCategory
+from standup_report.settings import StorageBackend
+
+from .changes import ChangeAction
+from .changes import LocalChange
+from .client import HealthState
+
+logger = logging.getLogger(__name__)
+
+# The small transactional tables, the same SQL works on DuckDB and on SQLite
+LOCAL_TABLE_SCHEMAS = {
+    "ignored_items": """
+        CREATE TABLE IF NOT EXISTS ignored_items (
+            item_type VARCHAR NOT NULL,
+            item_id VARCHAR NOT NULL,
+            item_title VARCHAR NOT NULL,
+            ignored_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (item_type, item_id)
+        )
+    """,
+    "notes": """
+        CREATE TABLE IF NOT EXISTS notes (
+            item_type VARCHAR NOT NULL,
+            item_id VARCHAR NOT NULL,
+            category VARCHAR NOT NULL,
+            note TEXT,
+            PRIMARY KEY (item_type, item_id, category)
+        )
+    """,
+    # A new token with every write, so other processes see their copies are stale
+    "local_version": """
+        CREATE TABLE IF NOT EXISTS local_version (
+            id INTEGER PRIMARY KEY,  -- there is only one token, its id is always 1
+            token VARCHAR NOT NULL
+        )
+    """,
+}
+
+_INSERT_IGNORED_ITEM = """
+    INSERT OR REPLACE INTO ignored_items (item_type, item_id, item_title, ignored_at)
+    VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+"""
+_DELETE_IGNORED_ITEM = "DELETE FROM ignored_items WHERE item_type = ? AND item_id = ?"
+_UPSERT_NOTE = """
+    INSERT OR REPLACE INTO notes (item_type, item_id, category, note)
+    VALUES (?, ?, ?, ?)
+"""
+_DELETE_NOTE = "DELETE FROM notes WHERE item_type = ? AND item_id = ? AND category = ?"
+_SET_VERSION = "INSERT OR REPLACE INTO local_version (id, token) VALUES (1, ?)"
+
+
+class Connection(Protocol):
+    """What the stores need of a DuckDB or a sqlite3 connection."""
+
+    def execute(self, sql: str, parameters: Any = ..., /) -> Any: ...
+
+    def commit(self) -> Any: ...
+
+    def rollback(self) -> Any: ...
+
+
+class LocalStore(ABC):
+    """Where the ignored items and notes are kept."""
+
+    backend: ClassVar[StorageBackend]
+    # Starts a write transaction
+    begin_sql: ClassVar[str] = "BEGIN TRANSACTION"
+
+    def __init__(self, database_file: str):
+        self.database_file = database_file
+
+    @abstractmethod
+    def connection(self, *, write: bool = False) -> AbstractContextManager[Connection]:
+        """The connection of the current thread, writes are serialized."""
+
+    @abstractmethod
+    def health_check(self) -> HealthState: ...
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close the connections, the store is not used anymore."""
+
+    def create_tables(self) -> None:
+        with self.connection(write=True) as conn:
+            for schema in LOCAL_TABLE_SCHEMAS.values():
+                conn.execute(schema)
+
+    def reset(self) -> None:
+        """Drop all ignored items and notes."""
+        with self.connection(write=True) as conn:
+            for table_name in LOCAL_TABLE_SCHEMAS:
+                conn.execute(f"DROP TABLE IF EXISTS {table_name}")
+        self.create_tables()
+        with self.connection(write=True) as conn:
+            _set_new_version(conn)
+
+    def get_version(self) -> str:
+        """Changes with every write, also of the other processes using the store."""
+        with self.connection() as conn:
+            row = conn.execute(
+                "SELECT token FROM local_version WHERE id = 1"
+            ).fetchone()
+        return row[0] if row else ""
+
+    def get_ignored_items(self) -> set[tuple[ItemType, str, str]]:
+        with self.connection() as conn:
+            result = conn.execute(
+                "SELECT item_type, item_id, item_title FROM ignored_items ORDER BY ignored_at DESC"
+            ).fetchall()
+        return {(ItemType(row[0]), row[1], row[2]) for row in result}
+
+    def get_notes(self) -> dict[tuple[ItemType, str, NoteCategory], str]:
+        with self.connection() as conn:
+            result = conn.execute(
+                "SELECT item_type, item_id, category, note FROM notes"
+            ).fetchall()
+        return {
+            (ItemType(row[0]), row[1], NoteCategory(row[2])): row[3] for row in result
+        }
+
+    def apply_local_changes(self, changes: Sequence[LocalChange]) -> None:
+        """Apply the changes in order, in one transaction: all of them or none."""
+        with self.connection(write=True) as conn:
+            conn.execute(self.begin_sql)
+            try:
+                for change in changes:
+                    conn.execute(*_change_statement(change))
+                _set_new_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        logger.info(
+            f"Applied {len(changes)} changes to ignored items and notes in {self.backend}"
+        )
+
+    def delete_all_notes(self) -> int:
+        with self.connection(write=True) as conn:
+            result = conn.execute("SELECT COUNT(*) FROM notes").fetchone()
+            count = result[0] if result else 0
+            conn.execute(self.begin_sql)
+            try:
+                conn.execute("DELETE FROM notes")
+                _set_new_version(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        logger.info(f"Deleted all notes ({count} total)")
+        return count
+
+
+def _set_new_version(conn: Connection) -> None:
+    conn.execute(_SET_VERSION, [uuid4().hex])
+
+
+def _change_statement(change: LocalChange) -> tuple[str, list[Any]]:
+    match change.action:
+        case ChangeAction.IGNORE:
+            return _INSERT_IGNORED_ITEM, [
+                change.item_type,
+                change.item_id,
+                change.item_title,
+            ]
+        case ChangeAction.UNIGNORE:
+            return _DELETE_IGNORED_ITEM, [change.item_type, change.item_id]
+        case ChangeAction.NOTE if change.clean_note:
+            return _UPSERT_NOTE, [
+                change.item_type,
+                change.item_id,
+                change.category,
+                change.clean_note,
+            ]
+        case ChangeAction.NOTE:
+            return _DELETE_NOTE, [change.item_type, change.item_id, change.category]
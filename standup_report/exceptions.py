@@ -8,19 +8,27 @@ class SettingsError(StandupReportError):
     def user_error_desc(self) -> str:
         return str(self)
 
+
+class InvalidChange(StandupReportError):
+    """Raised when a batch of changes to the ignored items and notes has a malformed entry"""
+
+
 class RemoteException(StandupReportError):
-    def __init__(
+    def __init__(  # noqa: PLR0913
         self,
         msg: str,
         gql_errors: list[dict] | None = None,
         query: str | None = None,
         variables: dict | None = None,
         url: str | None = None,
+        *,
+        status_code: int | None = None,
     ):
         self.gql_errors = gql_errors
         self.query = query
         self.variables = variables
         self.url = url
+        self.status_code = status_code
 
         if gql_errors:
             msg = f"{msg}: {gql_errors}"
@@ -31,3 +39,15 @@ class RemoteException(StandupReportError):
         if self.gql_errors:
             return ", ".join([str(e) for e in self.gql_errors])
         return str(self)
+
+
+class DeadlineExceeded(RemoteException):
+    """Raised when a source did not answer within its share of the report's latency budget"""
+
+
+class BudgetExhausted(RemoteException):
+    """Raised instead of making a request that the provider's rate limit would refuse"""
+
+
+class CircuitOpen(RemoteException):
+    """Raised instead of calling a provider that keeps failing, until its cooldown is over"""
@@ -0,0 +1,144 @@
+import logging
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import cache
+from threading import Lock
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Upstream calls are I/O bound, so we can have more threads than CPUs, but we
+# don't want every page load to be able to spawn an unbounded number of them.
+_MAX_WORKERS = 16
+# Paginated fetchers run on the shared pool and wait for their next page, which is
+# prefetched on a pool of its own, so it never queues behind the fetchers waiting for it.
+_MAX_PAGE_WORKERS = 8
+# Hedged requests run both attempts off the thread that waits for the first answer
+_MAX_HEDGE_WORKERS = 8
+
+
+@cache
+def get_executor() -> ThreadPoolExecutor:
+    """The one app-wide pool all upstream fetches run on."""
+    logger.info(f"Starting shared executor with {_MAX_WORKERS} workers")
+    return ThreadPoolExecutor(
+        max_workers=_MAX_WORKERS, thread_name_prefix="standup-report"
+    )
+
+
+@cache
+def get_page_executor() -> ThreadPoolExecutor:
+    """The pool next pages are prefetched on, see `submit_page`."""
+    return ThreadPoolExecutor(
+        max_workers=_MAX_PAGE_WORKERS, thread_name_prefix="standup-report-pages"
+    )
+
+
+@cache
+def get_hedge_executor() -> ThreadPoolExecutor:
+    """The pool hedged requests race on, see `submit_hedge`."""
+    return ThreadPoolExecutor(
+        max_workers=_MAX_HEDGE_WORKERS, thread_name_prefix="standup-report-hedge"
+    )
+
+
+def shutdown_executor() -> None:
+    for get_pool in [get_executor, get_page_executor, get_hedge_executor]:
+        if get_pool.cache_info().currsize == 0:
+            continue
+        get_pool().shutdown(wait=False, cancel_futures=True)
+        get_pool.cache_clear()
+
+
+def submit[T](fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+    # Like asyncio tasks, every task runs in a copy of the caller's context,
+    # so context variables (e.g. the remote deadline) follow the work.
+    return get_executor().submit(copy_context().run, fn, *args, **kwargs)
+
+
+def submit_page[T](fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+    """Like `submit`, for a single request whose result a task on the shared pool waits for."""
+    return get_page_executor().submit(copy_context().run, fn, *args, **kwargs)
+
+
+def submit_hedge[T](fn: Callable[..., T], *args: Any, **kwargs: Any) -> Future[T]:
+    """Like `submit_page`, for one of the attempts of a hedged request."""
+    return get_hedge_executor().submit(copy_context().run, fn, *args, **kwargs)
+
+
+def chain[T, U](future: Future[T], fn: Callable[[T], Future[U]]) -> Future[U]:
+    """Once `future` resolves, pass its result to `fn` and mirror the future `fn` returns.
+
+    Nothing here blocks a worker thread, so a task never waits on another task
+    queued behind it in the same (bounded) pool.
+    """
+    chained: Future[U] = Future()
+    # Callbacks run on whichever thread finished `future`, keep the caller's context
+    ctx = copy_context()
+
+    def _on_done(done: Future[T]) -> None:
+        try:
+            next_future = ctx.copy().run(fn, done.result())
+        except BaseException as exc:  # noqa: BLE001
+            chained.set_exception(exc)
+            return
+        mirror(next_future, chained)
+
+    future.add_done_callback(_on_done)
+    return chained
+
+
+def then[T, U](future: Future[T], fn: Callable[[T], U]) -> Future[U]:
+    """Like `chain`, for a plain function of the result."""
+
+    def _resolved(result: T) -> Future[U]:
+        mapped: Future[U] = Future()
+        mapped.set_result(fn(result))
+        return mapped
+
+    return chain(future, _resolved)
+
+
+def gather[T](futures: list[Future[T]]) -> Future[list[T]]:
+    """A future of all results, in the order of `futures`. Fails on the first error."""
+    gathered: Future[list[T]] = Future()
+    if not futures:
+        gathered.set_result([])
+        return gathered
+
+    remaining = len(futures)
+    lock = Lock()
+
+    def _on_done(done: Future[T]) -> None:
+        nonlocal remaining
+        try:
+            done.result()
+        except BaseException as exc:  # noqa: BLE001
+            with lock:
+                if not gathered.done():
+                    gathered.set_exception(exc)
+            return
+        with lock:
+            remaining -= 1
+            if remaining == 0 and not gathered.done():
+                gathered.set_result([f.result() for f in futures])
+
+    for future in futures:
+        future.add_done_callback(_on_done)
+    return gathered
+
+
+def mirror[T](source: Future[T], target: Future[T]) -> None:
+    """Resolve `target` like `source`, once `source` is done."""
+    source.add_done_callback(lambda done: _copy_result(done, target))
+
+
+def _copy_result[T](source: Future[T], target: Future[T]) -> None:
+    try:
+        result = source.result()
+    except BaseException as exc:  # noqa: BLE001
+        target.set_exception(exc)
+        return
+    target.set_result(result)
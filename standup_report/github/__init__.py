@@ -1,9 +1,13 @@
 from . import client
 from .prs import fetch_authored_open_prs
 from .prs import fetch_authored_prs
+from .prs import fetch_done_and_open_prs
+from .prs import submit_team_done_and_open_prs
 
 __all__ = [
     "client",
     "fetch_authored_open_prs",
     "fetch_authored_prs",
+    "fetch_done_and_open_prs",
+    "submit_team_done_and_open_prs",
 ]
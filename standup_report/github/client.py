@@ -12,13 +12,25 @@ _GQL_URL = "https://api.github.com/graphql"
 
 
 def post_github_gql_query(query: str, variables: dict | None = None) -> GQLResponse:
-    token = get_settings().GH_TOKEN
     return post_gql_query(
-        gql_url=_GQL_URL,
-        headers={
-            "Accept": "application/vnd.github.moondragon+json",
-            "Authorization": f"Bearer {token}",
-        },
-        query=query,
-        variables=variables,
+        gql_url=_GQL_URL, headers=_headers(), query=query, variables=variables
+    )
+
+
+async def post_github_gql_query_async(
+    query: str, variables: dict | None = None
+) -> GQLResponse:
+    # httpx is only installed with the `async` extra, for the ASGI app
+    from standup_report.remote import async_client  # noqa: PLC0415
+
+    return await async_client.post_gql_query_async(
+        gql_url=_GQL_URL, headers=_headers(), query=query, variables=variables
     )
+
+
+def _headers() -> dict:
+    token = get_settings().GH_TOKEN
+    return {
+        "Accept": "application/vnd.github.moondragon+json",
+        "Authorization": f"Bearer {token}",
+    }
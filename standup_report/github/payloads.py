@@ -0,0 +1,25 @@
+from typing import TypedDict
+
+
+# The shapes of the GitHub responses we decode, as `json.loads` returns them.
+class RawRepository(TypedDict):
+    nameWithOwner: str
+
+
+class RawActor(TypedDict):
+    login: str
+
+
+class RawPR(TypedDict):
+    """`fragment PRFields`"""
+
+    number: int
+    title: str
+    url: str
+    state: str
+    createdAt: str
+    updatedAt: str
+    mergedAt: str | None
+    repository: RawRepository
+    author: RawActor | None  # None for deleted accounts
+    reviewDecision: str | None
@@ -1,68 +1,233 @@
 import logging
 from collections.abc import Iterable
+from concurrent.futures import Future
 from datetime import datetime
+from functools import partial
 
 from standup_report.date_utils import parse_datetime_to_str
 from standup_report.date_utils import parse_str_to_date
-from standup_report.dict_utils import safe_traverse
+from standup_report.executor import gather
+from standup_report.executor import submit
+from standup_report.executor import then
 from standup_report.github import client
+from standup_report.github.payloads import RawPR
 from standup_report.pr_type import PR
 from standup_report.pr_type import PRReviewDecision
 from standup_report.pr_type import PRState
 from standup_report.remote.base_client import GQLResponse
 from standup_report.remote.gql_utils import TAfterCursor
-from standup_report.remote.gql_utils import THasMorePages
-from standup_report.remote.gql_utils import extract_gql_query_from_file
-from standup_report.remote.gql_utils import parse_page_info
+from standup_report.remote.gql_utils import extract_gql_query_from_files
+from standup_report.remote.pagination import TAliasCursors
+from standup_report.remote.pagination import alias_page_variables
+from standup_report.remote.pagination import iter_pages
+from standup_report.remote.pagination import next_alias_cursors
+from standup_report.remote.pagination import next_single_cursor
+from standup_report.remote.pagination import page_size
 from standup_report.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+_PR_FIELDS_FRAGMENT_FILE = "standup_report/github/pr_fields.graphql"
+# GitHub's limit for `first` on connections
+_GITHUB_MAX_PAGE_SIZE = 100
+# Search's limits, see `_fetch_prs_by_query`
+_MAX_SEARCH_OPERATORS = 5
+_MAX_SEARCH_QUERY_LENGTH = 256
+
 
 def fetch_authored_prs(oldest_updated_at: datetime) -> Iterable[PR]:
-    user_login_name = get_settings().GH_USERNAME
+    yield from _fetch_prs_by_query(
+        _build_done_search_query(oldest_updated_at, [get_settings().GH_USERNAME])
+    )
+
+
+def fetch_authored_open_prs() -> Iterable[PR]:
+    yield from _fetch_prs_by_query(
+        _build_open_search_query([get_settings().GH_USERNAME])
+    )
 
+
+def fetch_done_and_open_prs(
+    oldest_updated_at: datetime | None,
+) -> tuple[list[PR], list[PR]]:
+    """`fetch_authored_prs` and `fetch_authored_open_prs` in one request per page.
+
+    Without `oldest_updated_at` only the open PRs are fetched.
+    """
+    logger.info("---------- Fetching my latest and open PRs")
+    ignored_repos = get_settings().IGNORED_REPOS
+    raw_done_prs, raw_open_prs = _fetch_raw_done_and_open_prs(
+        [get_settings().GH_USERNAME], oldest_updated_at
+    )
+    return (
+        list(_process_prs(raw_done_prs, ignored_repos)),
+        list(_process_prs(raw_open_prs, ignored_repos)),
+    )
+
+
+def submit_team_done_and_open_prs(
+    logins: list[str], oldest_updated_at: datetime
+) -> Future[dict[str, tuple[list[PR], list[PR]]]]:
+    """`fetch_done_and_open_prs` of several authors, on the shared executor.
+
+    The authors are OR-ed together, in as few searches as GitHub allows, and the PRs
+    are split by author again: lower-cased login -> their latest and open PRs.
+    """
+    groups = _author_groups(logins, oldest_updated_at)
+    logger.info(
+        f"---------- Fetching the latest and open PRs of {len(logins)} authors "
+        f"in {len(groups)} searches"
+    )
+    per_group = gather(
+        [
+            submit(_fetch_raw_done_and_open_prs, group, oldest_updated_at)
+            for group in groups
+        ]
+    )
+    return then(per_group, partial(_split_by_author, logins))
+
+
+def _fetch_raw_done_and_open_prs(
+    authors: list[str], oldest_updated_at: datetime | None
+) -> tuple[list[RawPR], list[RawPR]]:
+    query: str = _load_query("standup_report/github/done_and_open_prs.graphql")
+    done_query = (
+        _build_done_search_query(oldest_updated_at, authors)
+        if oldest_updated_at
+        else ""
+    )
+    open_query = _build_open_search_query(authors)
+    first = page_size(_GITHUB_MAX_PAGE_SIZE)
+
+    def fetch_page(cursors: TAliasCursors) -> GQLResponse:
+        return client.post_github_gql_query(
+            query=query,
+            variables={
+                "first": first,
+                "doneQuery": done_query,
+                "openQuery": open_query,
+                **alias_page_variables(["done", "open"], cursors),
+            },
+        )
+
+    first_cursors: TAliasCursors = {"open": None}
+    if oldest_updated_at is not None:
+        first_cursors["done"] = None
+
+    raw_done_prs: list[RawPR] = []
+    raw_open_prs: list[RawPR] = []
+    for one_page_response in iter_pages(
+        fetch_page, first_cursors, next_alias_cursors, what="GitHub PRs"
+    ):
+        # An alias that was left out is not in the response at all
+        if done_page := one_page_response.data.get("done"):
+            raw_done_prs.extend(done_page["nodes"])
+        if open_page := one_page_response.data.get("open"):
+            raw_open_prs.extend(open_page["nodes"])
+    return raw_done_prs, raw_open_prs
+
+
+def _split_by_author(
+    logins: list[str], results: list[tuple[list[RawPR], list[RawPR]]]
+) -> dict[str, tuple[list[PR], list[PR]]]:
+    ignored_repos = get_settings().IGNORED_REPOS
+    prs_by_login: dict[str, tuple[list[PR], list[PR]]] = {
+        login.lower(): ([], []) for login in logins
+    }
+    for raw_done_prs, raw_open_prs in results:
+        for login, (done_prs, open_prs) in prs_by_login.items():
+            done_prs.extend(
+                _process_prs(_authored_by(raw_done_prs, login), ignored_repos)
+            )
+            open_prs.extend(
+                _process_prs(_authored_by(raw_open_prs, login), ignored_repos)
+            )
+    return prs_by_login
+
+
+def _authored_by(raw_prs: list[RawPR], login: str) -> list[RawPR]:
+    # Logins are case-insensitive, the author of a deleted account is null
+    return [
+        pr_data
+        for pr_data in raw_prs
+        if pr_data["author"] and pr_data["author"]["login"].lower() == login
+    ]
+
+
+def _author_groups(logins: list[str], oldest_updated_at: datetime) -> list[list[str]]:
+    """`logins` in groups that each fit into one search of PRs."""
+    groups: list[list[str]] = []
+    for login in logins:
+        if groups:
+            candidate = [*groups[-1], login]
+            # n authors take n - 1 ORs, and the search of the latest PRs is the longer one
+            if (
+                len(candidate) - 1 <= _MAX_SEARCH_OPERATORS
+                and len(_build_done_search_query(oldest_updated_at, candidate))
+                <= _MAX_SEARCH_QUERY_LENGTH
+            ):
+                groups[-1] = candidate
+                continue
+        groups.append([login])
+    return groups
+
+
+def _build_done_search_query(oldest_updated_at: datetime, authors: list[str]) -> str:
     oldest_updated_at_str: str = parse_datetime_to_str(oldest_updated_at)
-    search_query: str = (
-        f"author:{user_login_name} is:pr updated:>{oldest_updated_at_str} sort:updated"
+    return (
+        f"{_author_filter(authors)} is:pr updated:>{oldest_updated_at_str} sort:updated"
     )
-    yield from _fetch_prs_by_query(search_query)
 
 
-def fetch_authored_open_prs() -> Iterable[PR]:
-    user_login_name = get_settings().GH_USERNAME
+def _build_open_search_query(authors: list[str]) -> str:
+    return f"{_author_filter(authors)} is:pr state:open sort:updated"
+
+
+def _author_filter(authors: list[str]) -> str:
+    if len(authors) == 1:
+        return f"author:{authors[0]}"
+    return "(" + " OR ".join(f"author:{author}" for author in authors) + ")"
+
 
-    search_query: str = f"author:{user_login_name} is:pr state:open sort:updated"
-    yield from _fetch_prs_by_query(search_query)
+def _load_query(file_path: str) -> str:
+    # All PR queries select the same fields, from one shared fragment
+    return extract_gql_query_from_files(file_path, _PR_FIELDS_FRAGMENT_FILE)
 
 
 def _fetch_prs_by_query(search_query: str) -> Iterable[PR]:
     logger.info("---------- Fetching PRs I've worked on in the last 24h")
-    authored_prs_query: str = extract_gql_query_from_file(
-        "standup_report/github/prs.graphql"
-    )
+    authored_prs_query: str = _load_query("standup_report/github/prs.graphql")
 
     # Queries longer than 256 characters are not supported
     # You can't construct a query using more than five AND, OR, or NOT operators
     # https://docs.github.com/en/search-github/getting-started-with-searching-on-github/troubleshooting-search-queries
 
-    has_more_pages: THasMorePages = True
     ignored_repos = get_settings().IGNORED_REPOS
+    first = page_size(_GITHUB_MAX_PAGE_SIZE)
 
-    while has_more_pages:
-        one_page_response = client.post_github_gql_query(
+    def fetch_page(after: TAfterCursor) -> GQLResponse:
+        return client.post_github_gql_query(
             query=authored_prs_query,
-            variables={"searchQuery": search_query},
+            variables={"searchQuery": search_query, "first": first, "after": after},
         )
+
+    for one_page_response in iter_pages(
+        fetch_page,
+        None,
+        partial(next_single_cursor, path="search"),
+        what="GitHub PRs",
+    ):
         yield from _process_one_page_of_prs(one_page_response, ignored_repos)
-        has_more_pages, _ = _extract_page_info(one_page_response)
 
 
 def _process_one_page_of_prs(
     response: GQLResponse, ignored_repos: set[str]
 ) -> Iterable[PR]:
-    raw_prs: list[dict] = response.data["search"]["nodes"]
+    raw_prs: list[RawPR] = response.data["search"]["nodes"]
+    yield from _process_prs(raw_prs, ignored_repos)
+
 
+def _process_prs(raw_prs: list[RawPR], ignored_repos: set[str]) -> Iterable[PR]:
     for pr_data in raw_prs:
         number: int = pr_data["number"]
         repo_slug: str = pr_data["repository"]["nameWithOwner"]
@@ -90,10 +255,3 @@ def _process_one_page_of_prs(
             f"Found PR(number={pr.number}), {pr.title=} {repo_slug=} {pr_data["reviewDecision"]}"
         )
         yield pr
-
-
-def _extract_page_info(
-    one_page_response: GQLResponse,
-) -> tuple[THasMorePages, TAfterCursor]:
-    pr_data: dict | None = safe_traverse(one_page_response.data, "search")
-    return parse_page_info(pr_data)
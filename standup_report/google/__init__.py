@@ -4,6 +4,9 @@ from .auth import save_oauth_token
 from .auth import start_oauth_flow
 from .events import fetch_all_calendars
 from .events import get_calendar_events
+from .events import submit_calendar_events
+from .events import submit_team_meetings
+from .sync import submit_calendar_sync
 
 __all__ = [
     "client",
@@ -12,4 +15,7 @@ __all__ = [
     "get_calendar_events",
     "save_oauth_token",
     "start_oauth_flow",
+    "submit_calendar_events",
+    "submit_calendar_sync",
+    "submit_team_meetings",
 ]
@@ -1,8 +1,16 @@
 import json
 import logging
 import os
+import tempfile
+from contextlib import AbstractContextManager
+from contextlib import nullcontext
 from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
 from enum import StrEnum
+from threading import Lock
+from threading import Timer
 
 # !!!!!!  IMPORTANT  !!!!!!!!!!!!!!!
 # Since the Google app is running in "test mode" and I don't have https locally, I
@@ -14,12 +22,20 @@ from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 
+from standup_report.processes import file_lock
+from standup_report.processes import is_multi_process
 from standup_report.settings import GoogleSettings
 from standup_report.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
 SCOPES = ["https://www.googleapis.com/auth/calendar.readonly"]
+# The token is refreshed in the background this long before it expires. google-auth
+# itself refreshes 3m45s before, so a report never has to wait for a refresh.
+_REFRESH_AHEAD = timedelta(minutes=5)
+# After a failed refresh, it is retried this long later, doubling up to the maximum
+_REFRESH_RETRY_SECONDS = 5.0
+_MAX_REFRESH_RETRY_SECONDS = 60.0
 
 
 class GoogleAuthStatus(StrEnum):
@@ -76,14 +92,10 @@ def _is_token_valid(settings: GoogleSettings) -> bool:
     if not settings.HAS_TOKEN:
         return False
 
-    try:
-        creds = Credentials.from_authorized_user_file(  # type: ignore[no-untyped-call]
-            str(settings.TOKEN_FILE_NAME), SCOPES
-        )
-        return creds.valid or (creds.expired and creds.refresh_token is not None)
-    except Exception as e:
-        logger.warning(f"Could not load token: {e}")
+    creds = _credential_holder.peek()
+    if creds is None:
         return False
+    return creds.valid or (creds.expired and creds.refresh_token is not None)
 
 
 def start_oauth_flow(redirect_uri: str) -> Flow:
@@ -112,26 +124,153 @@ def save_oauth_token(credentials: Credentials) -> None:
         "client_id": credentials.client_id,
         "client_secret": credentials.client_secret,
         "scopes": list(credentials.scopes) if credentials.scopes else SCOPES,
+        # Naive UTC, like google-auth keeps it
+        "expiry": credentials.expiry.isoformat() if credentials.expiry else None,
     }
-    with open(google_settings.TOKEN_FILE_NAME, "w") as f:
-        json.dump(token_data, f)
+    # Replaced in one go, other threads and workers never read half a token
+    token_path = google_settings.TOKEN_FILE_NAME
+    fd, temp_path = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(token_path)), suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(token_data, f)
+        os.replace(temp_path, token_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
     logger.info(f"Token saved to {google_settings.TOKEN_FILE_NAME}")
 
 
 def get_credentials() -> Credentials | None:
-    """Load valid credentials from token file, or None if not available."""
-    google_settings = get_settings().GOOGLE
-
-    if not google_settings.HAS_TOKEN:
-        return None
-
+    """Valid credentials, refreshed if needed, or None if not available."""
+    return _credential_holder.get()
+
+
+class _CredentialHolder:
+    """The Google credentials of the process.
+
+    The token file is read once, and again only when its mtime changes. One thread
+    refreshes an expired token while the others wait for it, and a timer refreshes
+    it shortly before it expires. With several workers, one of them refreshes it
+    while the others wait, and then read what it wrote.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._creds: Credentials | None = None
+        self._mtime: int | None = None
+        self._refresh_timer: Timer | None = None
+        self._failed_refreshes = 0
+
+    def get(self) -> Credentials | None:
+        creds = self._creds
+        if creds is not None and creds.valid and self._mtime == _token_file_mtime():
+            return creds
+
+        with self._lock:
+            creds = self._load()
+            if creds is not None and creds.expired and creds.refresh_token:
+                creds = self._refresh()
+            return creds if creds is not None and creds.valid else None
+
+    def peek(self) -> Credentials | None:
+        """The credentials as they are in the token file, without refreshing them."""
+        with self._lock:
+            return self._load()
+
+    def _load(self) -> Credentials | None:
+        mtime = _token_file_mtime()
+        if mtime == self._mtime:
+            return self._creds
+
+        self._mtime = mtime
+        self._creds = None
+        if mtime is None:
+            return None
+        try:
+            self._creds = Credentials.from_authorized_user_file(  # type: ignore[no-untyped-call]
+                get_settings().GOOGLE.TOKEN_FILE_NAME, SCOPES
+            )
+        except Exception as e:
+            logger.warning(f"Could not load token: {e}")
+            # Read again next time, rather than taking the file for broken until it changes
+            self._mtime = None
+            return None
+        self._schedule_refresh()
+        return self._creds
+
+    def _refresh(self) -> Credentials | None:
+        """Refresh the token if it's due, returns the credentials as they are then."""
+        with _token_file_lock():
+            # Another worker may have refreshed it while this one waited for the lock
+            creds = self._load()
+            if (
+                creds is None
+                or not creds.refresh_token
+                or _until_refresh_is_due(creds) > timedelta(0)
+            ):
+                return creds
+            logger.info("Refreshing the Google token")
+            try:
+                creds.refresh(Request())  # type: ignore[no-untyped-call]
+            except Exception as e:
+                self._failed_refreshes += 1
+                retry_in = min(
+                    _REFRESH_RETRY_SECONDS * 2 ** (self._failed_refreshes - 1),
+                    _MAX_REFRESH_RETRY_SECONDS,
+                )
+                logger.warning(
+                    f"Could not refresh token, retrying in {retry_in:g}s: {e}"
+                )
+                self._start_refresh_timer(retry_in)
+                return creds
+            self._failed_refreshes = 0
+            save_oauth_token(creds)
+            # Our own write, the credentials in memory are already up to date
+            self._mtime = _token_file_mtime()
+        self._schedule_refresh()
+        return creds
+
+    def _schedule_refresh(self) -> None:
+        creds = self._creds
+        if creds is None or creds.expiry is None or not creds.refresh_token:
+            if self._refresh_timer is not None:
+                self._refresh_timer.cancel()
+            return
+        self._start_refresh_timer(_until_refresh_is_due(creds).total_seconds())
+
+    def _start_refresh_timer(self, delay: float) -> None:
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        self._refresh_timer = Timer(max(delay, 0), self._refresh_in_background)
+        self._refresh_timer.name = "standup-report-google-token"
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            self._refresh()
+
+
+def _until_refresh_is_due(creds: Credentials) -> timedelta:
+    expiry: datetime | None = creds.expiry  # naive UTC, like google-auth keeps it
+    if expiry is None:
+        return timedelta.max
+    return expiry - _REFRESH_AHEAD - datetime.now(UTC).replace(tzinfo=None)
+
+
+def _token_file_lock() -> AbstractContextManager[None]:
+    if not is_multi_process():
+        return nullcontext()
+    return file_lock(f"{get_settings().GOOGLE.TOKEN_FILE_NAME}.lock")
+
+
+def _token_file_mtime() -> int | None:
     try:
-        creds = Credentials.from_authorized_user_file(  # type: ignore[no-untyped-call]
-            google_settings.TOKEN_FILE_NAME, SCOPES
-        )
-        if creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        return creds if creds.valid else None
-    except Exception as e:
-        logger.warning(f"Could not load/refresh token: {e}")
+        return os.stat(get_settings().GOOGLE.TOKEN_FILE_NAME).st_mtime_ns
+    except FileNotFoundError:
         return None
+
+
+_credential_holder = _CredentialHolder()
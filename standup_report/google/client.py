@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
+from google.oauth2.credentials import Credentials
+
 from standup_report.exceptions import SettingsError
 from standup_report.google.auth import get_credentials
 from standup_report.remote.base_client import RESTResponse
@@ -12,15 +15,34 @@ logger = logging.getLogger(__name__)
 _BASE_URL = "https://www.googleapis.com/calendar/v3/"
 
 
-def get_google_rest_response(path: str, params: dict | None = None) -> RESTResponse:
+def get_google_rest_response(
+    path: str, params: dict | None = None, headers: dict | None = None
+) -> RESTResponse:
     assert not path.startswith("/")
-    creds = get_credentials()
-    if not creds:
-        raise SettingsError(f"Google not setup")
     return get_rest_response(
         full_url=f"{_BASE_URL}{path}",
-        headers={
-            "Authorization": f"Bearer {creds.token}",
-        },
+        headers=_headers(get_credentials(), headers),
+        params=params,
+    )
+
+
+async def get_google_rest_response_async(
+    path: str, params: dict | None = None, headers: dict | None = None
+) -> RESTResponse:
+    # httpx is only installed with the `async` extra, for the ASGI app
+    from standup_report.remote import async_client  # noqa: PLC0415
+
+    assert not path.startswith("/")
+    # Refreshing an expired token is a blocking call of google-auth
+    creds = await asyncio.to_thread(get_credentials)
+    return await async_client.get_rest_response_async(
+        full_url=f"{_BASE_URL}{path}",
+        headers=_headers(creds, headers),
         params=params,
     )
+
+
+def _headers(creds: Credentials | None, headers: dict | None) -> dict:
+    if not creds:
+        raise SettingsError(f"Google not setup")
+    return {"Authorization": f"Bearer {creds.token}", **(headers or {})}
@@ -1,14 +1,22 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future
+from dataclasses import replace
 from datetime import UTC
 from datetime import datetime
 from functools import partial
+from http import HTTPStatus
 
+from standup_report import duckdb_client
 from standup_report.calendar_type import Calendar
 from standup_report.calendar_type import Meeting
 from standup_report.exceptions import RemoteException
+from standup_report.executor import chain
+from standup_report.executor import gather
+from standup_report.executor import submit
+from standup_report.executor import then
 from standup_report.google import client
 from standup_report.google.client import get_google_rest_response
+from standup_report.google.payloads import RawEvent
 from standup_report.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -18,27 +26,70 @@ _MEETING_ACCEPTED_TENTATIVE = "tentative"
 
 
 def get_calendar_events(time_min: datetime) -> list[Meeting]:
-    """Fetch events from all calendars in parallel."""
+    return submit_calendar_events(time_min).result()
+
+
+def submit_calendar_events(
+    time_min: datetime, time_max: datetime | None = None
+) -> Future[list[Meeting]]:
+    """Fetch events from all calendars in parallel, on the shared executor."""
     logger.info("---------- Fetching Google meetings")
 
-    now = datetime.now(tz=UTC)
-    calendars = fetch_all_calendars()
+    time_max = time_max or datetime.now(tz=UTC)
     event_fetching_fn = partial(
         _fetch_events_for_calendar,
         time_min=time_min.isoformat(),
-        time_max=now.isoformat(),
+        time_max=time_max.isoformat(),
     )
 
-    with ThreadPoolExecutor() as executor:
-        results = executor.map(
-            event_fetching_fn,
-            calendars,
-        )
+    def _fetch_events_for_all(calendars: list[Calendar]) -> Future[list[Meeting]]:
+        per_calendar = gather([submit(event_fetching_fn, cal) for cal in calendars])
+        return then(per_calendar, _flatten_meetings)
+
+    return chain(submit(fetch_all_calendars), _fetch_events_for_all)
+
+
+def submit_team_meetings(
+    emails: list[str], time_min: datetime
+) -> Future[list[Meeting]]:
+    """Fetch the events of everyone's primary calendar in parallel, on the shared executor.
+
+    A meeting several of them attended is in each of their calendars, it is kept once,
+    with the attendees of all copies. Calendars that aren't shared with us are left out.
+    """
+    logger.info(f"---------- Fetching Google meetings of {len(emails)} people")
+
+    event_fetching_fn = partial(
+        _fetch_events_for_calendar,
+        time_min=time_min.isoformat(),
+        time_max=datetime.now(tz=UTC).isoformat(),
+    )
+    per_calendar = gather(
+        [
+            submit(event_fetching_fn, Calendar(title=email, remote_id=email))
+            for email in emails
+        ]
+    )
+    return then(per_calendar, _dedupe_meetings)
+
 
-    all_calendar_events = []
+def _dedupe_meetings(results: list[list[Meeting]]) -> list[Meeting]:
+    # An attendee's copy of a meeting has everyone but them as attendees
+    meetings_by_id: dict[str, Meeting] = {}
+    for meeting in _flatten_meetings(results):
+        if (known := meetings_by_id.get(meeting.remote_id)) is None:
+            meetings_by_id[meeting.remote_id] = meeting
+            continue
+        attendees = dict.fromkeys([*known.attendees, *meeting.attendees])
+        attendees.update(dict.fromkeys([known.calendar.title, meeting.calendar.title]))
+        meetings_by_id[meeting.remote_id] = replace(known, attendees=list(attendees))
+    return list(meetings_by_id.values())
+
+
+def _flatten_meetings(results: list[list[Meeting]]) -> list[Meeting]:
+    all_calendar_events: list[Meeting] = []
     for meetings in results:
         all_calendar_events.extend(meetings)
-
     return all_calendar_events
 
 
@@ -62,48 +113,65 @@ def _fetch_events_for_calendar(
 
     meetings = []
     for raw_event in response.data.get("items", []):
-        title: str = raw_event["summary"]
-        if title in get_settings().GOOGLE.IGNORED_MEETINGS:
-            logger.warning(f"Ignoring meeting {title=}")
-            continue
-
-        start = raw_event["start"]
-        if "dateTime" in start:
-            start_time = datetime.fromisoformat(start["dateTime"])
-        else:
-            start_time = datetime.strptime(start["date"], "%Y-%m-%d")
-
-        meeting = Meeting(
-            title=raw_event["summary"],
-            calendar=cal,
-            url=raw_event["htmlLink"],
-            remote_id=raw_event["id"],
-            start_time=start_time,
-            attendees=[
-                att["email"]
-                for att in raw_event.get("attendees", [])
-                if att["responseStatus"]
-                in (_MEETING_ACCEPTED, _MEETING_ACCEPTED_TENTATIVE)
-                and not att.get("self")
-            ],
-        )
-        logger.info(f"Found {raw_event=}")
-        meetings.append(meeting)
+        if meeting := parse_meeting(raw_event, cal):
+            meetings.append(meeting)
     return meetings
 
 
+def parse_meeting(raw_event: RawEvent, cal: Calendar) -> Meeting | None:
+    """The meeting of an event from `events.list`, None if it's ignored."""
+    title: str = raw_event["summary"]
+    if title in get_settings().GOOGLE.IGNORED_MEETINGS:
+        logger.warning(f"Ignoring meeting {title=}")
+        return None
+
+    start = raw_event["start"]
+    if "dateTime" in start:
+        start_time = datetime.fromisoformat(start["dateTime"])
+    else:
+        start_time = datetime.strptime(start["date"], "%Y-%m-%d")
+
+    meeting = Meeting(
+        title=raw_event["summary"],
+        calendar=cal,
+        url=raw_event["htmlLink"],
+        remote_id=raw_event["id"],
+        start_time=start_time,
+        attendees=[
+            att["email"]
+            for att in raw_event.get("attendees", [])
+            if att["responseStatus"] in (_MEETING_ACCEPTED, _MEETING_ACCEPTED_TENTATIVE)
+            and not att.get("self")
+        ],
+    )
+    logger.info(f"Found meeting {title=}")
+    return meeting
+
+
 def fetch_all_calendars() -> list[Calendar]:
-    rest_url = "users/me/calendarList"
-    google_response: dict = client.get_google_rest_response(path=rest_url).data
-    raw_items: list[dict] = google_response.get("items", [])
-    calendars: list[Calendar] = []
-    for raw_cal in raw_items:
-        cal = Calendar(
-            title=raw_cal["summary"],
-            remote_id=raw_cal["id"],
-        )
-        if cal.title in get_settings().GOOGLE.IGNORED_CALENDARS:
+    """The calendars that aren't ignored.
+
+    The list is kept in DuckDB with its ETag, and only downloaded again if it changed.
+    """
+    known = duckdb_client.get_calendar_list()
+    headers = {"If-None-Match": known[0]} if known else None
+    google_response = client.get_google_rest_response(
+        path="users/me/calendarList", headers=headers
+    )
+
+    calendars: list[Calendar]
+    if known and google_response.response.status_code == HTTPStatus.NOT_MODIFIED:
+        calendars = known[1]
+    else:
+        calendars = [
+            Calendar(title=raw_cal["summary"], remote_id=raw_cal["id"])
+            for raw_cal in google_response.data.get("items", [])
+        ]
+        if etag := google_response.response.headers.get("ETag"):
+            duckdb_client.save_calendar_list(etag, calendars)
+
+    ignored_calendars = get_settings().GOOGLE.IGNORED_CALENDARS
+    for cal in calendars:
+        if cal.title in ignored_calendars:
             logger.warning(f"=========== Ignoring calendar {cal.title=}")
-            continue
-        calendars.append(cal)
-    return calendars
+    return [cal for cal in calendars if cal.title not in ignored_calendars]
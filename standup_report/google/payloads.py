@@ -0,0 +1,23 @@
+from typing import NotRequired
+from typing import TypedDict
+
+
+# The shapes of the Google Calendar responses we decode, as `json.loads` returns them.
+class RawEventTime(TypedDict, total=False):
+    dateTime: str  # meetings
+    date: str  # all-day events
+
+
+class RawAttendee(TypedDict):
+    email: str
+    responseStatus: str
+    self: NotRequired[bool]
+
+
+class RawEvent(TypedDict):
+    id: str
+    status: NotRequired[str]
+    summary: str
+    htmlLink: str
+    start: RawEventTime
+    attendees: NotRequired[list[RawAttendee]]
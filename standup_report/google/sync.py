@@ -0,0 +1,129 @@
+import logging
+from concurrent.futures import Future
+from datetime import datetime
+from http import HTTPStatus
+from urllib.parse import quote
+
+from standup_report import duckdb_client
+from standup_report.calendar_type import Calendar
+from standup_report.calendar_type import CalendarDelta
+from standup_report.calendar_type import Meeting
+from standup_report.exceptions import RemoteException
+from standup_report.executor import chain
+from standup_report.executor import gather
+from standup_report.executor import submit
+from standup_report.executor import then
+from standup_report.google.client import get_google_rest_response
+from standup_report.google.events import fetch_all_calendars
+from standup_report.google.events import parse_meeting
+from standup_report.remote.base_client import RESTResponse
+from standup_report.remote.pagination import iter_pages
+
+logger = logging.getLogger(__name__)
+
+# Events are small, and the first sync of a calendar can be thousands of them
+_EVENTS_PAGE_SIZE = 2500
+_EVENT_CANCELLED = "cancelled"
+
+TPageToken = str | None
+
+
+def submit_calendar_sync(
+    time_min: datetime, *, full: bool = False
+) -> Future[list[CalendarDelta]]:
+    """Fetch what changed in every calendar since its last sync, on the shared executor.
+
+    Calendars without a sync token, with an expired one, or all of them with `full`,
+    are synced fully, from `time_min` on.
+    """
+    logger.info("---------- Syncing Google meetings")
+
+    def _sync_all(
+        calendars: list[tuple[Calendar, str | None]],
+    ) -> Future[list[CalendarDelta]]:
+        deltas = gather(
+            [
+                submit(_sync_calendar, cal, sync_token, time_min)
+                for cal, sync_token in calendars
+            ]
+        )
+        return then(deltas, lambda results: [d for d in results if d is not None])
+
+    return chain(submit(_list_calendars_to_sync, full), _sync_all)
+
+
+def _list_calendars_to_sync(full: bool) -> list[tuple[Calendar, str | None]]:
+    calendars = fetch_all_calendars()
+    duckdb_client.forget_calendars_except([cal.remote_id for cal in calendars])
+    sync_tokens = {} if full else duckdb_client.get_calendar_sync_tokens()
+    return [(cal, sync_tokens.get(cal.remote_id)) for cal in calendars]
+
+
+def _sync_calendar(
+    cal: Calendar, sync_token: str | None, time_min: datetime
+) -> CalendarDelta | None:
+    try:
+        if sync_token:
+            try:
+                return _fetch_calendar_delta(cal, {"syncToken": sync_token})
+            except RemoteException as exc:
+                if exc.status_code != HTTPStatus.GONE:
+                    raise
+                logger.warning(
+                    f"Sync token of calendar {cal} expired, syncing it fully"
+                )
+        return _fetch_calendar_delta(
+            cal, {"timeMin": time_min.isoformat()}, full_since=time_min
+        )
+    except RemoteException:
+        # The calendar keeps its sync token, and catches up with the next sync
+        logger.error(f"Error syncing calendar {cal}")
+        return None
+
+
+def _fetch_calendar_delta(
+    cal: Calendar, params: dict, *, full_since: datetime | None = None
+) -> CalendarDelta:
+    logger.debug(f"Syncing events of calendar {cal}, full: {full_since is not None}")
+
+    def fetch_page(page_token: TPageToken) -> RESTResponse:
+        return get_google_rest_response(
+            path=f"calendars/{quote(cal.remote_id)}/events",
+            params={
+                **params,
+                "singleEvents": "true",
+                "maxResults": _EVENTS_PAGE_SIZE,
+                **({"pageToken": page_token} if page_token else {}),
+            },
+        )
+
+    def next_page(response: RESTResponse, _: TPageToken) -> tuple[bool, TPageToken]:
+        page_token: TPageToken = response.data.get("nextPageToken")
+        return page_token is not None, page_token
+
+    meetings: list[Meeting] = []
+    removed_ids: list[str] = []
+    sync_token: str | None = None
+    for response in iter_pages(
+        fetch_page, None, next_page, what=f"Google calendar {cal.title}"
+    ):
+        for raw_event in response.data.get("items", []):
+            meeting = (
+                parse_meeting(raw_event, cal)
+                if raw_event.get("status") != _EVENT_CANCELLED
+                else None
+            )
+            if meeting is None:
+                removed_ids.append(raw_event["id"])
+            else:
+                meetings.append(meeting)
+        # Only on the last page, a sync cut short by the page limit is full again next time
+        sync_token = response.data.get("nextSyncToken")
+
+    return CalendarDelta(
+        calendar=cal,
+        meetings=meetings,
+        removed_ids=removed_ids,
+        sync_token=sync_token,
+        full_since=full_since,
+    )
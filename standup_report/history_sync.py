@@ -0,0 +1,280 @@
+import logging
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import InvalidStateError
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from operator import itemgetter
+from threading import Lock
+from typing import Any
+
+from standup_report import duckdb_client
+from standup_report import github
+from standup_report import linear
+from standup_report.calendar_type import Meeting
+from standup_report.enum_utils import SafeStrEnum
+from standup_report.executor import chain
+from standup_report.executor import mirror
+from standup_report.executor import submit
+from standup_report.executor import then
+from standup_report.google import submit_calendar_sync
+from standup_report.issue_type import Issue
+from standup_report.issue_type import IssueActivity
+from standup_report.pr_type import PR
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Upstream "updated since" filters aren't exact to the second, every delta overlaps a bit
+_OVERLAP = timedelta(minutes=5)
+# Don't ask upstream for a delta more often than this, the history is fresh enough
+_MIN_SYNC_INTERVAL = timedelta(seconds=30)
+_MAINTENANCE_SOURCE = "maintenance"
+
+
+class HistorySource(SafeStrEnum):
+    PRS = "prs"
+    ISSUE_ACTIVITY = "issue_activity"
+    MEETINGS = "meetings"
+
+
+@dataclass
+class _SyncPlan:
+    source: HistorySource
+    fetch_from: datetime
+    covered_from: datetime
+    started_at: datetime
+
+    @property
+    def is_full(self) -> bool:
+        """The whole range is fetched, not only the delta since the last sync."""
+        return self.fetch_from == self.covered_from
+
+
+_lock = Lock()
+_in_flight: dict[HistorySource, Future[None]] = {}
+
+
+def prs_between(start: datetime, end: datetime) -> Future[list[PR]]:
+    return _query_after_sync(
+        HistorySource.PRS, start, lambda: duckdb_client.get_prs_between(start, end)
+    )
+
+
+def issue_activities_between(
+    start: datetime, end: datetime
+) -> Future[list[IssueActivity]]:
+    return _query_after_sync(
+        HistorySource.ISSUE_ACTIVITY,
+        start,
+        lambda: duckdb_client.get_issue_activities_between(start, end),
+    )
+
+
+def meetings_between(start: datetime, end: datetime) -> Future[list[Meeting]]:
+    return _query_after_sync(
+        HistorySource.MEETINGS,
+        start,
+        lambda: duckdb_client.get_meetings_between(start, end),
+    )
+
+
+def prs_and_open_prs_between(
+    start: datetime, end: datetime
+) -> Future[tuple[list[PR], list[PR]]]:
+    """The PR history of the range, and the open PRs.
+
+    The open PRs come with the same GitHub request that fetches the PR delta.
+    """
+    return _query_with_open_items_after_sync(
+        HistorySource.PRS, start, lambda: duckdb_client.get_prs_between(start, end)
+    )
+
+
+def issue_activities_and_open_issues_between(
+    start: datetime, end: datetime
+) -> Future[tuple[list[IssueActivity], list[Issue]]]:
+    """The issue activity of the range, and the open issues, from one Linear request."""
+    return _query_with_open_items_after_sync(
+        HistorySource.ISSUE_ACTIVITY,
+        start,
+        lambda: duckdb_client.get_issue_activities_between(start, end),
+    )
+
+
+def _query_after_sync[T](
+    source: HistorySource, start: datetime, query: Callable[[], T]
+) -> Future[T]:
+    return chain(sync_history(source, since=start), lambda _: submit(query))
+
+
+def _query_with_open_items_after_sync[T, O](
+    source: HistorySource, start: datetime, query: Callable[[], T]
+) -> Future[tuple[T, list[O]]]:
+    open_items: Future[list[O]] = Future()
+    synced = sync_history(source, since=start, open_items=open_items)
+    return chain(
+        synced,
+        lambda _: chain(
+            submit(query),
+            lambda items: then(open_items, lambda open_: (items, open_)),
+        ),
+    )
+
+
+def sync_history(
+    source: HistorySource,
+    *,
+    since: datetime,
+    open_items: Future[list[Any]] | None = None,
+) -> Future[None]:
+    """Bring the local history of `source` up to now, and back to `since`.
+
+    Only the delta since the last sync is fetched. There is at most one sync
+    per source in flight, everybody else waits for that one.
+    If `open_items` is given, what is open right now (PRs or issues) is fetched
+    along, in the same request, and put into it.
+    """
+    with _lock:
+        synced: Future[None]
+        in_flight = _in_flight.get(source)
+        if in_flight is not None and not in_flight.done():
+            # The sync in flight might not reach back to `since`, plan again once it's done.
+            # Usually there is then nothing left to fetch.
+            synced = chain(in_flight, lambda _: _start_sync(source, since, open_items))
+        else:
+            synced = _start_sync(source, since, open_items)
+        _in_flight[source] = synced
+
+    if open_items is not None:
+        synced.add_done_callback(lambda done: _fail_if_pending(open_items, done))
+    return synced
+
+
+def _start_sync(
+    source: HistorySource,
+    since: datetime,
+    open_items: Future[list[Any]] | None,
+) -> Future[None]:
+    return chain(
+        submit(_plan_sync, source, since),
+        lambda plan: _fetch_and_save(source, plan, open_items),
+    )
+
+
+def _plan_sync(source: HistorySource, since: datetime) -> _SyncPlan | None:
+    now = datetime.now(UTC)
+    state = duckdb_client.get_sync_state(source)
+    if state is None or since < state[0]:
+        # Never synced, or not this far back: fetch the whole range once
+        return _SyncPlan(
+            source=source, fetch_from=since, covered_from=since, started_at=now
+        )
+
+    covered_from, high_water_mark = state
+    if now - high_water_mark < _MIN_SYNC_INTERVAL:
+        return None
+    return _SyncPlan(
+        source=source,
+        fetch_from=high_water_mark - _OVERLAP,
+        covered_from=covered_from,
+        started_at=now,
+    )
+
+
+def _fetch_and_save(
+    source: HistorySource,
+    plan: _SyncPlan | None,
+    open_items: Future[list[Any]] | None,
+) -> Future[None]:
+    if plan is None:
+        if open_items is not None:
+            # Nothing to sync, but the open items are still needed
+            mirror(
+                then(_fetch_with_open_items(source, None), itemgetter(1)), open_items
+            )
+        done: Future[None] = Future()
+        done.set_result(None)
+        return done
+
+    logger.info(f"Syncing {plan.source} history since {plan.fetch_from}")
+    fetched: Future[list[Any]]
+    if open_items is not None:
+        both = _fetch_with_open_items(plan.source, plan.fetch_from)
+        mirror(then(both, itemgetter(1)), open_items)
+        fetched = then(both, itemgetter(0))
+    else:
+        fetched = _fetch(plan)
+
+    return chain(fetched, lambda items: submit(_save, plan, items))
+
+
+def _fetch(plan: _SyncPlan) -> Future[list[Any]]:
+    since = plan.fetch_from
+    match plan.source:
+        case HistorySource.PRS:
+            return submit(lambda: list(github.fetch_authored_prs(since)))
+        case HistorySource.ISSUE_ACTIVITY:
+            # Every activity is saved, not only the one a report of this window shows
+            return submit(linear.fetch_user_activity, since, one_per_issue=False)
+        case HistorySource.MEETINGS:
+            # Google keeps track of the delta with a sync token per calendar
+            return submit_calendar_sync(plan.covered_from, full=plan.is_full)
+
+
+def _fetch_with_open_items(
+    source: HistorySource, since: datetime | None
+) -> Future[tuple[list[Any], list[Any]]]:
+    """The delta since `since` (none without it) and the open items, in one request."""
+    match source:
+        case HistorySource.PRS:
+            return submit(github.fetch_done_and_open_prs, since)
+        case HistorySource.ISSUE_ACTIVITY if since is None:
+            return submit(lambda: ([], list(linear.fetch_in_progress_issues())))
+        case HistorySource.ISSUE_ACTIVITY:
+            return submit(
+                linear.fetch_activity_and_open_issues, since, one_per_issue=False
+            )
+        case _:
+            raise ValueError(f"There are no open {source}")
+
+
+def _fail_if_pending(open_items: Future[list[Any]], synced: Future[None]) -> None:
+    # The sync failed before it got to fetch the open items
+    if (exc := synced.exception()) is None:
+        return
+    with suppress(InvalidStateError):
+        open_items.set_exception(exc)
+
+
+def _save(plan: _SyncPlan, items: list[Any]) -> None:
+    match plan.source:
+        case HistorySource.PRS:
+            saved = duckdb_client.save_prs(items)
+        case HistorySource.ISSUE_ACTIVITY:
+            saved = duckdb_client.save_issue_activities(items)
+        case HistorySource.MEETINGS:
+            saved = duckdb_client.save_calendar_deltas(items)
+
+    duckdb_client.set_sync_state(plan.source, plan.covered_from, plan.started_at)
+    logger.info(f"Saved {saved} {plan.source} into history")
+    _run_daily_maintenance(plan.started_at)
+
+
+def _run_daily_maintenance(now: datetime) -> None:
+    """Retention and compaction, at most once a day."""
+    state = duckdb_client.get_sync_state(_MAINTENANCE_SOURCE)
+    if state is not None and now - state[1] < timedelta(days=1):
+        return
+
+    history_settings = get_settings().HISTORY
+    duckdb_client.delete_history_before(
+        now - timedelta(days=history_settings.RETENTION_DAYS)
+    )
+    duckdb_client.compact_pr_history(
+        now - timedelta(days=history_settings.COMPACT_AFTER_DAYS)
+    )
+    duckdb_client.set_sync_state(_MAINTENANCE_SOURCE, now, now)
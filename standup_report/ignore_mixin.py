@@ -12,7 +12,7 @@ class ItemType(SafeStrEnum):
     MEETING = "Meeting"
 
 
-@dataclass
+@dataclass(slots=True)
 class IgnoreMixin(ABC):
     ignore_item_type: ClassVar[ItemType]
 
@@ -1,4 +1,6 @@
+from collections.abc import Iterable
 from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
 from enum import auto
 from typing import ClassVar
@@ -30,7 +32,7 @@ class ActivityType(SafeIntEnum):
     COMPLETED = auto()
 
 
-@dataclass
+@dataclass(slots=True)
 class IssueAttachment:
     url: str
     title: str
@@ -41,7 +43,7 @@ class IssueAttachment:
         return self.title.split(":")[0]
 
 
-@dataclass
+@dataclass(slots=True)
 class Issue(IgnoreMixin, NoteMixin):
     title: str
     ident: str
@@ -49,14 +51,16 @@ class Issue(IgnoreMixin, NoteMixin):
     state: LinearState | None
     pr_attachments: list[IssueAttachment]
 
+    # Intersected with the PRs of the report, computed once
+    pr_attachment_urls: frozenset[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self.pr_attachment_urls = frozenset(a.url for a in self.pr_attachments)
+
     @property
     def long_title(self) -> str:
         return f"{self.ident} {self.title}"
 
-    @property
-    def pr_attachment_urls(self) -> set[str]:
-        return {a.url for a in self.pr_attachments}
-
     # Ignore properties
     ignore_item_type: ClassVar[ItemType] = ItemType.ISSUE
 
@@ -69,7 +73,7 @@ class Issue(IgnoreMixin, NoteMixin):
         return self.title
 
 
-@dataclass
+@dataclass(slots=True)
 class IssueActivity(Issue):
     activity_type: ActivityType
     activity_at: datetime
@@ -81,3 +85,18 @@ class IssueActivity(Issue):
     @property
     def last_change_ago(self) -> str:
         return ago(self.activity_at)
+
+
+def most_important_per_issue(
+    activities: Iterable[IssueActivity],
+) -> list[IssueActivity]:
+    """The most important activity on every issue, the latest one of equally important ones."""
+    activity_by_ident: dict[str, IssueActivity] = {}
+    for activity in activities:
+        known = activity_by_ident.get(activity.ident)
+        if known is None or (activity.activity_type, activity.activity_at) > (
+            known.activity_type,
+            known.activity_at,
+        ):
+            activity_by_ident[activity.ident] = activity
+    return list(activity_by_ident.values())
@@ -1,9 +1,13 @@
 from . import client
 from .activity import fetch_user_activity
+from .activity_and_open_issues import fetch_activity_and_open_issues
+from .activity_and_open_issues import fetch_team_activity_and_open_issues
 from .open_issues import fetch_in_progress_issues
 
 __all__ = [
     "client",
+    "fetch_activity_and_open_issues",
     "fetch_in_progress_issues",
+    "fetch_team_activity_and_open_issues",
     "fetch_user_activity",
 ]
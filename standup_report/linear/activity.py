@@ -1,4 +1,6 @@
 import logging
+from collections.abc import Iterable
+from collections.abc import Iterator
 from datetime import UTC
 from datetime import datetime
 from operator import attrgetter
@@ -7,30 +9,49 @@ from typing import Literal
 from standup_report.date_utils import parse_datetime_to_str
 from standup_report.date_utils import parse_optional_str_to_date
 from standup_report.date_utils import parse_str_to_date
-from standup_report.dict_utils import safe_traverse
 from standup_report.issue_type import ActivityType
 from standup_report.issue_type import IssueActivity
 from standup_report.issue_type import IssueAttachment
 from standup_report.issue_type import LinearState
+from standup_report.issue_type import most_important_per_issue
 from standup_report.remote.base_client import GQLResponse
-from standup_report.remote.gql_utils import TAfterCursor
-from standup_report.remote.gql_utils import THasMorePages
-from standup_report.remote.gql_utils import extract_gql_query_from_file
+from standup_report.remote.gql_utils import connection_nodes
+from standup_report.remote.gql_utils import extract_gql_query_from_files
+from standup_report.remote.pagination import TAliasCursors
+from standup_report.remote.pagination import alias_page_variables
+from standup_report.remote.pagination import iter_pages
+from standup_report.remote.pagination import next_alias_cursors
+from standup_report.remote.pagination import page_size
 from standup_report.settings import get_settings
 
 from . import client
+from .payloads import RawComment
+from .payloads import RawIssue
 from .pr_attach import extract_pr_attachments
 
 logger = logging.getLogger(__name__)
 
 
-_COMMENTED_AT_KEY = "commented_at"
+ISSUE_FIELDS_FRAGMENT_FILE = "standup_report/linear/issue_fields.graphql"
+# The paginated result sets of GetActivity, each with its own cursor
+ACTIVITY_ALIASES = ["created_issues", "state_changed_issues", "commented_issues"]
+_STATE_CHANGE_DATES: list[
+    tuple[Literal["completedAt", "canceledAt", "startedAt"], ActivityType]
+] = [
+    ("completedAt", ActivityType.COMPLETED),
+    ("canceledAt", ActivityType.CANCELED),
+    ("startedAt", ActivityType.WORKED_ON),
+]
 
 
-def fetch_user_activity(oldest_updated_at: datetime) -> list[IssueActivity]:
+def fetch_user_activity(
+    oldest_updated_at: datetime, *, one_per_issue: bool = True
+) -> list[IssueActivity]:
+    """The activity since `oldest_updated_at`, only the most important one per issue
+    with `one_per_issue`, otherwise every creation, state change and comment."""
     logger.info(f"---------- Fetching Linear issue activity since {oldest_updated_at}.")
-    authored_prs_query: str = extract_gql_query_from_file(
-        "standup_report/linear/activity.graphql"
+    authored_prs_query: str = extract_gql_query_from_files(
+        "standup_report/linear/activity.graphql", ISSUE_FIELDS_FRAGMENT_FILE
     )
 
     # Ideally, I'd get all the same data as is in
@@ -42,26 +63,50 @@ def fetch_user_activity(oldest_updated_at: datetime) -> list[IssueActivity]:
     #  5. comment reacted
     #  6. opened pull request
 
-    has_more_pages: THasMorePages = True
-
-    activity_by_issue_id: dict[str, IssueActivity] = {}
     oldest_updated_at_str: str = parse_datetime_to_str(oldest_updated_at)
-
     user_email = get_settings().LINEAR_EMAIL
+    first = page_size(client.MAX_PAGE_SIZE)
 
-    while has_more_pages:
-        one_page_response = client.post_linear_gql_query(
+    def fetch_page(cursors: TAliasCursors) -> GQLResponse:
+        return client.post_linear_gql_query(
             query=authored_prs_query,
-            variables={"email": user_email, "gt_date": oldest_updated_at_str},
+            variables={
+                "emails": [user_email],
+                "gt_date": oldest_updated_at_str,
+                "first": first,
+                **alias_page_variables(ACTIVITY_ALIASES, cursors),
+            },
         )
-        _process_one_page_of_actions(
-            one_page_response, oldest_updated_at, activity_by_issue_id
-        )
-        has_more_pages, _ = _extract_page_info(one_page_response)
 
-    sorted_desc_by_importance = sorted(
-        activity_by_issue_id.values(), key=attrgetter("title")
+    pages = iter_pages(
+        fetch_page,
+        dict.fromkeys(ACTIVITY_ALIASES),
+        next_alias_cursors,
+        what="Linear activity",
     )
+    return parse_user_activity(
+        (one_page_response.data for one_page_response in pages),
+        oldest_updated_at,
+        one_per_issue=one_per_issue,
+    )
+
+
+def parse_user_activity(
+    pages: Iterable[dict], oldest_updated_at: datetime, *, one_per_issue: bool = True
+) -> list[IssueActivity]:
+    """The activity in responses that have (some of) GetActivity's result sets."""
+    activities = [
+        activity
+        for data in pages
+        for activity in _iter_activities_of_one_page(data, oldest_updated_at)
+    ]
+    if one_per_issue:
+        activities = most_important_per_issue(activities)
+    return _sort_by_importance(activities)
+
+
+def _sort_by_importance(activities: list[IssueActivity]) -> list[IssueActivity]:
+    sorted_desc_by_importance = sorted(activities, key=attrgetter("title"))
     sorted_desc_by_importance = sorted(
         sorted_desc_by_importance, key=attrgetter("activity_type"), reverse=True
     )
@@ -69,35 +114,41 @@ def fetch_user_activity(oldest_updated_at: datetime) -> list[IssueActivity]:
     return sorted_desc_by_importance
 
 
-def _process_one_page_of_actions(
-    response: GQLResponse,
-    oldest_updated_at: datetime,
-    activity_by_issue_id: dict[str, IssueActivity],
-) -> None:
+def _iter_activities_of_one_page(
+    data: dict, oldest_updated_at: datetime
+) -> Iterator[IssueActivity]:
 
     # 1. issue created
-    raw_created_issues = safe_traverse(response.data, "created_issues.nodes", [])
-    _process_batch_of_issues(
-        raw_created_issues,
-        oldest_updated_at,
-        activity_by_issue_id,
-        activity_type=ActivityType.CREATED,
-    )
+    raw_created_issues: list[RawIssue] = connection_nodes(data.get("created_issues"))
+    for raw_issue in raw_created_issues:
+        yield _issue_activity(
+            raw_issue, ActivityType.CREATED, parse_str_to_date(raw_issue["createdAt"])
+        )
 
     # 2. issue updated
     # TODO: I think we don't need this, but I might be wrong.
 
     # 3. assigned issue state changed
-    raw_updated_issues = safe_traverse(response.data, "state_changed_issues.nodes", [])
-    _process_batch_of_issues(
-        raw_updated_issues, oldest_updated_at, activity_by_issue_id, activity_type=None
+    raw_updated_issues: list[RawIssue] = connection_nodes(
+        data.get("state_changed_issues")
     )
+    for raw_issue in raw_updated_issues:
+        # Every change in the window, e.g. an issue can be started and completed in it
+        for activity, activity_at in _figure_out_activities(
+            raw_issue, oldest_updated_at
+        ):
+            yield _issue_activity(raw_issue, activity, activity_at)
 
     # 4. issue commented
-    raw_comments: list[dict] = safe_traverse(
-        response.data, "commented_issues.nodes", []
-    )
-    _process_comments(raw_comments, oldest_updated_at, activity_by_issue_id)
+    raw_comments: list[RawComment] = connection_nodes(data.get("commented_issues"))
+    for raw_comment in raw_comments:
+        if (commented_issue := raw_comment.get("issue")) is None:
+            continue
+        yield _issue_activity(
+            commented_issue,
+            ActivityType.COMMENTED,
+            parse_str_to_date(raw_comment["updatedAt"]),
+        )
 
     #  5. comment reacted
     #
@@ -116,70 +167,15 @@ def _process_one_page_of_actions(
     # All PRs are fetched with every issue
 
 
-def _process_batch_of_issues(
-    raw_issues: list[dict],
-    oldest_updated_at: datetime,
-    activity_by_issue_id: dict[str, IssueActivity],
-    activity_type: Literal[ActivityType.COMMENTED, ActivityType.CREATED] | None,
-) -> None:
-    for raw_issue in raw_issues:
-        _process_one_issue(
-            raw_issue,
-            oldest_updated_at,
-            activity_by_issue_id,
-            activity_type=activity_type,
-        )
-
-
-def _process_comments(
-    raw_comments: list[dict],
-    oldest_updated_at: datetime,
-    activity_by_issue_id: dict[str, IssueActivity],
-) -> None:
-    for raw_comment in raw_comments:
-        raw_issue: dict | None = raw_comment.get("issue")
-        if raw_issue is None:
-            continue
-        raw_issue[_COMMENTED_AT_KEY] = raw_comment["updatedAt"]  # faking the issue data
-        _process_one_issue(
-            raw_issue,
-            oldest_updated_at,
-            activity_by_issue_id,
-            activity_type=ActivityType.COMMENTED,
-        )
-
-
-def _process_one_issue(
-    raw_issue: dict,
-    oldest_updated_at: datetime,
-    activity_by_issue_id: dict[str, IssueActivity],
-    *,
-    activity_type: Literal[ActivityType.COMMENTED, ActivityType.CREATED] | None,
-) -> None:
-    issue_key = raw_issue["id"]
-
-    # It's a bit hard to know what action actually took place. That is because of how we
-    # fetch the data with GQL.
-
-    activity: ActivityType
-    activity_at: datetime
-    match activity_type:
-        case ActivityType.COMMENTED:
-            activity = ActivityType.COMMENTED
-            activity_at = parse_str_to_date(raw_issue[_COMMENTED_AT_KEY])
-        case ActivityType.CREATED:
-            activity = ActivityType.CREATED
-            activity_at = parse_str_to_date(raw_issue["createdAt"])
-        case _:
-            activity, activity_at = _figure_out_activity(raw_issue, oldest_updated_at)
-
+def _issue_activity(
+    raw_issue: RawIssue, activity: ActivityType, activity_at: datetime
+) -> IssueActivity:
     title = raw_issue["title"]
     logger.debug(f"Adding issue {title=} {activity=} {activity_at=}")
-    assert isinstance(activity_at, datetime)
 
     pr_attachments: list[IssueAttachment] = extract_pr_attachments(raw_issue)
 
-    activity_by_issue_id[issue_key] = IssueActivity(
+    return IssueActivity(
         title=title,
         ident=raw_issue["identifier"],
         url=raw_issue["url"],
@@ -190,36 +186,21 @@ def _process_one_issue(
     )
 
 
-def _figure_out_activity(
-    raw_issue: dict, oldest_updated_at: datetime
-) -> tuple[ActivityType, datetime]:
-    activities: dict[ActivityType, datetime] = {}
-
-    key: str
-    activity: ActivityType
-    for key, activity in [
-        ("completedAt", ActivityType.COMPLETED),
-        ("canceledAt", ActivityType.CANCELED),
-        ("startedAt", ActivityType.WORKED_ON),
-    ]:
-        if (
-            dt := parse_optional_str_to_date(raw_issue.get(key))
-        ) and dt >= oldest_updated_at:
-            activities[activity] = dt
+def _figure_out_activities(
+    raw_issue: RawIssue, oldest_updated_at: datetime
+) -> list[tuple[ActivityType, datetime]]:
+    activities: list[tuple[ActivityType, datetime]] = [
+        (activity, dt)
+        for key, activity in _STATE_CHANGE_DATES
+        if (dt := parse_optional_str_to_date(raw_issue.get(key)))
+        and dt >= oldest_updated_at
+    ]
 
     if not activities:
         logger.error(
             f"Something went wrong, NO activity could be identified on the issue, "
             f"this must be a bug in the code. {raw_issue=}"
         )
-        return ActivityType.UNKNOWN, datetime.now(tz=UTC)
-
-    sorted_activities = sorted(activities.items(), key=lambda x: x[0], reverse=True)
-    return sorted_activities[0]
-
+        return [(ActivityType.UNKNOWN, datetime.now(tz=UTC))]
 
-def _extract_page_info(
-    one_page_response: GQLResponse,
-) -> tuple[THasMorePages, TAfterCursor]:
-    # TODO: should we support pagination? possibly ... but not now
-    return False, ""
+    return activities
@@ -0,0 +1,124 @@
+import logging
+from datetime import datetime
+
+from standup_report.date_utils import parse_datetime_to_str
+from standup_report.issue_type import Issue
+from standup_report.issue_type import IssueActivity
+from standup_report.remote.base_client import GQLResponse
+from standup_report.remote.gql_utils import connection_nodes
+from standup_report.remote.gql_utils import extract_gql_query_from_files
+from standup_report.remote.pagination import TAliasCursors
+from standup_report.remote.pagination import alias_page_variables
+from standup_report.remote.pagination import iter_pages
+from standup_report.remote.pagination import next_alias_cursors
+from standup_report.remote.pagination import page_size
+from standup_report.settings import get_settings
+
+from . import client
+from .activity import ACTIVITY_ALIASES
+from .activity import ISSUE_FIELDS_FRAGMENT_FILE
+from .activity import parse_user_activity
+from .open_issues import parse_open_issues
+
+logger = logging.getLogger(__name__)
+
+# Result set -> the field with the user each of its nodes was fetched for
+_USER_FIELDS = {
+    "created_issues": "creator",
+    "state_changed_issues": "assignee",
+    "commented_issues": "user",
+    "open_issues": "assignee",
+}
+
+
+def fetch_activity_and_open_issues(
+    oldest_updated_at: datetime, *, one_per_issue: bool = True
+) -> tuple[list[IssueActivity], list[Issue]]:
+    """`fetch_user_activity` and `fetch_in_progress_issues` in one request per page."""
+    logger.info(
+        f"---------- Fetching Linear activity since {oldest_updated_at} and open issues."
+    )
+    pages = _fetch_pages([get_settings().LINEAR_EMAIL], oldest_updated_at)
+    return _parse_activity_and_open_issues(
+        pages, oldest_updated_at, one_per_issue=one_per_issue
+    )
+
+
+def fetch_team_activity_and_open_issues(
+    emails: list[str], oldest_updated_at: datetime
+) -> dict[str, tuple[list[IssueActivity], list[Issue]]]:
+    """`fetch_activity_and_open_issues` of several users, in the same requests.
+
+    The issues are split by user again: lower-cased email -> their activity and open issues.
+    """
+    logger.info(
+        f"---------- Fetching Linear activity since {oldest_updated_at} "
+        f"and open issues of {len(emails)} users."
+    )
+    pages = _fetch_pages(emails, oldest_updated_at)
+    return {
+        email.lower(): _parse_activity_and_open_issues(
+            [_data_of_user(data, email.lower()) for data in pages], oldest_updated_at
+        )
+        for email in emails
+    }
+
+
+def _fetch_pages(emails: list[str], oldest_updated_at: datetime) -> list[dict]:
+    query: str = extract_gql_query_from_files(
+        "standup_report/linear/activity_and_open_issues.graphql",
+        ISSUE_FIELDS_FRAGMENT_FILE,
+    )
+    oldest_updated_at_str = parse_datetime_to_str(oldest_updated_at)
+    first = page_size(client.MAX_PAGE_SIZE)
+    aliases = [*ACTIVITY_ALIASES, "open_issues"]
+
+    def fetch_page(cursors: TAliasCursors) -> GQLResponse:
+        return client.post_linear_gql_query(
+            query=query,
+            variables={
+                "emails": emails,
+                "gt_date": oldest_updated_at_str,
+                "first": first,
+                **alias_page_variables(aliases, cursors),
+            },
+        )
+
+    return [
+        one_page_response.data
+        for one_page_response in iter_pages(
+            fetch_page,
+            dict.fromkeys(aliases),
+            next_alias_cursors,
+            what="Linear activity and open issues",
+        )
+    ]
+
+
+def _parse_activity_and_open_issues(
+    pages: list[dict], oldest_updated_at: datetime, *, one_per_issue: bool = True
+) -> tuple[list[IssueActivity], list[Issue]]:
+    activity = parse_user_activity(
+        pages, oldest_updated_at, one_per_issue=one_per_issue
+    )
+    # An issue I worked on is often still open, its PR attachments are parsed only once
+    known_attachments = {issue.ident: issue.pr_attachments for issue in activity}
+    open_issues = [
+        issue for data in pages for issue in parse_open_issues(data, known_attachments)
+    ]
+    return activity, open_issues
+
+
+def _data_of_user(data: dict, email: str) -> dict:
+    """One page of results, with only the nodes that were fetched for `email`."""
+    return {
+        alias: {
+            "nodes": [
+                node
+                for node in connection_nodes(data.get(alias))
+                if (user := node.get(user_field)) and user["email"].lower() == email
+            ]
+        }
+        for alias, user_field in _USER_FIELDS.items()
+        if data.get(alias)
+    }
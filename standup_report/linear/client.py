@@ -9,13 +9,26 @@ from standup_report.settings import get_settings
 logger = logging.getLogger(__name__)
 
 _GQL_URL = "https://api.linear.app/graphql"
+# Linear's limit for `first` on connections
+MAX_PAGE_SIZE = 250
 
 
 def post_linear_gql_query(query: str, variables: dict | None = None) -> GQLResponse:
-    token = get_settings().LINEAR_TOKEN
     return post_gql_query(
-        gql_url=_GQL_URL,
-        headers={"Authorization": str(token)},
-        query=query,
-        variables=variables,
+        gql_url=_GQL_URL, headers=_headers(), query=query, variables=variables
     )
+
+
+async def post_linear_gql_query_async(
+    query: str, variables: dict | None = None
+) -> GQLResponse:
+    # httpx is only installed with the `async` extra, for the ASGI app
+    from standup_report.remote import async_client  # noqa: PLC0415
+
+    return await async_client.post_gql_query_async(
+        gql_url=_GQL_URL, headers=_headers(), query=query, variables=variables
+    )
+
+
+def _headers() -> dict:
+    return {"Authorization": str(get_settings().LINEAR_TOKEN)}
@@ -1,14 +1,20 @@
 import logging
 from collections.abc import Iterable
+from functools import partial
 
 from standup_report.issue_type import Issue
 from standup_report.issue_type import IssueAttachment
 from standup_report.issue_type import LinearState
+from standup_report.linear.activity import ISSUE_FIELDS_FRAGMENT_FILE
+from standup_report.linear.payloads import RawIssue
 from standup_report.linear.pr_attach import extract_pr_attachments
 from standup_report.remote.base_client import GQLResponse
 from standup_report.remote.gql_utils import TAfterCursor
-from standup_report.remote.gql_utils import THasMorePages
-from standup_report.remote.gql_utils import extract_gql_query_from_file
+from standup_report.remote.gql_utils import connection_nodes
+from standup_report.remote.gql_utils import extract_gql_query_from_files
+from standup_report.remote.pagination import iter_pages
+from standup_report.remote.pagination import next_single_cursor
+from standup_report.remote.pagination import page_size
 from standup_report.settings import get_settings
 
 from . import client
@@ -18,27 +24,43 @@ logger = logging.getLogger(__name__)
 
 def fetch_in_progress_issues() -> Iterable[Issue]:
     logger.info("---------- Fetch in-progress issues")
-    authored_prs_query: str = extract_gql_query_from_file(
-        "standup_report/linear/open_issues.graphql"
+    authored_prs_query: str = extract_gql_query_from_files(
+        "standup_report/linear/open_issues.graphql", ISSUE_FIELDS_FRAGMENT_FILE
     )
 
-    has_more_pages: THasMorePages = True
     user_email = get_settings().LINEAR_EMAIL
+    first = page_size(client.MAX_PAGE_SIZE)
 
-    while has_more_pages:
-        one_page_response = client.post_linear_gql_query(
+    def fetch_page(after: TAfterCursor) -> GQLResponse:
+        return client.post_linear_gql_query(
             query=authored_prs_query,
-            variables={"email": user_email},
+            variables={"emails": [user_email], "first": first, "after": after},
         )
-        yield from _process_one_page_of_issues(one_page_response)
-        has_more_pages, _ = _extract_page_info(one_page_response)
 
+    for one_page_response in iter_pages(
+        fetch_page,
+        None,
+        partial(next_single_cursor, path="open_issues"),
+        what="Linear open issues",
+    ):
+        yield from parse_open_issues(one_page_response.data)
 
-def _process_one_page_of_issues(response: GQLResponse) -> Iterable[Issue]:
-    raw_issues: list[dict] = response.data["open_issues"]["nodes"]
+
+def parse_open_issues(
+    data: dict, known_attachments: dict[str, list[IssueAttachment]] | None = None
+) -> Iterable[Issue]:
+    """The issues in a response with GetOpenIssues's `open_issues`.
+
+    `known_attachments` (issue ident -> PR attachments) are reused instead of parsed again.
+    """
+    # Missing from the pages after the last page of open issues
+    raw_issues: list[RawIssue] = connection_nodes(data.get("open_issues"))
+    known_attachments = known_attachments or {}
 
     for raw_issue in raw_issues:
-        pr_attachments: list[IssueAttachment] = extract_pr_attachments(raw_issue)
+        pr_attachments: list[IssueAttachment] = known_attachments.get(
+            raw_issue["identifier"]
+        ) or extract_pr_attachments(raw_issue)
 
         issue = Issue(
             title=raw_issue["title"],
@@ -47,12 +69,5 @@ def _process_one_page_of_issues(response: GQLResponse) -> Iterable[Issue]:
             state=LinearState.from_string(raw_issue["state"]["type"]),
             pr_attachments=pr_attachments,
         )
-        logger.debug(f"Found {issue=}")
+        logger.debug(f"Found issue {issue.ident}")
         yield issue
-
-
-def _extract_page_info(
-    one_page_response: GQLResponse,
-) -> tuple[THasMorePages, TAfterCursor]:
-    # I don't know... more than 100 issues? we can't even handle that in UI
-    return False, None
@@ -0,0 +1,42 @@
+from typing import NotRequired
+from typing import TypedDict
+
+from standup_report.remote.gql_utils import Connection
+
+
+# The shapes of the Linear responses we decode, as `json.loads` returns them.
+class RawState(TypedDict):
+    type: str
+
+
+class RawAttachment(TypedDict):
+    url: str
+    title: str
+    updatedAt: str
+
+
+class RawUser(TypedDict):
+    email: str
+
+
+class RawIssue(TypedDict):
+    """`fragment base_issue_data`, and the dates and people some queries select along"""
+
+    id: str
+    identifier: str
+    title: str
+    url: str
+    state: RawState
+    attachments: Connection[RawAttachment]
+    createdAt: NotRequired[str]
+    startedAt: NotRequired[str | None]
+    completedAt: NotRequired[str | None]
+    canceledAt: NotRequired[str | None]
+    creator: NotRequired[RawUser | None]
+    assignee: NotRequired[RawUser | None]
+
+
+class RawComment(TypedDict):
+    updatedAt: str
+    user: NotRequired[RawUser | None]
+    issue: RawIssue | None
@@ -1,10 +1,12 @@
 from standup_report.date_utils import parse_str_to_date
-from standup_report.dict_utils import safe_traverse
 from standup_report.issue_type import IssueAttachment
+from standup_report.remote.gql_utils import connection_nodes
 
+from .payloads import RawIssue
 
-def extract_pr_attachments(raw_issue: dict) -> list[IssueAttachment]:
-    raw_attachments: list[dict] = safe_traverse(raw_issue, "attachments.nodes", [])
+
+def extract_pr_attachments(raw_issue: RawIssue) -> list[IssueAttachment]:
+    raw_attachments = connection_nodes(raw_issue.get("attachments"))
     return [
         IssueAttachment(
             url=pr["url"],
@@ -0,0 +1,167 @@
+import logging
+from collections.abc import Iterable
+from collections.abc import Sequence
+from dataclasses import dataclass
+from dataclasses import field
+from dataclasses import replace
+from functools import cache
+from threading import Lock
+
+from standup_report import duckdb_client
+from standup_report.duckdb_client import ChangeAction
+from standup_report.duckdb_client import LocalChange
+from standup_report.ignore_mixin import ItemType
+from standup_report.note_utils import NoteCategory
+from standup_report.processes import is_multi_process
+
+logger = logging.getLogger(__name__)
+
+type IgnoreKey = tuple[ItemType, str]
+type NoteKey = tuple[ItemType, str, NoteCategory]
+
+
+@dataclass(frozen=True)
+class LocalData:
+    """The ignored items and notes, as they were at one point. Never changed, only replaced."""
+
+    ignored_titles: dict[IgnoreKey, str] = field(default_factory=dict)
+    notes: dict[NoteKey, str] = field(default_factory=dict)
+    ignored_keys: frozenset[IgnoreKey] = field(init=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "ignored_keys", frozenset(self.ignored_titles))
+
+    @property
+    def ignored_items(self) -> list[tuple[ItemType, str, str]]:
+        return sorted((*key, title) for key, title in self.ignored_titles.items())
+
+
+class LocalDataIndex:
+    """Write-through copy of the ignored items and notes, which only change through this app.
+
+    It's loaded from the local store once, every write replaces the copy with a new
+    one. Ignores are written to the store first, notes are written behind by the
+    note writer. Readers keep the copy they got, so a report filters and annotates
+    all of its sections with the same one.
+
+    With several worker processes the others write to the store too: the copy is
+    then loaded again whenever the store's version token changed.
+    """
+
+    def __init__(self) -> None:
+        self._data: LocalData | None = None
+        # The local store's version token, as it was when the copy was loaded
+        self._store_version = ""
+        self._lock = Lock()
+
+    def get(self) -> LocalData:
+        if is_multi_process():
+            return self._get_shared()
+        if (data := self._data) is not None:
+            return data
+        with self._lock:
+            if self._data is None:
+                self._data = self._load()
+            return self._data
+
+    def _get_shared(self) -> LocalData:
+        store_version = duckdb_client.get_local_store().get_version()
+        if (data := self._data) is not None and store_version == self._store_version:
+            return data
+        with self._lock:
+            if self._data is None or store_version != self._store_version:
+                self._data = self._load()
+            return self._data
+
+    def apply(self, changes: Sequence[LocalChange]) -> LocalData:
+        """Apply the changes to a new copy, and write them to the local store in one transaction."""
+        note_writer = duckdb_client.get_note_writer()
+        with self._lock:
+            if all(change.action == ChangeAction.NOTE for change in changes):
+                # Typing a note shouldn't wait for the local store
+                note_writer.put(changes)
+            else:
+                # The queued notes first, or they would overwrite the ones of this batch
+                note_writer.flush()
+                duckdb_client.apply_local_changes(changes)
+            data = self._current()
+            ignored_titles = dict(data.ignored_titles)
+            notes = dict(data.notes)
+            _apply_changes(ignored_titles, notes, changes)
+            return self._replace(data, ignored_titles=ignored_titles, notes=notes)
+
+    def delete_all_notes(self) -> int:
+        with self._lock:
+            duckdb_client.get_note_writer().discard()
+            count = duckdb_client.delete_all_notes()
+            self._replace(self._current(), notes={})
+            return count
+
+    def recreate_tables(self) -> None:
+        """Drop everything, also the notes that are yet to be written."""
+        with self._lock:
+            duckdb_client.get_note_writer().discard()
+            duckdb_client.recreate_tables()
+            self._data = None
+
+    def _current(self) -> LocalData:
+        if self._data is None:
+            self._data = self._load()
+        return self._data
+
+    def _load(self) -> LocalData:
+        # Read first: a write that lands while loading is then only loaded once more
+        self._store_version = duckdb_client.get_local_store().get_version()
+        ignored_titles: dict[IgnoreKey, str] = {
+            (item_type, item_id): item_title
+            for item_type, item_id, item_title in duckdb_client.get_ignored_items()
+        }
+        notes = duckdb_client.get_notes()
+        # The notes that are still to be written are newer than the stored ones
+        _apply_changes(ignored_titles, notes, duckdb_client.get_note_writer().queued())
+        data = LocalData(ignored_titles=ignored_titles, notes=notes)
+        logger.info(
+            f"Loaded {len(data.ignored_titles)} ignored items and {len(data.notes)} notes"
+        )
+        return data
+
+    def _replace(
+        self,
+        data: LocalData,
+        *,
+        ignored_titles: dict[IgnoreKey, str] | None = None,
+        notes: dict[NoteKey, str] | None = None,
+    ) -> LocalData:
+        self._data = replace(
+            data,
+            ignored_titles=(
+                ignored_titles if ignored_titles is not None else data.ignored_titles
+            ),
+            notes=notes if notes is not None else data.notes,
+        )
+        return self._data
+
+
+def _apply_changes(
+    ignored_titles: dict[IgnoreKey, str],
+    notes: dict[NoteKey, str],
+    changes: Iterable[LocalChange],
+) -> None:
+    for change in changes:
+        ignore_key = (change.item_type, change.item_id)
+        match change.action:
+            case ChangeAction.IGNORE:
+                ignored_titles[ignore_key] = change.item_title
+            case ChangeAction.UNIGNORE:
+                ignored_titles.pop(ignore_key, None)
+            case ChangeAction.NOTE if change.category is not None:
+                note_key = (*ignore_key, change.category)
+                if change.clean_note:
+                    notes[note_key] = change.clean_note
+                else:
+                    notes.pop(note_key, None)
+
+
+@cache
+def get_local_data_index() -> LocalDataIndex:
+    return LocalDataIndex()
@@ -10,6 +10,6 @@ class NoteCategory(SafeStrEnum):
     NEXT = "next"
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteMixin(ABC):  # noqa: B024
     note: str = field(default="", kw_only=True)
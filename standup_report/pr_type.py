@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 import logging
+import sys
 from dataclasses import dataclass
+from dataclasses import field
 from datetime import datetime
 from typing import ClassVar
 
@@ -26,7 +28,7 @@ class PRReviewDecision(SafeStrEnum):
     REVIEW_REQUIRED = "REVIEW_REQUIRED"
 
 
-@dataclass
+@dataclass(slots=True)
 class PR(IgnoreMixin, NoteMixin):
     number: int
     repo_slug: str
@@ -40,9 +42,13 @@ class PR(IgnoreMixin, NoteMixin):
 
     issues: list[str] | None = None
 
-    @property
-    def uid(self) -> str:
-        return f"{self.repo_slug}/pull/{self.number}"
+    # Used for every ignore and note lookup, computed once
+    uid: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # The PRs of a report come from a handful of repos
+        self.repo_slug = sys.intern(self.repo_slug)
+        self.uid = f"{self.repo_slug}/pull/{self.number}"
 
     @property
     def last_change_ago(self) -> str:
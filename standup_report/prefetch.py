@@ -0,0 +1,202 @@
+import logging
+import random
+import time
+from concurrent.futures import wait
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from functools import cache
+from threading import Event
+from threading import Thread
+from zoneinfo import ZoneInfo
+
+from standup_report import history_sync
+from standup_report.cron import CronSchedule
+from standup_report.google import submit_calendar_events
+from standup_report.report_sources import ReportSources
+from standup_report.report_sources import start_report_sources
+from standup_report.report_window import window_for_hours
+from standup_report.settings import PrefetchSettings
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# How long one run may take, fetches that are still going are then left to the cache
+_RUN_TIMEOUT_SECONDS = 120
+# When nothing is scheduled (no standup found), look again after this long
+_IDLE_RECHECK = timedelta(hours=1)
+# After failed runs the interval between runs doubles, up to this
+_MAX_BACKOFF = timedelta(hours=1)
+_IDLE_REASON = "nothing scheduled, looking again later"
+# When planning the next run failed, try again after this long
+_PLAN_RETRY = timedelta(minutes=5)
+_PLAN_FAILED_REASON = "planning failed, trying again later"
+
+
+@dataclass
+class PrefetchStatus:
+    next_run_at: datetime | None = None
+    next_run_reason: str = ""
+    last_run_at: datetime | None = None
+    last_run_seconds: float | None = None
+    last_error: str | None = None
+    runs: int = 0
+    failed_runs: int = 0
+
+
+class PrefetchScheduler:
+    """Warms the report sources in the background, on a cron-like schedule
+    and/or shortly before the standup meeting.
+
+    A run is the same fetch a report load does, with `refresh`, so the results
+    land in the snapshot cache and the history.
+    """
+
+    def __init__(self, prefetch_settings: PrefetchSettings):
+        self.settings = prefetch_settings
+        self.status = PrefetchStatus()
+        self._schedules = [CronSchedule.parse(e) for e in prefetch_settings.SCHEDULE]
+        self._timezone = ZoneInfo(prefetch_settings.TIMEZONE)
+        self._consecutive_failures = 0
+        self._stop = Event()
+        self._thread: Thread | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self._stop.clear()
+        self._thread = Thread(
+            target=self._run_forever, name="standup-report-prefetch", daemon=True
+        )
+        self._thread.start()
+        logger.info(
+            f"Prefetch scheduler started, warming {self.settings.WINDOWS_HOURS}h"
+        )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _run_forever(self) -> None:
+        while not self._stop.is_set():
+            now = datetime.now(UTC)
+            try:
+                run_at, reason = self._plan_next_run(now)
+            except Exception as exc:
+                # A bad plan must not end the thread, and every schedule with it
+                logger.error(f"Could not plan the next prefetch: {exc}", exc_info=exc)
+                self.status.last_error = str(exc)
+                run_at, reason = now + _PLAN_RETRY, _PLAN_FAILED_REASON
+            self.status.next_run_at = run_at
+            self.status.next_run_reason = reason
+            logger.debug(f"Next prefetch at {run_at}: {reason}")
+
+            if self._stop.wait(max(0.0, (run_at - datetime.now(UTC)).total_seconds())):
+                return
+            if reason not in {_IDLE_REASON, _PLAN_FAILED_REASON}:
+                self._run_once()
+
+    def _plan_next_run(self, now: datetime) -> tuple[datetime, str]:
+        local_now = now.astimezone(self._timezone)
+        candidates: list[tuple[datetime, str]] = [
+            (schedule.next_after(local_now), f"schedule `{schedule.expression}`")
+            for schedule in self._schedules
+        ]
+        if standup := self._find_next_standup(now):
+            candidates.append(standup)
+        if not candidates:
+            return now + _IDLE_RECHECK, _IDLE_REASON
+
+        run_at, reason = min(candidates)
+        run_at = max(run_at, self._earliest_next_run()) + timedelta(
+            seconds=random.uniform(0, self.settings.JITTER_SECONDS)
+        )
+        return run_at.astimezone(UTC), reason
+
+    def _earliest_next_run(self) -> datetime:
+        """Never run more often than MIN_INTERVAL_SECONDS, and back off after failures."""
+        if self.status.last_run_at is None:
+            return datetime.now(UTC)
+        interval = timedelta(seconds=self.settings.MIN_INTERVAL_SECONDS)
+        if self._consecutive_failures:
+            interval = min(interval * 2**self._consecutive_failures, _MAX_BACKOFF)
+        return self.status.last_run_at + interval
+
+    def _find_next_standup(self, now: datetime) -> tuple[datetime, str] | None:
+        title = self.settings.STANDUP_MEETING
+        if not title or not get_settings().GOOGLE.is_setup:
+            return None
+
+        before = timedelta(minutes=self.settings.MINUTES_BEFORE_STANDUP)
+        # With the history, upcoming meetings are in the local copy of the calendars
+        find_meetings = (
+            history_sync.meetings_between
+            if get_settings().HISTORY.ENABLED
+            else submit_calendar_events
+        )
+        try:
+            meetings = find_meetings(now, now + timedelta(days=1)).result(
+                timeout=_RUN_TIMEOUT_SECONDS
+            )
+        except Exception as exc:  # noqa: BLE001
+            # Timeouts and upstream errors alike, the cron schedules still apply
+            logger.warning(f"Could not look for the standup meeting: {exc}")
+            return None
+
+        warm_ups = sorted(
+            meeting.start_time - before
+            for meeting in meetings
+            # All-day events have a date only (naive), nothing to warm up before
+            if meeting.start_time.tzinfo is not None
+            and title.lower() in meeting.title.lower()
+            and meeting.start_time - before > now
+        )
+        if not warm_ups:
+            return None
+        return (
+            warm_ups[0],
+            f"{self.settings.MINUTES_BEFORE_STANDUP} min before `{title}`",
+        )
+
+    def _run_once(self) -> None:
+        started = time.monotonic()
+        self.status.last_run_at = datetime.now(UTC)
+        self.status.runs += 1
+        try:
+            for hours in self.settings.WINDOWS_HOURS:
+                _wait_for_sources(
+                    start_report_sources(window_for_hours(hours), refresh=True)
+                )
+        except Exception as exc:  # noqa: BLE001
+            # Whatever happens, the scheduler thread keeps going
+            logger.error(f"Prefetch failed: {exc}")
+            self.status.last_error = str(exc)
+            self.status.failed_runs += 1
+            self._consecutive_failures += 1
+        else:
+            self.status.last_error = None
+            self._consecutive_failures = 0
+        finally:
+            self.status.last_run_seconds = time.monotonic() - started
+            logger.info(f"Prefetch done in {self.status.last_run_seconds:.2f}s")
+
+
+def _wait_for_sources(sources: ReportSources) -> None:
+    futures = [source.future for source in sources.all_sources]
+    done, not_done = wait(futures, timeout=_RUN_TIMEOUT_SECONDS)
+    if not_done:
+        raise TimeoutError(f"{len(not_done)} sources took over {_RUN_TIMEOUT_SECONDS}s")
+    for future in done:
+        if exc := future.exception():
+            raise exc
+
+
+@cache
+def get_prefetch_scheduler() -> PrefetchScheduler:
+    return PrefetchScheduler(get_settings().PREFETCH)
@@ -0,0 +1,48 @@
+import fcntl
+import os
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import cache
+from typing import IO
+
+# Set by gunicorn.conf.py in every worker, to how many workers serve the app
+WORKERS_ENV_VAR = "STANDUP_REPORT_WORKERS"
+
+# The files of the locks held until the process exits, see `hold_file_lock`
+_held_locks: dict[str, IO[str]] = {}
+
+
+@cache
+def worker_count() -> int:
+    return int(os.environ.get(WORKERS_ENV_VAR) or 1)
+
+
+def is_multi_process() -> bool:
+    """Served by several worker processes: they share the databases, but nothing in memory."""
+    return worker_count() > 1
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Held by one thread of one process at a time, waits until it's free."""
+    # Opened anew every time: a lock excludes every other open file, also of this process
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def hold_file_lock(path: str) -> bool:
+    """Take the lock until the process exits, False when another process holds it."""
+    if path in _held_locks:
+        return True
+    lock_file = open(path, "a")  # noqa: SIM115
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+    _held_locks[path] = lock_file
+    return True
@@ -0,0 +1,66 @@
+import logging
+
+import httpx
+
+from standup_report.remote.async_sessions import get_async_client
+from standup_report.remote.base_client import GQLResponse
+from standup_report.remote.base_client import RESTResponse
+from standup_report.remote.base_client import is_idempotent
+from standup_report.remote.base_client import log_gql_query
+from standup_report.remote.base_client import parse_gql_response
+from standup_report.remote.base_client import parse_rest_response
+from standup_report.remote.budget import get_budgets
+from standup_report.remote.resilience import send_with_policy_async
+
+logger = logging.getLogger(__name__)
+
+# Connection errors and timeouts, the same request may well succeed next time
+_RETRYABLE_ERRORS = (httpx.TransportError,)
+
+
+async def post_gql_query_async(
+    *,
+    gql_url: str,
+    headers: dict,
+    query: str,
+    variables: dict | None = None,
+) -> GQLResponse:
+    """`post_gql_query` on the event loop, it raises the same RemoteExceptions."""
+    log_gql_query(gql_url, variables)
+    budget = get_budgets().for_request(gql_url, headers)
+    response = await send_with_policy_async(
+        gql_url,
+        budget,
+        lambda timeout: get_async_client(gql_url).post(
+            gql_url,
+            json={"query": query, "variables": variables or {}},
+            headers=headers,
+            timeout=timeout,
+        ),
+        idempotent=is_idempotent(query),
+        retryable_errors=_RETRYABLE_ERRORS,
+    )
+    return parse_gql_response(response, budget, query=query, variables=variables)
+
+
+async def get_rest_response_async(
+    *,
+    full_url: str,
+    headers: dict,
+    params: dict | None = None,
+) -> RESTResponse:
+    """`get_rest_response` on the event loop, it raises the same RemoteExceptions."""
+    logger.info(f"GET {full_url} {params=}")
+    response = await send_with_policy_async(
+        full_url,
+        get_budgets().for_request(full_url, headers),
+        lambda timeout: get_async_client(full_url).get(
+            full_url,
+            headers=headers,
+            params=params,
+            timeout=timeout,
+        ),
+        idempotent=True,
+        retryable_errors=_RETRYABLE_ERRORS,
+    )
+    return parse_rest_response(response, full_url=full_url, params=params)
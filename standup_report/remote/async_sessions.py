@@ -0,0 +1,54 @@
+import asyncio
+import logging
+from http.cookiejar import CookieJar
+from http.cookiejar import DefaultCookiePolicy
+from urllib.parse import urlsplit
+from weakref import WeakKeyDictionary
+
+import httpx
+
+from standup_report.remote.deadline import DEFAULT_TIMEOUT
+from standup_report.remote.sessions import PROVIDER_HOSTS
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# event loop -> host -> client, a client's connections belong to the loop that opened them
+_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, httpx.AsyncClient]] = (
+    WeakKeyDictionary()
+)
+
+
+def get_async_client(url: str) -> httpx.AsyncClient:
+    """The long-lived async client of the provider `url` belongs to, in the running event loop.
+
+    With HTTP/2 the concurrent requests of all reports share one connection per provider.
+    """
+    host = urlsplit(url).netloc
+    clients = _clients.setdefault(asyncio.get_running_loop(), {})
+    if (client := clients.get(host)) is None:
+        client = clients[host] = _create_client(host)
+    return client
+
+
+def _create_client(host: str) -> httpx.AsyncClient:
+    provider = PROVIDER_HOSTS.get(host, host)
+    pool_size = get_settings().REMOTE.pool_size_for(provider)
+    logger.debug(f"New async HTTP client for {provider}, up to {pool_size} connections")
+    # We only call token-authenticated APIs, there are no cookies to keep
+    no_cookies = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    return httpx.AsyncClient(
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=pool_size, max_keepalive_connections=pool_size
+        ),
+        timeout=DEFAULT_TIMEOUT,
+        cookies=httpx.Cookies(no_cookies),
+    )
+
+
+async def close_async_clients() -> None:
+    """Close the clients of the running event loop."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.aclose()
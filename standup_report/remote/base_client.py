@@ -3,25 +3,27 @@ from __future__ import annotations
 import logging
 from dataclasses import dataclass
 
-import requests
-from requests import Response
-
 from standup_report.exceptions import RemoteException
+from standup_report.remote.budget import ProviderBudget
+from standup_report.remote.budget import get_budgets
+from standup_report.remote.resilience import send_with_policy
+from standup_report.remote.response_utils import HTTPResponse
 from standup_report.remote.response_utils import check_status_code_of_response
 from standup_report.remote.response_utils import extract_json_body
+from standup_report.remote.sessions import get_session
 
 logger = logging.getLogger(__name__)
 
 
 @dataclass
 class GQLResponse:
-    response: Response
+    response: HTTPResponse
     data: dict
 
 
 @dataclass
 class RESTResponse:
-    response: Response
+    response: HTTPResponse
     data: dict
 
 
@@ -32,6 +34,23 @@ def post_gql_query(
     query: str,
     variables: dict | None = None,
 ) -> GQLResponse:
+    log_gql_query(gql_url, variables)
+    budget = get_budgets().for_request(gql_url, headers)
+    response = send_with_policy(
+        gql_url,
+        budget,
+        lambda timeout: get_session(gql_url).post(
+            url=gql_url,
+            json={"query": query, "variables": variables or {}},
+            headers=headers,
+            timeout=timeout,
+        ),
+        idempotent=is_idempotent(query),
+    )
+    return parse_gql_response(response, budget, query=query, variables=variables)
+
+
+def log_gql_query(gql_url: str, variables: dict | None) -> None:
     gql_name = (
         gql_url.replace("/graphql", "")
         .replace("https://", "")
@@ -39,17 +58,21 @@ def post_gql_query(
         .replace(".com", "")
     )
     logger.info(f"Calling {gql_name.upper()} GraphQL {variables=}")
-    try:
-        response: Response = requests.post(
-            url=gql_url,
-            json={"query": query, "variables": variables or {}},
-            headers=headers,
-            timeout=30,
-        )
-    except Exception as exc:
-        logger.warning(f"Exception occurred: {exc}", exc_info=exc)
-        raise RemoteException(f"Request to `{gql_name}` raised an exception") from exc
 
+
+def is_idempotent(query: str) -> bool:
+    # Queries only read, sending one twice is harmless
+    return not query.lstrip().startswith("mutation")
+
+
+def parse_gql_response(
+    response: HTTPResponse,
+    budget: ProviderBudget,
+    *,
+    query: str,
+    variables: dict | None,
+) -> GQLResponse:
+    """The data of a GraphQL response, or a RemoteException with what went wrong."""
     check_status_code_of_response(response)
     response_data, json_err = extract_json_body(response)
 
@@ -63,6 +86,8 @@ def post_gql_query(
 
     gql_data: dict | None = response_data.get("data")
     gql_errors: list[dict] | None = response_data.get("errors")
+    if gql_data:
+        budget.record_graphql_rate_limit(gql_data.get("rateLimit"))
 
     if gql_data is None:
         raise RemoteException(
@@ -91,17 +116,24 @@ def get_rest_response(
 ) -> RESTResponse:
     """Make a GET request to a REST API."""
     logger.info(f"GET {full_url} {params=}")
-    try:
-        response: Response = requests.get(
+    response = send_with_policy(
+        full_url,
+        get_budgets().for_request(full_url, headers),
+        lambda timeout: get_session(full_url).get(
             url=full_url,
             headers=headers,
             params=params,
-            timeout=30,
-        )
-    except Exception as exc:
-        logger.warning(f"Exception occurred: {exc}", exc_info=exc)
-        raise RemoteException(f"Request to `{full_url}` raised an exception") from exc
+            timeout=timeout,
+        ),
+        idempotent=True,
+    )
+    return parse_rest_response(response, full_url=full_url, params=params)
 
+
+def parse_rest_response(
+    response: HTTPResponse, *, full_url: str, params: dict | None
+) -> RESTResponse:
+    """The JSON body of a REST response, or a RemoteException with what went wrong."""
     check_status_code_of_response(response)
     response_data, json_err = extract_json_body(response)
 
@@ -0,0 +1,302 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections import deque
+from collections.abc import Iterator
+from collections.abc import Mapping
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from functools import cache
+from http import HTTPStatus
+from threading import Lock
+from urllib.parse import urlsplit
+
+from standup_report.exceptions import BudgetExhausted
+from standup_report.exceptions import DeadlineExceeded
+from standup_report.processes import worker_count
+from standup_report.remote.deadline import get_timeout
+from standup_report.remote.response_utils import HTTPResponse
+from standup_report.remote.sessions import PROVIDER_HOSTS
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# The home page shows the spend of this many recent reports
+_RECENT_REPORTS = 5
+# Without a Retry-After, a provider that throttled us is left alone this long
+_DEFAULT_RETRY_AFTER = timedelta(minutes=1)
+# Epoch timestamps above this are in milliseconds (Linear), below in seconds (GitHub)
+_EPOCH_MILLISECONDS_FROM = 10**11
+
+
+@dataclass
+class Quota:
+    """One rate limit of a provider, as its last response reported it."""
+
+    name: str  # e.g. "graphql" or "search" on GitHub, "requests" or "complexity" on Linear
+    limit: int | None
+    remaining: int
+    reset_at: datetime | None
+
+    @property
+    def is_reset(self) -> bool:
+        return self.reset_at is not None and self.reset_at <= datetime.now(UTC)
+
+    @property
+    def is_used_up(self) -> bool:
+        # Without a reset time we can't know when to try again, the provider decides
+        return self.remaining <= 0 and self.reset_at is not None and not self.is_reset
+
+    def is_below(self, reserve: float) -> bool:
+        if self.is_reset or self.limit is None:
+            return False
+        return self.remaining < self.limit * reserve
+
+
+@dataclass
+class ReportSpend:
+    """What one report cost, per provider."""
+
+    label: str
+    started_at: datetime
+    requests: dict[str, int] = field(default_factory=dict)
+    cost: dict[str, int] = field(default_factory=dict)
+    _lock: Lock = field(default_factory=Lock, repr=False, compare=False)
+
+    def add(self, provider: str, *, requests: int, cost: int) -> None:
+        with self._lock:
+            self.requests[provider] = self.requests.get(provider, 0) + requests
+            self.cost[provider] = self.cost.get(provider, 0) + cost
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average, and bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = Lock()
+
+    def take(self, max_wait: float) -> float | None:
+        """Take a token, and return how long to wait before using it.
+
+        None if that would be longer than `max_wait`, no token is taken then.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated_at) * self.rate
+            )
+            self._updated_at = now
+
+            wait = max(0.0, (1 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            self._tokens -= 1
+            return wait
+
+
+class ProviderBudget:
+    """The rate limits of one provider and token, and what we spent of them."""
+
+    def __init__(self, provider: str, token_id: str):
+        remote_settings = get_settings().REMOTE
+        # Every worker process has a bucket of its own, together they keep to the rate
+        rate = remote_settings.requests_per_second_for(provider) / worker_count()
+        self.provider = provider
+        self.token_id = token_id
+        self.quotas: dict[str, Quota] = {}
+        self.blocked_until: datetime | None = None
+        self.requests = 0
+        self.cost = 0
+        self._reserve = remote_settings.BUDGET_RESERVE
+        self._bucket = TokenBucket(rate=rate, capacity=2 * rate)
+        self._lock = Lock()
+
+    @property
+    def is_blocked(self) -> bool:
+        blocked_until = self.blocked_until
+        return blocked_until is not None and blocked_until > datetime.now(UTC)
+
+    @property
+    def is_low(self) -> bool:
+        """Whether reports should make do with cached data, until the quota resets."""
+        return self.is_blocked or any(
+            quota.is_below(self._reserve) for quota in self.quotas.values()
+        )
+
+    def before_request(self, url: str) -> None:
+        """Wait for our turn, or fail right away if the provider would refuse anyway."""
+        if wait := self._take_turn(url):
+            logger.debug(f"Throttling {self.provider} request for {wait:.2f}s")
+            time.sleep(wait)
+
+    async def before_request_async(self, url: str) -> None:
+        """`before_request`, waiting for our turn without blocking the event loop."""
+        if wait := self._take_turn(url):
+            logger.debug(f"Throttling {self.provider} request for {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    def _take_turn(self, url: str) -> float:
+        """How long to wait before the request may be sent."""
+        if self.is_blocked:
+            raise BudgetExhausted(
+                f"{self.provider} rate limit hit, not calling it until {self.blocked_until}",
+                url=url,
+            )
+        if exhausted := [q for q in self.quotas.values() if q.is_used_up]:
+            raise BudgetExhausted(
+                f"{self.provider} `{exhausted[0].name}` quota is used up "
+                f"until {exhausted[0].reset_at}",
+                url=url,
+            )
+
+        max_wait = get_timeout(url)
+        wait = self._bucket.take(max_wait)
+        if wait is None:
+            raise DeadlineExceeded(f"Throttled, no time left to call `{url}`", url=url)
+        return wait
+
+    def record_response(self, response: HTTPResponse) -> None:
+        """Read the quotas from the rate-limit headers, also of failed responses."""
+        headers = response.headers
+        with self._lock:
+            for quota in _parse_rate_limit_headers(headers):
+                self.quotas[quota.name] = quota
+
+            if response.status_code in {
+                HTTPStatus.TOO_MANY_REQUESTS,
+                HTTPStatus.FORBIDDEN,
+            } and ("Retry-After" in headers or _has_used_up_quota(headers)):
+                retry_after = headers.get("Retry-After")
+                self.blocked_until = datetime.now(UTC) + (
+                    timedelta(seconds=int(retry_after))
+                    if retry_after and retry_after.isdigit()
+                    else _DEFAULT_RETRY_AFTER
+                )
+                logger.warning(
+                    f"{self.provider} is throttling us until {self.blocked_until}"
+                )
+        # Linear reports the complexity of every query
+        self._spend(requests=1, cost=int(headers.get("X-Complexity") or 0))
+
+    def record_graphql_rate_limit(self, rate_limit: dict | None) -> None:
+        """GitHub's `rateLimit { cost remaining resetAt }`, when the query selects it."""
+        if not rate_limit:
+            return
+        with self._lock:
+            known = self.quotas.get("graphql")
+            self.quotas["graphql"] = Quota(
+                name="graphql",
+                limit=rate_limit.get("limit") or (known.limit if known else None),
+                remaining=int(rate_limit["remaining"]),
+                reset_at=datetime.fromisoformat(rate_limit["resetAt"]),
+            )
+        self._spend(requests=0, cost=int(rate_limit.get("cost", 0)))
+
+    def _spend(self, *, requests: int, cost: int) -> None:
+        with self._lock:
+            self.requests += requests
+            self.cost += cost
+        if (report := _report_spend.get()) is not None:
+            report.add(self.provider, requests=requests, cost=cost)
+
+
+class RateLimitBudgets:
+    """The budgets of all providers and tokens of the process."""
+
+    def __init__(self) -> None:
+        self.recent_reports: deque[ReportSpend] = deque(maxlen=_RECENT_REPORTS)
+        self._budgets: dict[tuple[str, str], ProviderBudget] = {}
+        self._lock = Lock()
+
+    @property
+    def budgets(self) -> list[ProviderBudget]:
+        return sorted(self._budgets.values(), key=lambda b: b.provider)
+
+    def for_request(self, url: str, headers: dict) -> ProviderBudget:
+        host = urlsplit(url).netloc
+        provider = PROVIDER_HOSTS.get(host, host)
+        # Quotas are per token, but tokens are secrets: they're told apart by a hash
+        token_id = hashlib.sha256(
+            str(headers.get("Authorization", "")).encode()
+        ).hexdigest()[:8]
+        key = (provider, token_id)
+        if budget := self._budgets.get(key):
+            return budget
+        with self._lock:
+            if key not in self._budgets:
+                self._budgets[key] = ProviderBudget(provider, token_id)
+            return self._budgets[key]
+
+    def is_low(self, provider: str) -> bool:
+        return any(
+            budget.is_low
+            for (name, _), budget in self._budgets.items()
+            if name == provider
+        )
+
+    @contextmanager
+    def track_report(self, label: str) -> Iterator[ReportSpend]:
+        """Count what the requests started in this block cost, also on worker threads."""
+        spend = ReportSpend(label=label, started_at=datetime.now(UTC))
+        self.recent_reports.appendleft(spend)
+        token = _report_spend.set(spend)
+        try:
+            yield spend
+        finally:
+            _report_spend.reset(token)
+
+
+# The report the requests of the current context are made for
+_report_spend: ContextVar[ReportSpend | None] = ContextVar("report_spend", default=None)
+
+
+@cache
+def get_budgets() -> RateLimitBudgets:
+    return RateLimitBudgets()
+
+
+def _parse_rate_limit_headers(headers: Mapping[str, str]) -> list[Quota]:
+    """GitHub's `X-RateLimit-*` (of `X-RateLimit-Resource`), and
+    Linear's `X-RateLimit-Requests-*` and `X-RateLimit-Complexity-*`."""
+    get = headers.get
+    quotas = []
+    for prefix, name in [
+        ("X-RateLimit-", get("X-RateLimit-Resource") or "requests"),
+        ("X-RateLimit-Requests-", "requests"),
+        ("X-RateLimit-Complexity-", "complexity"),
+    ]:
+        remaining = get(f"{prefix}Remaining")
+        if remaining is None:
+            continue
+        limit = get(f"{prefix}Limit")
+        reset = get(f"{prefix}Reset")
+        quotas.append(
+            Quota(
+                name=name,
+                limit=int(limit) if limit else None,
+                remaining=int(remaining),
+                reset_at=_parse_epoch(reset) if reset else None,
+            )
+        )
+    return quotas
+
+
+def _parse_epoch(value: str) -> datetime:
+    timestamp = int(value)
+    if timestamp >= _EPOCH_MILLISECONDS_FROM:
+        timestamp //= 1000
+    return datetime.fromtimestamp(timestamp, tz=UTC)
+
+
+def _has_used_up_quota(headers: Mapping[str, str]) -> bool:
+    return any(quota.remaining <= 0 for quota in _parse_rate_limit_headers(headers))
@@ -0,0 +1,42 @@
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from standup_report.exceptions import DeadlineExceeded
+
+DEFAULT_TIMEOUT = 30  # seconds
+
+# Monotonic time by which the current source must have its answer.
+# The shared executor copies the context into every task, so it also applies
+# to the requests a source makes from worker threads.
+_deadline: ContextVar[float | None] = ContextVar("remote_deadline", default=None)
+
+
+@contextmanager
+def remote_deadline(seconds: float) -> Iterator[None]:
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> float | None:
+    """Seconds until the deadline of the current context, None without one."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def get_timeout(url: str) -> float:
+    """Timeout for the next request: the default, cut down to what is left of the deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return DEFAULT_TIMEOUT
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"No time left to call `{url}`", url=url)
+    return min(DEFAULT_TIMEOUT, remaining)
@@ -0,0 +1,449 @@
+import logging
+import re
+from collections.abc import Iterable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from dataclasses import field
+from pathlib import Path
+
+import click
+
+from standup_report.exceptions import StandupReportError
+
+logger = logging.getLogger(__name__)
+
+PACKAGE_DIR = Path(__file__).parent.parent
+# provider -> the directory of its queries, and the schema they're validated against
+PROVIDER_SCHEMAS = {
+    "github": "standup_report/github/schema.docs.graphql",
+    "linear": "standup_report/linear/schema_docs.graphql",
+}
+# The estimated cost each query may have, raise it only on purpose.
+# GitHub queries are estimated in nodes, Linear ones in complexity points.
+COST_BUDGETS = {
+    "standup_report/github/done_and_open_prs.graphql": 200,
+    "standup_report/github/prs.graphql": 100,
+    # The Linear activity is fetched for several users at once, every node selects
+    # the creator/assignee/commenter it is split on.
+    "standup_report/linear/activity.graphql": 22_000,
+    "standup_report/linear/activity_and_open_issues.graphql": 29_000,
+    "standup_report/linear/open_issues.graphql": 7_000,
+}
+# Page sizes passed as variables are assumed to be the default `remote.page_size`
+VARIABLE_PAGE_SIZE = 100
+_PAGE_SIZE_ARGS = {"first", "last"}
+
+# Commas are insignificant in GraphQL, like whitespace and comments
+_IGNORED = r"[\s,]+|#[^\n]*"
+_TOKEN = re.compile(
+    rf'(?:{_IGNORED})|("""(?:[^"\\]|\\.|"(?!""))*"""|"(?:[^"\\\n]|\\.)*"'
+    r"|\.\.\.|[!$&()\[\]{}:=@|]|-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?|[_A-Za-z]\w*)"
+)
+_WORD_EDGE = re.compile(r"\w")
+
+
+class GQLSyntaxError(StandupReportError):
+    """Raised when a bundled .graphql file can't be parsed"""
+
+
+@dataclass(frozen=True)
+class QueryCost:
+    """A static estimate of what an operation costs, with all `@include`s included."""
+
+    nodes: int  # GitHub: every node the connections can return
+    complexity: float  # Linear: 0.1 per scalar, 1 per object, times the page size
+
+
+@dataclass
+class _Selection:
+    name: str
+    page_size: int | str | None = None  # of connections, str if it's a variable
+    children: list["_Selection"] = field(default_factory=list)
+    spreads: list[str] = field(default_factory=list)  # fragment names
+
+
+@dataclass
+class _CostNode:
+    """A selection with the fragments expanded and the page size known."""
+
+    name: str
+    page_size: int | None
+    children: list["_CostNode"]
+
+
+@dataclass
+class GQLFile:
+    path: str  # from the root of the project, e.g. standup_report/github/prs.graphql
+    provider: str
+    text: str  # minified
+    operations: dict[str, list[_Selection]]
+    fragments: dict[str, list[_Selection]]
+    spreads: set[str]  # fragment names the file uses
+
+    @property
+    def is_fragment_file(self) -> bool:
+        return not self.operations
+
+
+def minify(text: str) -> str:
+    """The same document, without comments and without whitespace that isn't needed."""
+    return _join(_tokenize(text, path="<text>"))
+
+
+def get_query(*file_paths: str) -> str:
+    """One minified document from the registered files, e.g. a query and its fragments."""
+    return "\n".join(_get_file(file_path).text for file_path in file_paths)
+
+
+def registered_files() -> list[GQLFile]:
+    return sorted(_REGISTRY.values(), key=lambda f: f.path)
+
+
+def estimate_cost(gql_file: GQLFile, page_size: int = VARIABLE_PAGE_SIZE) -> QueryCost:
+    """The cost of the operations of `gql_file`, with the fragments of its provider."""
+    fragments = {
+        name: selections
+        for other in _REGISTRY.values()
+        if other.provider == gql_file.provider
+        for name, selections in other.fragments.items()
+    }
+    nodes = 0
+    complexity = 0.0
+    for selections in gql_file.operations.values():
+        expanded = _expand(selections, fragments, page_size)
+        nodes += _count_nodes(expanded, 1)
+        complexity += _complexity(expanded)
+    return QueryCost(nodes=nodes, complexity=round(complexity, 1))
+
+
+def check_costs() -> list[str]:
+    """The queries that are estimated to cost more than their budget."""
+    problems = []
+    for gql_file in registered_files():
+        if gql_file.is_fragment_file:
+            continue
+        budget = COST_BUDGETS.get(gql_file.path)
+        if budget is None:
+            problems.append(f"{gql_file.path} has no cost budget in COST_BUDGETS")
+            continue
+        cost = estimate_cost(gql_file)
+        estimate = cost.nodes if gql_file.provider == "github" else cost.complexity
+        if estimate > budget:
+            problems.append(
+                f"{gql_file.path} costs about {estimate}, its budget is {budget}"
+            )
+    return problems
+
+
+def validate_against_schemas() -> list[str]:
+    """The errors of every operation, validated against its provider's bundled schema.
+
+    Needs graphql-core, a development dependency.
+    """
+    try:
+        from graphql import build_schema  # noqa: PLC0415
+        from graphql import parse  # noqa: PLC0415
+        from graphql import validate  # noqa: PLC0415
+    except ImportError as exc:
+        raise StandupReportError(
+            "Validating the queries needs graphql-core, install the dev dependencies"
+        ) from exc
+
+    problems: list[str] = []
+    for provider, schema_path in PROVIDER_SCHEMAS.items():
+        logger.info(f"Loading the {provider} schema from {schema_path}")
+        schema = build_schema(
+            (PACKAGE_DIR.parent / schema_path).read_text(encoding="utf-8"),
+            # The published schemas break a few rules themselves, e.g. on deprecations
+            assume_valid_sdl=True,
+            assume_valid=True,
+        )
+        for gql_file in registered_files():
+            if gql_file.provider != provider or gql_file.is_fragment_file:
+                continue
+            document = get_query(gql_file.path, *_fragment_files_of(gql_file))
+            problems.extend(
+                f"{gql_file.path}: {error.message}"
+                for error in validate(schema, parse(document))
+            )
+    return problems
+
+
+@click.command()
+def check_queries() -> None:
+    """Validate the GraphQL queries against the bundled schemas, and estimate their cost.
+
+    Run as `python -m standup_report.remote.gql_registry`, without starting the app.
+    """
+    for gql_file in registered_files():
+        if gql_file.is_fragment_file:
+            continue
+        cost = estimate_cost(gql_file)
+        click.echo(
+            f"{gql_file.path}: ~{cost.nodes} nodes, ~{cost.complexity} complexity"
+        )
+
+    problems = check_costs() + validate_against_schemas()
+    for problem in problems:
+        click.echo(problem, err=True)
+    if problems:
+        raise SystemExit(1)
+    click.echo("All queries are valid")
+
+
+def _get_file(file_path: str) -> GQLFile:
+    try:
+        return _REGISTRY[file_path]
+    except KeyError:
+        raise ValueError(f"No query registered as {file_path=}") from None
+
+
+def _fragment_files_of(gql_file: GQLFile) -> list[str]:
+    """The files that define the fragments `gql_file` uses, also through other fragments."""
+    needed = set(gql_file.spreads)
+    files: list[str] = []
+    while needed:
+        name = needed.pop()
+        other = next(
+            (f for f in _REGISTRY.values() if name in f.fragments),
+            None,
+        )
+        if other is None or other.path in files or other.path == gql_file.path:
+            continue
+        files.append(other.path)
+        needed |= other.spreads
+    return sorted(files)
+
+
+def _tokenize(text: str, *, path: str) -> Iterator[str]:
+    position = 0
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if match is None:
+            line = text.count("\n", 0, position) + 1
+            raise GQLSyntaxError(f"Unexpected `{text[position]}` in {path}:{line}")
+        if match.group(1):
+            yield match.group(1)
+        position = match.end()
+
+
+class _Parser:
+    """Just enough of a GraphQL parser to know the selections and their page sizes."""
+
+    def __init__(self, text: str, path: str):
+        self.tokens = list(_tokenize(text, path=path))
+        self.path = path
+        self.position = 0
+
+    def parse(self, provider: str) -> GQLFile:
+        operations: dict[str, list[_Selection]] = {}
+        fragments: dict[str, list[_Selection]] = {}
+        while not self._at_end():
+            if self._peek() == "fragment":
+                self._next()
+                name = self._next()
+                self._expect("on")
+                self._next()
+                self._skip_directives()
+                fragments[name] = self._selection_set()
+                continue
+
+            name = "anonymous"
+            if self._peek() in {"query", "mutation", "subscription"}:
+                self._next()
+                if self._peek() not in {"(", "@", "{"}:
+                    name = self._next()
+                if self._peek() == "(":
+                    self._skip_balanced("(", ")")
+                self._skip_directives()
+            operations[name] = self._selection_set()
+
+        selections = [*operations.values(), *fragments.values()]
+        return GQLFile(
+            path=self.path,
+            provider=provider,
+            text=_join(self.tokens),
+            operations=operations,
+            fragments=fragments,
+            spreads={spread for sel in selections for spread in _spreads_of(sel)},
+        )
+
+    def _selection_set(self) -> list[_Selection]:
+        self._expect("{")
+        selections: list[_Selection] = []
+        while self._peek() != "}":
+            if self._peek() == "...":
+                self._next()
+                if self._peek() in {"on", "@", "{"}:
+                    # An inline fragment, its fields count as the parent's
+                    if self._peek() == "on":
+                        self._next()
+                        self._next()
+                    self._skip_directives()
+                    selections.extend(self._selection_set())
+                else:
+                    selections.append(_Selection(name="...", spreads=[self._next()]))
+                    self._skip_directives()
+                continue
+
+            name = self._next()
+            if self._peek() == ":":  # it was the alias
+                self._next()
+                name = self._next()
+            selection = _Selection(name=name)
+            if self._peek() == "(":
+                selection.page_size = self._page_size_argument()
+            self._skip_directives()
+            if self._peek() == "{":
+                selection.children = self._selection_set()
+            selections.append(selection)
+        self._next()
+        return selections
+
+    def _page_size_argument(self) -> int | str | None:
+        """Reads the arguments, and returns the `first` or `last` of them."""
+        self._expect("(")
+        page_size: int | str | None = None
+        while self._peek() != ")":
+            name = self._next()
+            self._expect(":")
+            if name in _PAGE_SIZE_ARGS:
+                value = self._next()
+                page_size = self._next() if value == "$" else int(value)
+            else:
+                self._skip_value()
+        self._next()
+        return page_size
+
+    def _skip_value(self) -> None:
+        match self._next():
+            case "$":
+                self._next()
+            case "[":
+                self.position -= 1
+                self._skip_balanced("[", "]")
+            case "{":
+                self.position -= 1
+                self._skip_balanced("{", "}")
+
+    def _skip_directives(self) -> None:
+        while self._peek() == "@":
+            self._next()
+            self._next()
+            if self._peek() == "(":
+                self._skip_balanced("(", ")")
+
+    def _skip_balanced(self, opening: str, closing: str) -> None:
+        self._expect(opening)
+        depth = 1
+        while depth:
+            token = self._next()
+            depth += (token == opening) - (token == closing)
+
+    def _expect(self, token: str) -> None:
+        if (found := self._next()) != token:
+            raise GQLSyntaxError(f"Expected `{token}` in {self.path}, found `{found}`")
+
+    def _peek(self) -> str:
+        if self._at_end():
+            raise GQLSyntaxError(f"Unexpected end of {self.path}")
+        return self.tokens[self.position]
+
+    def _next(self) -> str:
+        token = self._peek()
+        self.position += 1
+        return token
+
+    def _at_end(self) -> bool:
+        return self.position >= len(self.tokens)
+
+
+def _join(tokens: Iterable[str]) -> str:
+    joined: list[str] = []
+    for token in tokens:
+        # Only names and numbers next to each other need a space between them
+        if joined and _WORD_EDGE.match(joined[-1][-1]) and _WORD_EDGE.match(token):
+            joined.append(" ")
+        joined.append(token)
+    return "".join(joined)
+
+
+def _spreads_of(selections: list[_Selection]) -> Iterator[str]:
+    for selection in selections:
+        yield from selection.spreads
+        yield from _spreads_of(selection.children)
+
+
+def _expand(
+    selections: list[_Selection],
+    fragments: dict[str, list[_Selection]],
+    page_size: int,
+) -> list[_CostNode]:
+    """`selections` with the fragment spreads replaced by the fragments' fields."""
+    expanded = []
+    for selection in selections:
+        for spread in selection.spreads:
+            expanded.extend(_expand(fragments.get(spread, []), fragments, page_size))
+        if selection.spreads:
+            continue
+        expanded.append(
+            _CostNode(
+                name=selection.name,
+                page_size=(
+                    page_size
+                    if isinstance(selection.page_size, str)
+                    else selection.page_size
+                ),
+                children=_expand(selection.children, fragments, page_size),
+            )
+        )
+    return expanded
+
+
+def _count_nodes(selections: list[_CostNode], parents: int) -> int:
+    nodes = 0
+    for selection in selections:
+        if selection.page_size is None:
+            nodes += _count_nodes(selection.children, parents)
+            continue
+        returned = parents * selection.page_size
+        nodes += returned + _count_nodes(selection.children, returned)
+    return nodes
+
+
+def _complexity(selections: list[_CostNode]) -> float:
+    complexity = 0.0
+    for selection in selections:
+        if not selection.children:
+            complexity += 0.1
+            continue
+        per_item = 1 + _complexity(selection.children)
+        if selection.name == "nodes":
+            # The items of the connection the parent already multiplied
+            complexity += _complexity(selection.children)
+        elif selection.page_size is not None:
+            complexity += selection.page_size * per_item
+        else:
+            complexity += per_item
+    return complexity
+
+
+def _load_registry() -> dict[str, GQLFile]:
+    registry = {}
+    schema_paths = set(PROVIDER_SCHEMAS.values())
+    for provider in PROVIDER_SCHEMAS:
+        for file in sorted((PACKAGE_DIR / provider).glob("*.graphql")):
+            path = f"standup_report/{provider}/{file.name}"
+            if path in schema_paths:
+                continue
+            text = file.read_text(encoding="utf-8")
+            registry[path] = _Parser(text, path).parse(provider)
+    return registry
+
+
+# Loaded once, a broken query fails the import rather than the first report
+_REGISTRY = _load_registry()
+
+
+if __name__ == "__main__":
+    check_queries()
@@ -1,16 +1,21 @@
-from os.path import abspath
-from os.path import dirname
+from typing import TypedDict
 
-from standup_report.dict_utils import safe_traverse
-
-SOURCE_DIR = dirname(dirname(dirname(abspath(__file__))))
+from standup_report.remote.gql_registry import get_query
 
 THasMorePages = bool
 TAfterCursor = str | None
 
 
-def _get_abs_path(path: str) -> str:
-    return f"{SOURCE_DIR}/{path}"
+class PageInfo(TypedDict):
+    hasNextPage: bool
+    endCursor: str | None
+
+
+class Connection[T](TypedDict):
+    """A paginated result set, `pageInfo` is only there if the query selects it."""
+
+    pageInfo: PageInfo
+    nodes: list[T]
 
 
 def extract_gql_query_from_file(file_path: str) -> str:
@@ -18,12 +23,18 @@ def extract_gql_query_from_file(file_path: str) -> str:
         raise ValueError(
             f"file_path must start from the root of the project, so standup_report/..., {file_path=}"
         )
+    # Read and minified once, when the registry was loaded
+    return get_query(file_path)
+
+
+def extract_gql_query_from_files(*file_paths: str) -> str:
+    """One query document from several files, e.g. a query and the fragments it uses."""
+    return "\n".join(extract_gql_query_from_file(file_path) for file_path in file_paths)
 
-    gql_query: str
-    with open(_get_abs_path(file_path), encoding="utf-8") as f:
-        gql_query = f.read()
 
-    return gql_query
+def connection_nodes[T](connection: Connection[T] | None) -> list[T]:
+    """The nodes of a result set, none if it was left out of the response."""
+    return connection["nodes"] if connection else []
 
 
 def parse_page_info(
@@ -32,7 +43,7 @@ def parse_page_info(
     if item_with_page_info is None:
         return False, None
 
-    page_info: dict | None = safe_traverse(item_with_page_info, "pageInfo")
+    page_info: dict | None = item_with_page_info.get("pageInfo")
     if page_info is None:
         return False, None
 
@@ -0,0 +1,82 @@
+import logging
+from collections.abc import Callable
+from collections.abc import Iterator
+
+from standup_report.executor import submit_page
+from standup_report.remote.base_client import GQLResponse
+from standup_report.remote.gql_utils import TAfterCursor
+from standup_report.remote.gql_utils import THasMorePages
+from standup_report.remote.gql_utils import parse_page_info
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# alias of a paginated field in the query -> cursor of its next page,
+# only for the aliases that still have more pages
+TAliasCursors = dict[str, TAfterCursor]
+
+
+def iter_pages[C, R](
+    fetch_page: Callable[[C], R],
+    first_cursor: C,
+    next_page: Callable[[R, C], tuple[THasMorePages, C]],
+    *,
+    what: str,
+) -> Iterator[R]:
+    """Yield every page of a paginated query, at most `max_pages` of them.
+
+    While the caller processes a page, the next one is already being fetched.
+    """
+    max_pages = get_settings().REMOTE.MAX_PAGES
+    cursor = first_cursor
+    response = fetch_page(cursor)
+    for page_number in range(1, max_pages + 1):
+        has_more_pages, next_cursor = next_page(response, cursor)
+        if has_more_pages and next_cursor == cursor:
+            logger.error(
+                f"{what}: the cursor didn't move, stopping at page {page_number}"
+            )
+            has_more_pages = False
+        elif has_more_pages and page_number == max_pages:
+            logger.warning(
+                f"{what}: stopping after {max_pages} pages, the rest is left out"
+            )
+            has_more_pages = False
+
+        next_response = submit_page(fetch_page, next_cursor) if has_more_pages else None
+        yield response
+        if next_response is None:
+            return
+        cursor = next_cursor
+        response = next_response.result()
+
+
+def alias_page_variables(aliases: list[str], cursors: TAliasCursors) -> dict:
+    """`$<alias>_after` and `$fetch_<alias>` of every alias, finished aliases are left out."""
+    variables: dict = {}
+    for alias in aliases:
+        variables[f"{alias}_after"] = cursors.get(alias)
+        variables[f"fetch_{alias}"] = alias in cursors
+    return variables
+
+
+def next_alias_cursors(
+    response: GQLResponse, cursors: TAliasCursors
+) -> tuple[THasMorePages, TAliasCursors]:
+    next_cursors: TAliasCursors = {}
+    for alias in cursors:
+        has_more_pages, after = parse_page_info(response.data.get(alias))
+        if has_more_pages:
+            next_cursors[alias] = after
+    return bool(next_cursors), next_cursors
+
+
+def page_size(provider_max: int) -> int:
+    return min(get_settings().REMOTE.PAGE_SIZE, provider_max)
+
+
+def next_single_cursor(
+    response: GQLResponse, _: TAfterCursor, *, path: str
+) -> tuple[THasMorePages, TAfterCursor]:
+    """For queries with one paginated field, at `path`."""
+    return parse_page_info(response.data.get(path))
@@ -0,0 +1,414 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import as_completed
+from concurrent.futures import wait
+from datetime import UTC
+from datetime import datetime
+from datetime import timedelta
+from http import HTTPStatus
+from statistics import quantiles
+from threading import Event
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+
+from standup_report.enum_utils import SafeStrEnum
+from standup_report.exceptions import CircuitOpen
+from standup_report.exceptions import RemoteException
+from standup_report.executor import submit_hedge
+from standup_report.remote.budget import ProviderBudget
+from standup_report.remote.deadline import get_timeout
+from standup_report.remote.deadline import time_left
+from standup_report.remote.response_utils import HTTPResponse
+from standup_report.remote.sessions import PROVIDER_HOSTS
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Worth another try, the next attempt likely lands on a healthy upstream node
+RETRYABLE_STATUS_CODES = {
+    HTTPStatus.BAD_GATEWAY,
+    HTTPStatus.SERVICE_UNAVAILABLE,
+    HTTPStatus.GATEWAY_TIMEOUT,
+}
+_RETRYABLE_ERRORS = (requests.ConnectionError, requests.Timeout)
+# The p95 is computed over the latest requests, and only once there are enough of them
+_LATENCY_SAMPLES = 200
+_MIN_LATENCY_SAMPLES = 20
+
+TRequest = Callable[[float], HTTPResponse]  # timeout -> response
+TAsyncRequest = Callable[[float], Awaitable[HTTPResponse]]
+
+# Hedges that lost keep running until they're answered, the event loop only keeps weak references
+_async_hedges: set[asyncio.Task[HTTPResponse]] = set()
+
+
+class CircuitState(SafeStrEnum):
+    CLOSED = "closed"  # healthy, requests go through
+    OPEN = "open"  # failing, requests fail right away
+    HALF_OPEN = "half_open"  # cooled down, one probe request decides
+
+
+class ProviderHealth:
+    """The circuit breaker and the latencies of one provider."""
+
+    def __init__(self, provider: str):
+        remote_settings = get_settings().REMOTE
+        self.provider = provider
+        self.failures = 0  # in a row
+        self.opened_at: datetime | None = None
+        self._failure_threshold = remote_settings.BREAKER_FAILURES
+        self._cooldown = timedelta(seconds=remote_settings.BREAKER_COOLDOWN_SECONDS)
+        self._probing = False
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_SAMPLES)
+        self._lock = Lock()
+
+    @property
+    def state(self) -> CircuitState:
+        opened_at = self.opened_at
+        if opened_at is None:
+            return CircuitState.CLOSED
+        if datetime.now(UTC) - opened_at < self._cooldown:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    @property
+    def open_until(self) -> datetime | None:
+        opened_at = self.opened_at
+        return opened_at + self._cooldown if opened_at is not None else None
+
+    @property
+    def is_unhealthy(self) -> bool:
+        """Whether the circuit is open, or waiting for its probe to succeed."""
+        return self.opened_at is not None
+
+    @property
+    def p95_seconds(self) -> float | None:
+        latencies = list(self._latencies)
+        if len(latencies) < _MIN_LATENCY_SAMPLES:
+            return None
+        return quantiles(latencies, n=20)[-1]
+
+    def before_request(self, url: str) -> None:
+        """Fail right away while the circuit is open, let one probe through after the cooldown."""
+        with self._lock:
+            match self.state:
+                case CircuitState.CLOSED:
+                    return
+                case CircuitState.OPEN:
+                    raise CircuitOpen(
+                        f"{self.provider} keeps failing, not calling it "
+                        f"until {self.open_until:%H:%M:%S} UTC",
+                        url=url,
+                    )
+                case CircuitState.HALF_OPEN if self._probing:
+                    raise CircuitOpen(
+                        f"{self.provider} keeps failing, waiting for the probe request",
+                        url=url,
+                    )
+            self._probing = True
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            self._latencies.append(seconds)
+            if self.opened_at is not None:
+                logger.info(f"{self.provider} answers again, closing its circuit")
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            was_probing = self._probing
+            self._probing = False
+            if was_probing or (
+                self.opened_at is None and self.failures >= self._failure_threshold
+            ):
+                self.opened_at = datetime.now(UTC)
+                logger.warning(
+                    f"{self.provider} failed {self.failures} times in a row, "
+                    f"opening its circuit for {self._cooldown.total_seconds():.0f}s"
+                )
+
+
+_health: dict[str, ProviderHealth] = {}
+_health_lock = Lock()
+
+
+def get_provider_health(provider: str) -> ProviderHealth:
+    if health := _health.get(provider):
+        return health
+    with _health_lock:
+        if provider not in _health:
+            _health[provider] = ProviderHealth(provider)
+        return _health[provider]
+
+
+def all_provider_health() -> list[ProviderHealth]:
+    return sorted(_health.values(), key=lambda h: h.provider)
+
+
+def send_with_policy(
+    url: str, budget: ProviderBudget, request: TRequest, *, idempotent: bool
+) -> HTTPResponse:
+    """Make `request` to `url`, through the provider's circuit breaker and rate limit.
+
+    Idempotent requests are retried after transient failures, with jittered
+    exponential backoff, as long as the deadline allows. With `remote.hedge`,
+    they are also sent a second time when the first attempt is slower than usual.
+    Returns the last response, whatever its status code.
+    """
+    remote_settings = get_settings().REMOTE
+    health = get_provider_health(PROVIDER_HOSTS.get(urlsplit(url).netloc, url))
+    retries = remote_settings.RETRIES if idempotent else 0
+    hedge = idempotent and remote_settings.HEDGE
+
+    for attempt in range(retries + 1):
+        try:
+            response = (
+                _hedged_attempt(url, budget, health, request)
+                if hedge
+                else _attempt(url, budget, health, request)
+            )
+        except RemoteException as exc:
+            delay = _retry_delay_after_error(url, exc, attempt, retries)
+            if delay is None:
+                raise
+        else:
+            delay = _retry_delay_after_response(url, response, attempt, retries)
+            if delay is None:
+                return response
+        time.sleep(delay)
+    raise AssertionError("The last attempt always returns or raises")
+
+
+async def send_with_policy_async(
+    url: str,
+    budget: ProviderBudget,
+    request: TAsyncRequest,
+    *,
+    idempotent: bool,
+    retryable_errors: tuple[type[Exception], ...],
+) -> HTTPResponse:
+    """`send_with_policy` for an async `request`, retrying on `retryable_errors`.
+
+    The waits for the rate limit and before retries don't block the event loop,
+    and a hedge is a second task rather than a second thread.
+    """
+    remote_settings = get_settings().REMOTE
+    health = get_provider_health(PROVIDER_HOSTS.get(urlsplit(url).netloc, url))
+    retries = remote_settings.RETRIES if idempotent else 0
+    hedge = idempotent and remote_settings.HEDGE
+
+    for attempt in range(retries + 1):
+        try:
+            response = await (
+                _hedged_attempt_async(url, budget, health, request)
+                if hedge
+                else _attempt_async(url, budget, health, request)
+            )
+        except RemoteException as exc:
+            delay = _retry_delay_after_error(
+                url, exc, attempt, retries, retryable_errors=retryable_errors
+            )
+            if delay is None:
+                raise
+        else:
+            delay = _retry_delay_after_response(url, response, attempt, retries)
+            if delay is None:
+                return response
+        await asyncio.sleep(delay)
+    raise AssertionError("The last attempt always returns or raises")
+
+
+def _attempt(
+    url: str,
+    budget: ProviderBudget,
+    health: ProviderHealth,
+    request: TRequest,
+    answered: Event | None = None,
+) -> HTTPResponse:
+    budget.before_request(url)
+    if answered is not None and answered.is_set():
+        # A hedge that waited for its turn, while the other attempt got the answer
+        raise RemoteException(f"Request to `{url}` already answered", url=url)
+    timeout = get_timeout(url)
+    # Last, a probe that is let through has to be sent
+    health.before_request(url)
+    started = time.monotonic()
+    try:
+        response = request(timeout)
+    except Exception as exc:
+        raise _failed_request(url, health, exc) from exc
+    _record_response(budget, health, response, started)
+    return response
+
+
+async def _attempt_async(
+    url: str,
+    budget: ProviderBudget,
+    health: ProviderHealth,
+    request: TAsyncRequest,
+    answered: asyncio.Event | None = None,
+) -> HTTPResponse:
+    await budget.before_request_async(url)
+    if answered is not None and answered.is_set():
+        raise RemoteException(f"Request to `{url}` already answered", url=url)
+    timeout = get_timeout(url)
+    health.before_request(url)
+    started = time.monotonic()
+    try:
+        response = await request(timeout)
+    except Exception as exc:
+        raise _failed_request(url, health, exc) from exc
+    _record_response(budget, health, response, started)
+    return response
+
+
+def _failed_request(
+    url: str, health: ProviderHealth, exc: Exception
+) -> RemoteException:
+    health.record_failure()
+    logger.warning(f"Exception occurred: {exc}", exc_info=exc)
+    return RemoteException(f"Request to `{url}` raised an exception")
+
+
+def _record_response(
+    budget: ProviderBudget,
+    health: ProviderHealth,
+    response: HTTPResponse,
+    started: float,
+) -> None:
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        health.record_failure()
+    else:
+        # 4xx are our mistake or the rate limit, the provider itself is fine
+        health.record_success(time.monotonic() - started)
+    budget.record_response(response)
+
+
+def _hedged_attempt(
+    url: str, budget: ProviderBudget, health: ProviderHealth, request: TRequest
+) -> HTTPResponse:
+    """An attempt that is sent again, if it takes longer than the provider's p95."""
+    p95 = health.p95_seconds
+    if p95 is None or budget.is_low:
+        # No idea yet what is slow, or no quota to spare for the same request twice
+        return _attempt(url, budget, health, request)
+
+    answered = Event()
+    first = submit_hedge(_attempt, url, budget, health, request, answered)
+    done, _ = wait([first], timeout=p95)
+    if done:
+        return first.result()
+
+    logger.info(f"Request to `{url}` is slower than its p95 of {p95:.2f}s, hedging")
+    attempts: list[Future[HTTPResponse]] = [
+        first,
+        submit_hedge(_attempt, url, budget, health, request, answered),
+    ]
+    for finished in as_completed(attempts):
+        if finished.exception() is None:
+            # The first answer wins, the other request is left to finish on its own
+            answered.set()
+            return finished.result()
+    return first.result()
+
+
+async def _hedged_attempt_async(
+    url: str, budget: ProviderBudget, health: ProviderHealth, request: TAsyncRequest
+) -> HTTPResponse:
+    """`_hedged_attempt`, with the attempts as tasks of the event loop."""
+    p95 = health.p95_seconds
+    if p95 is None or budget.is_low:
+        return await _attempt_async(url, budget, health, request)
+
+    answered = asyncio.Event()
+    first = _start_hedge(_attempt_async(url, budget, health, request, answered))
+    done, _ = await asyncio.wait([first], timeout=p95)
+    if done:
+        return first.result()
+
+    logger.info(f"Request to `{url}` is slower than its p95 of {p95:.2f}s, hedging")
+    attempts = [
+        first,
+        _start_hedge(_attempt_async(url, budget, health, request, answered)),
+    ]
+    for finished in asyncio.as_completed(attempts):
+        try:
+            response = await finished
+        except RemoteException:
+            continue
+        # The first answer wins, the other request is left to finish on its own
+        answered.set()
+        return response
+    return first.result()
+
+
+def _start_hedge(
+    attempt: Awaitable[HTTPResponse],
+) -> asyncio.Task[HTTPResponse]:
+    task = asyncio.ensure_future(attempt)
+    _async_hedges.add(task)
+    task.add_done_callback(_forget_hedge)
+    return task
+
+
+def _forget_hedge(task: asyncio.Task[HTTPResponse]) -> None:
+    _async_hedges.discard(task)
+    if not task.cancelled():
+        # The loser's error was logged by its attempt, it's not raised again
+        task.exception()
+
+
+def _retry_delay_after_error(
+    url: str,
+    exc: RemoteException,
+    attempt: int,
+    retries: int,
+    *,
+    retryable_errors: tuple[type[Exception], ...] = _RETRYABLE_ERRORS,
+) -> float | None:
+    if attempt == retries or not isinstance(exc.__cause__, retryable_errors):
+        return None
+    return _retry_delay(url, attempt, retries, str(exc.__cause__))
+
+
+def _retry_delay_after_response(
+    url: str, response: HTTPResponse, attempt: int, retries: int
+) -> float | None:
+    if attempt == retries or response.status_code not in RETRYABLE_STATUS_CODES:
+        return None
+    return _retry_delay(url, attempt, retries, f"status code {response.status_code}")
+
+
+def _retry_delay(url: str, attempt: int, retries: int, failure: str) -> float | None:
+    """How long to wait before the next attempt, None if the deadline doesn't leave time for it."""
+    delay = _backoff(attempt)
+    remaining = time_left()
+    if remaining is not None and remaining <= delay:
+        logger.warning(f"Request to `{url}` failed ({failure}), no time left to retry")
+        return None
+    logger.warning(
+        f"Request to `{url}` failed ({failure}), "
+        f"retry {attempt + 1}/{retries} in {delay:.2f}s"
+    )
+    return delay
+
+
+def _backoff(attempt: int) -> float:
+    """Full jitter: a random wait of up to the exponential backoff of `attempt`."""
+    remote_settings = get_settings().REMOTE
+    cap = min(
+        remote_settings.MAX_BACKOFF_SECONDS,
+        remote_settings.BACKOFF_SECONDS * 2**attempt,
+    )
+    return random.uniform(0, cap)
@@ -1,29 +1,59 @@
-from requests import Response
+import json
+from collections.abc import Mapping
+from http import HTTPStatus
+from typing import Any
+from typing import Protocol
 
 from standup_report.exceptions import RemoteException
 
 
-def check_status_code_of_response(response: Response) -> None:
+class HTTPResponse(Protocol):
+    """What is read of a response, of `requests` or of `httpx`."""
+
+    @property
+    def status_code(self) -> int: ...
+
+    @property
+    def text(self) -> str: ...
+
+    @property
+    def content(self) -> bytes: ...
+
+    @property
+    def headers(self) -> Mapping[str, str]: ...
+
+    @property
+    def request(self) -> Any: ...
+
+
+def check_status_code_of_response(response: HTTPResponse) -> None:
     if 200 <= response.status_code <= 299:
         return
+    if response.status_code == HTTPStatus.NOT_MODIFIED:
+        # Only conditional requests get it, and they check for it
+        return
 
     short_response_text: str = str(response.text)[:200]
 
     raise RemoteException(
         f"Provider returned code: {response.status_code} "
         f"for {response.request.method} url {response.request.url}. "
-        f"Response.text: {short_response_text}"
+        f"Response.text: {short_response_text}",
+        status_code=response.status_code,
     )
 
 
-def extract_json_body(response: Response) -> tuple[dict | None, ValueError | None]:
-    if response.status_code in {201, 204} and len(response.content) == 0:
+def extract_json_body(response: HTTPResponse) -> tuple[dict | None, ValueError | None]:
+    if response.status_code in {201, 204, 304} and len(response.content) == 0:
         # 204 means No data, so there will be nothing to turn into a JSON
         # 201 is often implemented without body
+        # 304 means Not Modified, the caller already has the data
         return {}, None
 
     try:
-        response_data: dict = response.json()
+        # Straight from the bytes, json detects the UTF encoding itself, cheaper than
+        # response.json() guessing it and decoding the whole body to a str first
+        response_data: dict = json.loads(response.content)
         return response_data, None
     except ValueError as exc:
         return None, exc
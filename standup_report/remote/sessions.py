@@ -0,0 +1,78 @@
+import logging
+from http.cookiejar import DefaultCookiePolicy
+from threading import Lock
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+# host -> provider, as named in `remote.pool_sizes` and `remote.prewarm`
+PROVIDER_HOSTS = {
+    "api.github.com": "github",
+    "api.linear.app": "linear",
+    "www.googleapis.com": "google",
+}
+_WARM_UP_TIMEOUT_SECONDS = 5
+
+_sessions: dict[str, requests.Session] = {}
+_sessions_lock = Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """The long-lived session of the provider `url` belongs to.
+
+    Its connections are kept alive and shared by all threads, so only the first
+    call to a provider pays for the TCP and TLS handshakes.
+    """
+    host = urlsplit(url).netloc
+    if session := _sessions.get(host):
+        return session
+    with _sessions_lock:
+        if host not in _sessions:
+            _sessions[host] = _create_session(host)
+        return _sessions[host]
+
+
+def _create_session(host: str) -> requests.Session:
+    provider = PROVIDER_HOSTS.get(host, host)
+    pool_size = get_settings().REMOTE.pool_size_for(provider)
+    logger.debug(f"New HTTP session for {provider}, keeping {pool_size} connections")
+
+    session = requests.Session()
+    # We only call token-authenticated APIs, so there are no cookies to share between threads
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    # Threads beyond the pool size still get a connection, it's just not kept
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount(f"https://{host}", adapter)
+    return session
+
+
+def warm_up_session(provider: str) -> None:
+    """Open a connection to `provider` ahead of the first real request."""
+    hosts = [host for host, name in PROVIDER_HOSTS.items() if name == provider]
+    if not hosts:
+        logger.warning(
+            f"Unknown provider `{provider}` in remote.prewarm, "
+            f"use one of {', '.join(PROVIDER_HOSTS.values())}"
+        )
+        return
+    if hosts[0] in _sessions:
+        return  # already connected
+    url = f"https://{hosts[0]}/"
+    try:
+        get_session(url).head(url, timeout=_WARM_UP_TIMEOUT_SECONDS)
+    except requests.RequestException as exc:
+        logger.warning(f"Could not warm up the connection to {provider}: {exc}")
+        return
+    logger.info(f"Connection to {provider} is warm")
+
+
+def close_sessions() -> None:
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,422 @@
+import logging
+import time
+from collections.abc import Callable
+from collections.abc import Hashable
+from collections.abc import Iterable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from operator import itemgetter
+from typing import Any
+
+from standup_report import github
+from standup_report import history_sync
+from standup_report import linear
+from standup_report.calendar_type import Meeting
+from standup_report.date_utils import ago
+from standup_report.exceptions import DeadlineExceeded
+from standup_report.exceptions import SettingsError
+from standup_report.exceptions import StandupReportError
+from standup_report.executor import submit
+from standup_report.executor import then
+from standup_report.google import submit_calendar_events
+from standup_report.google import submit_team_meetings
+from standup_report.issue_type import Issue
+from standup_report.issue_type import IssueActivity
+from standup_report.local_data import LocalData
+from standup_report.local_data import get_local_data_index
+from standup_report.pr_type import PR
+from standup_report.remote.budget import get_budgets
+from standup_report.remote.deadline import remote_deadline
+from standup_report.remote.resilience import CircuitState
+from standup_report.remote.resilience import get_provider_health
+from standup_report.report_window import ReportWindow
+from standup_report.settings import get_settings
+from standup_report.snapshot_cache import get_snapshot_cache
+
+logger = logging.getLogger(__name__)
+
+_GITHUB = "GitHub"
+_LINEAR = "Linear"
+_GOOGLE = "Google"
+_STORAGE = "DuckDB"
+
+
+@dataclass
+class Source[T]:
+    """One in-flight input of a report, with the time by which it has to arrive."""
+
+    provider: str
+    future: Future[T]
+    deadline: float  # time.monotonic()
+    deadline_seconds: float
+    fetched_at: datetime | None = None  # set if the result comes from the cache
+    is_stale: bool = False
+
+    @property
+    def is_settled(self) -> bool:
+        """Either arrived, failed or is too late to wait for."""
+        return self.future.done() or time.monotonic() >= self.deadline
+
+    @property
+    def error(self) -> BaseException | None:
+        if not self.is_settled:
+            return None
+        if not self.future.done():
+            return self._missed_deadline()
+        return self.future.exception()
+
+    @property
+    def stale_note(self) -> str | None:
+        if not self.is_stale or self.fetched_at is None:
+            return None
+        return f"{self.provider} data is from {ago(self.fetched_at)}, refreshing in the background"
+
+    def result(self) -> T:
+        try:
+            return self.future.result(timeout=max(0, self.deadline - time.monotonic()))
+        except FutureTimeoutError:
+            raise self._missed_deadline() from None
+
+    def result_or(self, default: T) -> T:
+        """The result, or `default` when the source failed or missed its deadline."""
+        try:
+            return self.result()
+        except StandupReportError as exc:
+            logger.warning(f"Source {self.provider} is missing: {exc}")
+            return default
+        except Exception as exc:
+            # A bug in one fetcher costs its source, not the whole report
+            logger.error(f"Source {self.provider} failed: {exc}", exc_info=exc)
+            return default
+
+    def map[U](self, fn: Callable[[T], U]) -> "Source[U]":
+        """The same source, with `fn` applied to its result."""
+        return Source(
+            provider=self.provider,
+            future=then(self.future, fn),
+            deadline=self.deadline,
+            deadline_seconds=self.deadline_seconds,
+            fetched_at=self.fetched_at,
+            is_stale=self.is_stale,
+        )
+
+    def _missed_deadline(self) -> DeadlineExceeded:
+        return DeadlineExceeded(
+            f"{self.provider} didn't answer within {self.deadline_seconds:g}s"
+        )
+
+
+@dataclass
+class ReportSources:
+    """All the inputs of one report, fetched concurrently on the shared executor."""
+
+    since: datetime
+    latest_prs: Source[list[PR]]
+    open_prs: Source[list[PR]]
+    linear_activity: Source[list[IssueActivity]]
+    open_issues: Source[list[Issue]]
+    meetings: Source[list[Meeting]]
+    local_data: Source[LocalData]
+
+    @property
+    def all_sources(self) -> list[Source[Any]]:
+        return [
+            self.latest_prs,
+            self.open_prs,
+            self.linear_activity,
+            self.open_issues,
+            self.meetings,
+            self.local_data,
+        ]
+
+
+@dataclass
+class TeamSources:
+    """The inputs of a team report, each fetched for the whole team at once."""
+
+    since: datetime
+    prs: Source[dict[str, tuple[list[PR], list[PR]]]]  # login -> latest and open PRs
+    # email -> issue activity and open issues
+    issues: Source[dict[str, tuple[list[IssueActivity], list[Issue]]]]
+    meetings: Source[list[Meeting]]
+    local_data: Source[LocalData]
+
+
+def start_report_sources(
+    window: ReportWindow, *, refresh: bool = False
+) -> ReportSources:
+    """Kick off every source at once, so the report waits only as long as the slowest one.
+
+    With `refresh`, cached sources are fetched again even if they are still fresh.
+    """
+    settings = get_settings()
+    if not window.is_relative and not settings.HISTORY.ENABLED:
+        raise SettingsError("Reports for a past date range need history.enabled")
+
+    done_ttl = settings.CACHE.DONE_TTL_SECONDS
+    next_ttl = settings.CACHE.NEXT_TTL_SECONDS
+    # The requests these sources make, now or on worker threads, count towards this report
+    with get_budgets().track_report(window.label):
+        latest_prs, open_prs = _start_github_prs(
+            window, done_ttl=done_ttl, next_ttl=next_ttl, refresh=refresh
+        )
+        linear_activity, open_issues = _start_linear_issues(
+            window, done_ttl=done_ttl, next_ttl=next_ttl, refresh=refresh
+        )
+        meetings = _start_meetings(window, ttl=done_ttl, refresh=refresh)
+    return ReportSources(
+        since=window.since,
+        latest_prs=latest_prs,
+        open_prs=open_prs,
+        linear_activity=linear_activity,
+        open_issues=open_issues,
+        meetings=meetings,
+        # Ignored items and notes change only through this app, which keeps them in memory
+        local_data=_start(_STORAGE, lambda: submit(get_local_data_index().get)),
+    )
+
+
+def start_team_sources(window: ReportWindow, *, refresh: bool = False) -> TeamSources:
+    """`start_report_sources` for every team member, with one set of requests for all of them.
+
+    The history only keeps our own items, so team reports always come from upstream
+    (through the snapshot cache), and only for a window relative to now.
+    """
+    settings = get_settings()
+    members = settings.TEAM.MEMBERS
+    if not members:
+        raise SettingsError("Team reports need team.members in config.yml")
+    if not window.is_relative:
+        raise SettingsError("Team reports are only for the last hours")
+
+    since = window.since
+    ttl = settings.CACHE.DONE_TTL_SECONDS
+    logins = [member.GH_USERNAME for member in members]
+    linear_emails = [member.LINEAR_EMAIL for member in members]
+    google_emails = [member.GOOGLE_EMAIL for member in members]
+    with get_budgets().track_report(f"team {window.label}"):
+        prs = _start(
+            _GITHUB,
+            lambda: github.submit_team_done_and_open_prs(logins, since),
+            cache_key=("team_prs", window.label),
+            ttl=ttl,
+            refresh=refresh,
+        )
+        issues = _start(
+            _LINEAR,
+            lambda: submit(
+                linear.fetch_team_activity_and_open_issues, linear_emails, since
+            ),
+            cache_key=("team_issues", window.label),
+            ttl=ttl,
+            refresh=refresh,
+        )
+        meetings = (
+            _start(
+                _GOOGLE,
+                lambda: submit_team_meetings(google_emails, since),
+                cache_key=("team_meetings", window.label),
+                ttl=ttl,
+                refresh=refresh,
+            )
+            if settings.GOOGLE.is_setup
+            else _no_meetings()
+        )
+    return TeamSources(
+        since=since,
+        prs=prs,
+        issues=issues,
+        meetings=meetings,
+        local_data=_start(_STORAGE, lambda: submit(get_local_data_index().get)),
+    )
+
+
+def _start_github_prs(
+    window: ReportWindow, *, done_ttl: float, next_ttl: float, refresh: bool
+) -> tuple[Source[list[PR]], Source[list[PR]]]:
+    """The latest and the open PRs, in a single GitHub request if GH_COMBINED_QUERY."""
+    settings = get_settings()
+    since = window.since
+
+    def until() -> datetime:
+        return window.until or datetime.now(UTC)
+
+    def fetch_latest_and_open() -> Future[tuple[list[PR], list[PR]]]:
+        if settings.HISTORY.ENABLED:
+            return history_sync.prs_and_open_prs_between(since, until())
+        return submit(github.fetch_done_and_open_prs, since)
+
+    def fetch_latest() -> Future[list[PR]]:
+        if settings.HISTORY.ENABLED:
+            return history_sync.prs_between(since, until())
+        return _list_of(github.fetch_authored_prs, since)()
+
+    if settings.GH_COMBINED_QUERY:
+        # One cache entry for both, refreshed as often as the latest PRs
+        both = _start(
+            _GITHUB,
+            fetch_latest_and_open,
+            cache_key=("github_prs", window.label),
+            ttl=done_ttl,
+            refresh=refresh,
+        )
+        return both.map(itemgetter(0)), both.map(itemgetter(1))
+
+    return (
+        _start(
+            _GITHUB,
+            fetch_latest,
+            cache_key=("latest_prs", window.label),
+            ttl=done_ttl,
+            refresh=refresh,
+        ),
+        _start(
+            _GITHUB,
+            _list_of(github.fetch_authored_open_prs),
+            cache_key=("open_prs",),
+            ttl=next_ttl,
+            refresh=refresh,
+        ),
+    )
+
+
+def _start_linear_issues(
+    window: ReportWindow, *, done_ttl: float, next_ttl: float, refresh: bool
+) -> tuple[Source[list[IssueActivity]], Source[list[Issue]]]:
+    """The issue activity and the open issues, in a single Linear request if LINEAR_COMBINED_QUERY."""
+    settings = get_settings()
+    since = window.since
+
+    def until() -> datetime:
+        return window.until or datetime.now(UTC)
+
+    def fetch_activity_and_open() -> Future[tuple[list[IssueActivity], list[Issue]]]:
+        if settings.HISTORY.ENABLED:
+            return history_sync.issue_activities_and_open_issues_between(since, until())
+        return submit(linear.fetch_activity_and_open_issues, since)
+
+    def fetch_activity() -> Future[list[IssueActivity]]:
+        if settings.HISTORY.ENABLED:
+            return history_sync.issue_activities_between(since, until())
+        return _list_of(linear.fetch_user_activity, since)()
+
+    if settings.LINEAR_COMBINED_QUERY:
+        # One cache entry for both, refreshed as often as the activity
+        both = _start(
+            _LINEAR,
+            fetch_activity_and_open,
+            cache_key=("linear_issues", window.label),
+            ttl=done_ttl,
+            refresh=refresh,
+        )
+        return both.map(itemgetter(0)), both.map(itemgetter(1))
+
+    return (
+        _start(
+            _LINEAR,
+            fetch_activity,
+            cache_key=("linear_activity", window.label),
+            ttl=done_ttl,
+            refresh=refresh,
+        ),
+        _start(
+            _LINEAR,
+            _list_of(linear.fetch_in_progress_issues),
+            cache_key=("open_issues",),
+            ttl=next_ttl,
+            refresh=refresh,
+        ),
+    )
+
+
+def _start[T](
+    provider: str,
+    start_fn: Callable[[], Future[T]],
+    *,
+    cache_key: Hashable | None = None,
+    ttl: float = 0,
+    refresh: bool = False,
+) -> Source[T]:
+    settings = get_settings()
+    seconds = settings.REPORT.deadline_for(provider.lower())
+    deadline = time.monotonic() + seconds
+
+    if cache_key is None or not settings.CACHE.is_enabled:
+        # Requests made for this source inherit the deadline, so they don't outlive it by much.
+        with remote_deadline(seconds):
+            future = start_fn()
+        return Source(
+            provider=provider,
+            future=future,
+            deadline=deadline,
+            deadline_seconds=seconds,
+        )
+
+    # Fetches that fill the cache are not cut short by the deadline, even if this
+    # report stops waiting for them, a slow source is then ready for the next load.
+    snapshot_cache = get_snapshot_cache()
+    if get_budgets().is_low(provider.lower()):
+        # Whatever is cached will do, until the rate limit resets
+        logger.warning(f"{provider} rate limit is low, serving cached data")
+        refresh = False
+        ttl = snapshot_cache.max_stale_seconds
+    elif get_provider_health(provider.lower()).state == CircuitState.OPEN:
+        # Requests would fail right away, keep showing what we have. Once the circuit
+        # is half-open, refreshes go through again, and the first one is its probe.
+        logger.warning(f"{provider} keeps failing, serving cached data")
+        refresh = False
+        ttl = snapshot_cache.max_stale_seconds
+    snapshot = (
+        snapshot_cache.refresh(cache_key, start_fn)
+        if refresh
+        else snapshot_cache.get(cache_key, ttl, start_fn)
+    )
+    return Source(
+        provider=provider,
+        future=snapshot.future,
+        deadline=deadline,
+        deadline_seconds=seconds,
+        fetched_at=snapshot.fetched_at,
+        is_stale=snapshot.is_stale,
+    )
+
+
+def _list_of[T](
+    fn: Callable[..., Iterable[T]], *args: datetime
+) -> Callable[[], Future[list[T]]]:
+    # The fetchers are generators, they have to be consumed on the worker thread,
+    # otherwise all the requests would still happen in the caller.
+    return lambda: submit(lambda: list(fn(*args)))
+
+
+def _start_meetings(
+    window: ReportWindow, *, ttl: float, refresh: bool
+) -> Source[list[Meeting]]:
+    if not get_settings().GOOGLE.is_setup:
+        return _no_meetings()
+
+    since = window.since
+
+    def fetch_meetings() -> Future[list[Meeting]]:
+        if get_settings().HISTORY.ENABLED:
+            return history_sync.meetings_between(
+                since, window.until or datetime.now(UTC)
+            )
+        return submit_calendar_events(since)
+
+    return _start(
+        _GOOGLE,
+        fetch_meetings,
+        cache_key=("meetings", window.label),
+        ttl=ttl,
+        refresh=refresh,
+    )
+
+
+def _no_meetings() -> Source[list[Meeting]]:
+    no_meetings: Future[list[Meeting]] = Future()
+    no_meetings.set_result([])
+    return _start(_GOOGLE, lambda: no_meetings)
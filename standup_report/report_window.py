@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+
+from standup_report.date_utils import round_down_to_minute
+from standup_report.exceptions import SettingsError
+from standup_report.settings import HistorySettings
+
+_WEEKDAYS = [
+    "monday",
+    "tuesday",
+    "wednesday",
+    "thursday",
+    "friday",
+    "saturday",
+    "sunday",
+]
+
+
+@dataclass(frozen=True)
+class ReportWindow:
+    since: datetime
+    until: datetime | None  # None means "up to now"
+    label: str  # identifies the window, e.g. in cache keys
+
+    @property
+    def is_relative(self) -> bool:
+        return self.until is None
+
+
+def window_for_hours(hours: int) -> ReportWindow:
+    # Rounded, so that all loads within a minute ask for the exact same window
+    now = round_down_to_minute(datetime.now(UTC))
+    return ReportWindow(
+        since=now - timedelta(hours=hours), until=None, label=f"{hours}h"
+    )
+
+
+def window_between(from_str: str, to_str: str | None) -> ReportWindow:
+    """From `?from=...&to=...`, ISO dates or datetimes. A bare `to` date includes the whole day."""
+    try:
+        since = _parse_bound(from_str, end_of_day=False)
+        until = _parse_bound(to_str, end_of_day=True) if to_str else None
+    except ValueError as exc:
+        raise SettingsError(f"Invalid report range: {exc}") from exc
+
+    if until and until <= since:
+        raise SettingsError(f"Invalid report range: {from_str} is not before {to_str}")
+    return ReportWindow(
+        since=since, until=until, label=f"{since.isoformat()}..{until or 'now'}"
+    )
+
+
+def window_for_name(name: str, history_settings: HistorySettings) -> ReportWindow:
+    """Named ranges: yesterday, last-week, last-sprint, last-monday, last-tuesday, ..."""
+    today = datetime.now(UTC).date()
+    start_day: date
+    days: int
+    match name:
+        case "yesterday":
+            start_day, days = today - timedelta(days=1), 1
+        case "last-week":
+            start_day, days = today - timedelta(days=today.weekday() + 7), 7
+        case "last-sprint":
+            start_day, days = (
+                _last_sprint(today, history_settings),
+                history_settings.SPRINT_DAYS,
+            )
+        case _ if name.removeprefix("last-") in _WEEKDAYS:
+            weekday = _WEEKDAYS.index(name.removeprefix("last-"))
+            days_back = (today.weekday() - weekday - 1) % 7 + 1
+            start_day, days = today - timedelta(days=days_back), 1
+        case _:
+            raise SettingsError(f"Unknown report range `{name}`")
+
+    since = datetime.combine(start_day, time.min, tzinfo=UTC)
+    return ReportWindow(since=since, until=since + timedelta(days=days), label=name)
+
+
+def _last_sprint(today: date, history_settings: HistorySettings) -> date:
+    if history_settings.SPRINT_START is None:
+        raise SettingsError(
+            "Set history.sprint_start in config.yml to use `last-sprint`"
+        )
+
+    sprints_since_start = (
+        today - history_settings.SPRINT_START
+    ).days // history_settings.SPRINT_DAYS
+    current_sprint_start = history_settings.SPRINT_START + timedelta(
+        days=sprints_since_start * history_settings.SPRINT_DAYS
+    )
+    return current_sprint_start - timedelta(days=history_settings.SPRINT_DAYS)
+
+
+def _parse_bound(value: str, *, end_of_day: bool) -> datetime:
+    if len(value) == len("YYYY-MM-DD"):
+        day = date.fromisoformat(value)
+        if end_of_day:
+            day += timedelta(days=1)
+        return datetime.combine(day, time.min, tzinfo=UTC)
+
+    dt = datetime.fromisoformat(value)
+    return dt if dt.tzinfo else dt.replace(tzinfo=UTC)
@@ -0,0 +1,33 @@
+from collections.abc import AsyncIterator
+from typing import Any
+
+from flask import current_app
+from jinja2 import Environment
+
+_EXTENSION_NAME = "async_jinja_env"
+# Jinja's default, a cache of its own: the overlay would otherwise copy the compiled sync templates
+_TEMPLATE_CACHE_SIZE = 400
+
+
+async def stream_template_async(
+    template_name: str, **context: Any
+) -> AsyncIterator[str]:
+    """Flask's `stream_template`, in the event loop.
+
+    The template is rendered by an async overlay of the app's Jinja environment, so its
+    `for` loops can go over async iterators, which are then awaited rather than waited for.
+    """
+    current_app.update_template_context(context)
+    template = _get_async_env().get_template(template_name)
+    async for chunk in template.generate_async(**context):
+        yield chunk
+
+
+def _get_async_env() -> Environment:
+    env: Environment | None = current_app.extensions.get(_EXTENSION_NAME)
+    if env is None:
+        env = current_app.jinja_env.overlay(
+            enable_async=True, cache_size=_TEMPLATE_CACHE_SIZE
+        )
+        current_app.extensions[_EXTENSION_NAME] = env
+    return env
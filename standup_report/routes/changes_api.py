@@ -0,0 +1,84 @@
+import logging
+from typing import Any
+
+from flask import Blueprint
+from flask import Response
+from flask import jsonify
+from flask import request
+
+from standup_report.duckdb_client import ChangeAction
+from standup_report.duckdb_client import LocalChange
+from standup_report.exceptions import InvalidChange
+from standup_report.ignore_mixin import ItemType
+from standup_report.local_data import get_local_data_index
+from standup_report.note_utils import NoteCategory
+
+changes_api = Blueprint("changes_api", __name__)
+logger = logging.getLogger(__name__)
+
+# One standup's worth of edits, with room to spare
+_MAX_CHANGES = 500
+
+
+@changes_api.route("/api/changes", methods=["POST"])
+def apply_changes() -> Response | tuple[Response, int]:
+    """Apply many ignore, unignore and note changes at once, all of them or none.
+
+    The body is `{"changes": [...]}`, every change is one of
+    `{"action": "ignore", "item_type", "item_id", "item_title"}`,
+    `{"action": "unignore", "item_type", "item_id"}` or
+    `{"action": "note", "item_type", "item_id", "category", "note"}`.
+    """
+    data = request.get_json(silent=True)
+    raw_changes = data.get("changes") if isinstance(data, dict) else None
+    if not isinstance(raw_changes, list):
+        return jsonify({"error": "missing JSON body with a `changes` list"}), 400
+    if len(raw_changes) > _MAX_CHANGES:
+        return jsonify({"error": f"at most {_MAX_CHANGES} changes at once"}), 400
+
+    try:
+        changes = [_parse_change(raw) for raw in raw_changes]
+    except InvalidChange as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    get_local_data_index().apply(changes)
+    return jsonify({"success": True, "applied": len(changes)})
+
+
+def _parse_change(raw: Any) -> LocalChange:
+    if not isinstance(raw, dict):
+        raise InvalidChange(f"invalid change `{raw}`, must be an object")
+
+    action = ChangeAction.from_string(raw.get("action"))
+    if action is None:
+        raise InvalidChange(
+            f"invalid action, must be one of {', '.join(f'`{a}`' for a in ChangeAction)}"
+        )
+    item_type = ItemType.from_string(raw.get("item_type"))
+    if item_type is None:
+        raise InvalidChange(
+            f"invalid item_type, must be one of {', '.join(f'`{t}`' for t in ItemType)}"
+        )
+    item_id = raw.get("item_id")
+    if not item_id or not isinstance(item_id, str):
+        raise InvalidChange("missing required field: item_id")
+
+    match action:
+        case ChangeAction.IGNORE:
+            item_title = raw.get("item_title")
+            if not item_title or not isinstance(item_title, str):
+                raise InvalidChange(f"missing required field: item_title of {item_id}")
+            return LocalChange(action, item_type, item_id, item_title=item_title)
+        case ChangeAction.UNIGNORE:
+            return LocalChange(action, item_type, item_id)
+        case ChangeAction.NOTE:
+            category = NoteCategory.from_string(raw.get("category"))
+            if category is None:
+                raise InvalidChange(
+                    f"invalid category of {item_id}, must be one of "
+                    f"`{NoteCategory.DONE}`, `{NoteCategory.NEXT}`"
+                )
+            note = raw.get("note") or ""
+            if not isinstance(note, str):
+                raise InvalidChange(f"invalid note of {item_id}, must be a string")
+            return LocalChange(action, item_type, item_id, category=category, note=note)
@@ -4,7 +4,7 @@ from flask import Blueprint
 from flask import redirect
 from werkzeug import Response
 
-from standup_report import duckdb_client
+from standup_report.local_data import get_local_data_index
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +15,6 @@ db = Blueprint("db", __name__)
 def recreate_db() -> Response:
     """Reset all DuckDB tables (drop and recreate)."""
     logger.info("Resetting DuckDB tables")
-    duckdb_client.recreate_tables()
+    get_local_data_index().recreate_tables()
     # redirect home
     return redirect("/")
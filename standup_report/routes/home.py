@@ -1,13 +1,20 @@
+import asyncio
+
 from flask import Blueprint
 from flask import render_template
 
 from standup_report import github
 from standup_report import google
 from standup_report import linear
-from standup_report.duckdb_client import duckdb_health_check
+from standup_report.duckdb_client import storage_health_checks
+from standup_report.duckdb_client.client import HealthState
 from standup_report.exceptions import RemoteException
 from standup_report.exceptions import SettingsError
 from standup_report.exceptions import StandupReportError
+from standup_report.google.auth import AuthStatus
+from standup_report.prefetch import get_prefetch_scheduler
+from standup_report.remote.budget import get_budgets
+from standup_report.remote.resilience import all_provider_health
 from standup_report.settings import Settings
 from standup_report.settings import get_settings
 
@@ -16,22 +23,65 @@ home_bp = Blueprint("home", __name__)
 
 @home_bp.route("/")
 def index() -> str:
-    duckdb_health = None
-
     settings, settings_error = _get_settings_handle_err()
+    google_auth_status = google.get_auth_status()
+    return _render_index(
+        settings,
+        settings_error,
+        storage_health=storage_health_checks() if settings else None,
+        github_check=_check_github_conn(),
+        linear_check=_check_linear_conn(),
+        google_auth_status=google_auth_status,
+        google_check=(
+            _check_google_conn()
+            if google_auth_status.is_authenticated
+            else (None, None, None)
+        ),
+    )
 
-    if settings:
-        duckdb_health = duckdb_health_check()
 
-    gh_query, gh_response, gh_exc = _check_github_conn()
-    linear_query, linear_response, linear_exc = _check_linear_conn()
+async def index_async() -> str:
+    """`index` of the ASGI app, all the connections are checked at once on the event loop."""
+    settings, settings_error = _get_settings_handle_err()
     google_auth_status = google.get_auth_status()
+    storage_health, github_check, linear_check, google_check = await asyncio.gather(
+        asyncio.to_thread(storage_health_checks) if settings else _nothing(),
+        _check_github_conn_async(),
+        _check_linear_conn_async(),
+        (
+            _check_google_conn_async()
+            if google_auth_status.is_authenticated
+            else _nothing_checked()
+        ),
+    )
+    return _render_index(
+        settings,
+        settings_error,
+        storage_health=storage_health,
+        github_check=github_check,
+        linear_check=linear_check,
+        google_auth_status=google_auth_status,
+        google_check=google_check,
+    )
 
-    google_endpoint: str | None = None
-    google_calendars: list[str] | None = None
-    google_exc: StandupReportError | None = None
-    if google_auth_status.is_authenticated:
-        google_endpoint, google_calendars, google_exc = _check_google_conn()
+
+def _render_index(  # noqa: PLR0913
+    settings: Settings | None,
+    settings_error: str | None,
+    *,
+    storage_health: list[HealthState] | None,
+    github_check: tuple[str, dict | None, StandupReportError | None],
+    linear_check: tuple[str, dict | None, StandupReportError | None],
+    google_auth_status: AuthStatus,
+    google_check: tuple[str | None, list[str] | None, StandupReportError | None],
+) -> str:
+    prefetch_scheduler = None
+    if settings and settings.PREFETCH.ENABLED and settings.PREFETCH.has_triggers:
+        prefetch_scheduler = get_prefetch_scheduler()
+
+    gh_query, gh_response, gh_exc = github_check
+    linear_query, linear_response, linear_exc = linear_check
+    google_endpoint, google_calendars, google_exc = google_check
 
     return render_template(
         "home.html",
@@ -45,11 +95,14 @@ def index() -> str:
         linear_query=linear_query,
         linear_response=linear_response,
         linear_exc=linear_exc,
-        duckdb_health=duckdb_health,
+        storage_health=storage_health,
         google_auth_status=google_auth_status,
         google_endpoint=google_endpoint,
         google_calendars=google_calendars,
         google_exc=google_exc,
+        prefetch_scheduler=prefetch_scheduler,
+        rate_limit_budgets=get_budgets(),
+        provider_health=all_provider_health(),
     )
 
 
@@ -98,3 +151,53 @@ def _check_google_conn() -> tuple[str, list[str] | None, StandupReportError | No
     except (RemoteException, SettingsError) as exc:
         google_exc = exc
     return rest_url, google_calendars, google_exc
+
+
+async def _check_github_conn_async() -> (
+    tuple[str, dict | None, StandupReportError | None]
+):
+    gh_query = "{ viewer { login } }"
+    try:
+        response = await github.client.post_github_gql_query_async(gh_query)
+    except (RemoteException, SettingsError) as exc:
+        return gh_query, None, exc
+    return gh_query, response.data, None
+
+
+async def _check_linear_conn_async() -> (
+    tuple[str, dict | None, StandupReportError | None]
+):
+    linear_query = "{ viewer { email } }"
+    try:
+        response = await linear.client.post_linear_gql_query_async(linear_query)
+    except (RemoteException, SettingsError) as exc:
+        return linear_query, None, exc
+    return linear_query, response.data, None
+
+
+async def _check_google_conn_async() -> (
+    tuple[str, list[str] | None, StandupReportError | None]
+):
+    rest_url = "users/me/calendarList"
+    try:
+        response = await google.client.get_google_rest_response_async(rest_url)
+    except (RemoteException, SettingsError) as exc:
+        return rest_url, None, exc
+    ignored_calendars = get_settings().GOOGLE.IGNORED_CALENDARS
+    return (
+        rest_url,
+        [
+            raw_cal["summary"]
+            for raw_cal in response.data.get("items", [])
+            if raw_cal["summary"] not in ignored_calendars
+        ],
+        None,
+    )
+
+
+async def _nothing() -> None:
+    return None
+
+
+async def _nothing_checked() -> tuple[None, None, None]:
+    return None, None, None
@@ -5,9 +5,11 @@ from flask import Response
 from flask import jsonify
 from flask import request
 
-from standup_report import duckdb_client
+from standup_report.duckdb_client import ChangeAction
+from standup_report.duckdb_client import LocalChange
 from standup_report.enum_utils import SafeStrEnum
 from standup_report.ignore_mixin import ItemType
+from standup_report.local_data import get_local_data_index
 
 ignore_api = Blueprint("ignore_api", __name__)
 logger = logging.getLogger(__name__)
@@ -48,9 +50,12 @@ def handle_ignore(
     if clean_action == IgnoreAction.IGNORE:
         if not item_title:
             return jsonify({"error": "missing required param: item_title"}), 400
-        duckdb_client.add_ignored_item(clean_item_type, item_id, item_title)
+        change = LocalChange(
+            ChangeAction.IGNORE, clean_item_type, item_id, item_title=item_title
+        )
     else:
-        duckdb_client.remove_ignored_item(clean_item_type, item_id)
+        change = LocalChange(ChangeAction.UNIGNORE, clean_item_type, item_id)
+    get_local_data_index().apply([change])
 
     return jsonify(
         {
@@ -5,8 +5,10 @@ from flask import Response
 from flask import jsonify
 from flask import request
 
-from standup_report import duckdb_client
+from standup_report.duckdb_client import ChangeAction
+from standup_report.duckdb_client import LocalChange
 from standup_report.ignore_mixin import ItemType
+from standup_report.local_data import get_local_data_index
 from standup_report.note_utils import NoteCategory
 
 notes_api = Blueprint("notes_api", __name__)
@@ -15,7 +17,7 @@ logger = logging.getLogger(__name__)
 
 @notes_api.route("/api/notes/delete-all", methods=["POST"])
 def delete_all_notes() -> Response:
-    count = duckdb_client.delete_all_notes()
+    count = get_local_data_index().delete_all_notes()
     return jsonify({"success": True, "deleted_count": count})
 
 
@@ -53,10 +55,17 @@ def handle_note(
 
     note = data.get("note", "")
 
-    if not note:
-        duckdb_client.remove_note(clean_item_type, item_id, clean_category)
-
-    duckdb_client.add_note(clean_item_type, item_id, clean_category, note)
+    get_local_data_index().apply(
+        [
+            LocalChange(
+                ChangeAction.NOTE,
+                clean_item_type,
+                item_id,
+                category=clean_category,
+                note=note,
+            )
+        ]
+    )
 
     return jsonify(
         {
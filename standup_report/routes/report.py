@@ -1,108 +1,405 @@
+import asyncio
 import logging
+import time
+from collections.abc import AsyncIterator
+from collections.abc import Callable
 from collections.abc import Iterable
-from datetime import UTC
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import wait
+from dataclasses import dataclass
+from dataclasses import replace
 from datetime import datetime
-from datetime import timedelta
 from operator import attrgetter
+from operator import itemgetter
+from typing import Any
 
 from flask import Blueprint
+from flask import Response
 from flask import render_template
+from flask import request
+from flask import stream_template
+from markupsafe import Markup
 
-from standup_report import duckdb_client
-from standup_report import github
-from standup_report import linear
 from standup_report.calendar_type import Meeting
-from standup_report.exceptions import SettingsError
-from standup_report.google import get_calendar_events
+from standup_report.enum_utils import SafeStrEnum
+from standup_report.exceptions import StandupReportError
 from standup_report.ignore_mixin import ItemType
 from standup_report.issue_type import Issue
 from standup_report.issue_type import IssueActivity
 from standup_report.issue_type import LinearState
+from standup_report.local_data import LocalData
 from standup_report.note_utils import NoteCategory
 from standup_report.pr_type import PR
 from standup_report.pr_type import PRState
+from standup_report.report_sources import ReportSources
+from standup_report.report_sources import Source
+from standup_report.report_sources import TeamSources
+from standup_report.report_sources import start_report_sources
+from standup_report.report_sources import start_team_sources
+from standup_report.report_window import ReportWindow
+from standup_report.report_window import window_between
+from standup_report.report_window import window_for_hours
+from standup_report.report_window import window_for_name
+from standup_report.routes.async_templates import stream_template_async
+from standup_report.settings import TeamMember
 from standup_report.settings import get_settings
 
 report_bp = Blueprint("report", __name__)
 logger = logging.getLogger(__name__)
 
 
+class ReportSection(SafeStrEnum):
+    # In the order they appear on the page
+    DONE_PRS = "done-prs"
+    DONE_ISSUES = "done-issues"
+    DONE_MEETINGS = "done-meetings"
+    NEXT = "next"
+    IGNORED = "ignored"
+
+
+@dataclass
+class _SectionPlan:
+    section: ReportSection
+    waits_for: list[Source[Any]]
+    build: Callable[[], list[Any]]
+    member: int | None = None  # on the team report, the index of whose section it is
+
+    @property
+    def element_id(self) -> str:
+        """Identifies the section on its page."""
+        if self.member is None:
+            return self.section
+        return f"{self.section}-{self.member}"
+
+    @property
+    def missing_sources(self) -> list[str]:
+        """Why parts of this section are missing, one line per failed or late source."""
+        return [str(source.error) for source in self.waits_for if source.error]
+
+    @property
+    def stale_sources(self) -> list[str]:
+        return [note for source in self.waits_for if (note := source.stale_note)]
+
+
 @report_bp.route("/report")
 @report_bp.route("/report/<int:hours>")
-def build_report(hours: int = 8) -> str:
-    time_ago = datetime.now(UTC) - timedelta(hours=hours)
+def build_report(hours: int = 8) -> str | Response:
+    window, subtitle = _report_window(hours)
+    sources: ReportSources = start_report_sources(window)
 
-    my_latest_prs: list[PR] = list(github.fetch_authored_prs(time_ago))
-    my_open_prs: list[PR] = list(github.fetch_authored_open_prs())
+    # The page shell and the filter bar go out right away, every section is then
+    # filled in as soon as the sources it depends on have returned or missed their deadline.
+    # With ?stream=0 the whole page is rendered at once.
+    context = _report_context(
+        window,
+        subtitle,
+        hours,
+        _render_sections(_plan_sections(sources), since=window.since),
+    )
+    if request.args.get("stream") == "0":
+        return render_template("report.html", **context)
+    return Response(stream_template("report.html", **context))
 
-    # Ok, KAR RABIM JE: še 1 + list of items kaj sem še drugega delala, z ikono in tako
 
-    # sort: first MERGED PRs, inside sort by last_change
-    my_latest_prs = sorted(my_latest_prs, key=attrgetter("last_change"))
-    my_latest_prs = sorted(
-        my_latest_prs, key=lambda pr: pr.state == PRState.MERGED, reverse=True
+async def build_report_async(hours: int = 8) -> AsyncIterator[str]:
+    """`build_report` of the ASGI app, it waits for the sources without holding a thread."""
+    window, subtitle = _report_window(hours)
+    # Starting the sources may read the history from DuckDB
+    sources = await asyncio.to_thread(start_report_sources, window)
+    context = _report_context(
+        window,
+        subtitle,
+        hours,
+        _render_sections_async(_plan_sections(sources), since=window.since),
     )
+    chunks = stream_template_async("report.html", **context)
+    if request.args.get("stream") == "0":
+        yield "".join([chunk async for chunk in chunks])
+        return
+    async for chunk in chunks:
+        yield chunk
 
-    selected_linear_activity, selected_open_issues = _fetch_work_on_issues(
-        time_ago, my_latest_prs, my_open_prs
-    )
 
-    my_meetings = []
-    if get_settings().GOOGLE.is_setup:
-        try:
-            my_meetings = get_calendar_events(time_ago)
-        except SettingsError:
-            logger.error(f"Google is setup, but it doesn't work")
-
-    all_done: list[PR | IssueActivity | Meeting] = [
-        *my_latest_prs,
-        *selected_linear_activity,
-        *my_meetings,
-    ]
-    all_next: list[PR | Issue] = [
-        *my_open_prs,
-        *selected_open_issues,
-    ]
+@report_bp.route("/team")
+@report_bp.route("/team/<int:hours>")
+def build_team_report(hours: int = 8) -> str | Response:
+    """The report of every team member, streamed like `build_report`."""
+    window = window_for_hours(hours)
+    sources = start_team_sources(window)
+    members = get_settings().TEAM.MEMBERS
+    context = {
+        **_report_context(
+            window,
+            _build_subtitle(hours, window.since, who="the team"),
+            hours,
+            _render_sections(_plan_team_sections(sources, members), since=window.since),
+        ),
+        "title": "Team Standup Report",
+        "members": members,
+        "report_path": "/team",
+    }
+    if request.args.get("stream") == "0":
+        return render_template("report.html", **context)
+    return Response(stream_template("report.html", **context))
+
+
+def _report_window(hours: int) -> tuple[ReportWindow, str]:
+    """The window of the request, and its subtitle."""
+    # /report/<hours> is relative to now, ?from=...&to=... and ?range=last-sprint are served from the history
+    if from_str := request.args.get("from"):
+        window = window_between(from_str, request.args.get("to"))
+        return window, _build_range_subtitle(window)
+    if range_name := request.args.get("range"):
+        window = window_for_name(range_name, get_settings().HISTORY)
+        return window, _build_range_subtitle(window)
+    window = window_for_hours(hours)
+    return window, _build_subtitle(hours, window.since)
+
 
-    ignored_items: set[tuple[ItemType, str, str]] = duckdb_client.get_ignored_items()
-    notes: dict[tuple[ItemType, str, NoteCategory], str] = duckdb_client.get_notes()
-    ignored_keys: set[tuple[ItemType, str]] = {
-        (item_type, item_id) for item_type, item_id, _ in ignored_items
+def _report_context(
+    window: ReportWindow,
+    subtitle: str,
+    hours: int,
+    filled_sections: Iterable[tuple[str, Markup]] | AsyncIterator[tuple[str, Markup]],
+) -> dict[str, Any]:
+    return {
+        "title": "Standup Report",
+        "subtitle": subtitle,
+        "filled_sections": filled_sections,
+        "since": window.since,
+        "hours": hours if window.is_relative else None,
+        "range_name": request.args.get("range"),
+        "settings": get_settings(),
+        "report_path": "/report",
     }
 
-    done_activity: list[PR | IssueActivity | Meeting] = [
-        pr_or_issue
-        for pr_or_issue in all_done
-        if _get_item_key_for_ignoring(pr_or_issue) not in ignored_keys
+
+def _plan_sections(sources: ReportSources) -> list[_SectionPlan]:
+    # A late or failed upstream source leaves its part of a section empty, the rest is still shown.
+    # Local data (ignored items and notes) is a must though.
+    return [
+        *_plan_done_and_next_sections(
+            latest_prs=sources.latest_prs,
+            open_prs=sources.open_prs,
+            linear_activity=sources.linear_activity,
+            open_issues=sources.open_issues,
+            local_data=sources.local_data,
+        ),
+        _plan_meetings_section(sources.meetings, sources.local_data),
+        _plan_ignored_section(sources.local_data),
     ]
-    next_activity: list[PR | Issue] = [
-        pr_or_issue
-        for pr_or_issue in all_next
-        if _get_item_key_for_ignoring(pr_or_issue) not in ignored_keys
+
+
+def _plan_team_sections(
+    sources: TeamSources, members: list[TeamMember]
+) -> list[_SectionPlan]:
+    """The sections of every member, split from the sources of the whole team."""
+    plans: list[_SectionPlan] = []
+    for index, member in enumerate(members):
+        prs = sources.prs.map(itemgetter(member.GH_USERNAME.lower()))
+        issues = sources.issues.map(itemgetter(member.LINEAR_EMAIL.lower()))
+        plans.extend(
+            _plan_done_and_next_sections(
+                latest_prs=prs.map(itemgetter(0)),
+                open_prs=prs.map(itemgetter(1)),
+                linear_activity=issues.map(itemgetter(0)),
+                open_issues=issues.map(itemgetter(1)),
+                local_data=sources.local_data,
+                member=index,
+            )
+        )
+    # Meetings are shown once, with everyone who attended
+    plans.append(_plan_meetings_section(sources.meetings, sources.local_data))
+    # Items ignored on the team report can be unignored there too
+    plans.append(_plan_ignored_section(sources.local_data))
+    return plans
+
+
+def _plan_done_and_next_sections(  # noqa: PLR0913
+    *,
+    latest_prs: Source[list[PR]],
+    open_prs: Source[list[PR]],
+    linear_activity: Source[list[IssueActivity]],
+    open_issues: Source[list[Issue]],
+    local_data: Source[LocalData],
+    member: int | None = None,
+) -> list[_SectionPlan]:
+    return [
+        _SectionPlan(
+            section=ReportSection.DONE_PRS,
+            waits_for=[latest_prs, local_data],
+            build=lambda: _visible_items(
+                local_data.result(),
+                _sort_latest_prs(latest_prs.result_or([])),
+                NoteCategory.DONE,
+            ),
+            member=member,
+        ),
+        _SectionPlan(
+            section=ReportSection.DONE_ISSUES,
+            waits_for=[latest_prs, linear_activity, local_data],
+            build=lambda: _visible_items(
+                local_data.result(),
+                _select_linear_activity(
+                    linear_activity.result_or([]), latest_prs.result_or([])
+                ),
+                NoteCategory.DONE,
+            ),
+            member=member,
+        ),
+        _SectionPlan(
+            section=ReportSection.NEXT,
+            waits_for=[open_prs, open_issues, local_data],
+            build=lambda: _visible_items(
+                local_data.result(),
+                [
+                    *open_prs.result_or([]),
+                    *_select_open_issues(
+                        open_issues.result_or([]), open_prs.result_or([])
+                    ),
+                ],
+                NoteCategory.NEXT,
+            ),
+            member=member,
+        ),
     ]
 
-    _add_notes_to_items(done_activity, notes, category=NoteCategory.DONE)
-    _add_notes_to_items(next_activity, notes, category=NoteCategory.NEXT)
-
-    return render_template(
-        "report.html",
-        title="Standup Report",
-        subtitle=_build_subtitle(hours, time_ago),
-        done_activity=done_activity,
-        next_activity=next_activity,
-        meetings=my_meetings,
-        ignored_items=ignored_items,
-        since=time_ago,
-        hours=hours,
-        settings=get_settings(),
+
+def _plan_meetings_section(
+    meetings: Source[list[Meeting]], local_data: Source[LocalData]
+) -> _SectionPlan:
+    return _SectionPlan(
+        section=ReportSection.DONE_MEETINGS,
+        waits_for=[meetings, local_data],
+        build=lambda: _visible_items(
+            local_data.result(), meetings.result_or([]), NoteCategory.DONE
+        ),
     )
 
 
+def _plan_ignored_section(local_data: Source[LocalData]) -> _SectionPlan:
+    return _SectionPlan(
+        section=ReportSection.IGNORED,
+        waits_for=[local_data],
+        build=lambda: local_data.result().ignored_items,
+    )
+
+
+def _iter_finished_sections(plans: list[_SectionPlan]) -> Iterator[_SectionPlan]:
+    """Yield the plans in the order in which all of their sources are settled."""
+    pending = list(plans)
+    while pending:
+        ready = [p for p in pending if all(s.is_settled for s in p.waits_for)]
+        if not ready:
+            futures, timeout = _next_settled(pending)
+            wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            continue
+        for plan in ready:
+            pending.remove(plan)
+            yield plan
+
+
+async def _iter_finished_sections_async(
+    plans: list[_SectionPlan],
+) -> AsyncIterator[_SectionPlan]:
+    """`_iter_finished_sections`, awaiting the sources rather than blocking on them."""
+    pending = list(plans)
+    while pending:
+        ready = [p for p in pending if all(s.is_settled for s in p.waits_for)]
+        if not ready:
+            futures, timeout = _next_settled(pending)
+            await asyncio.wait(
+                {asyncio.wrap_future(future) for future in futures},
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            continue
+        for plan in ready:
+            pending.remove(plan)
+            yield plan
+
+
+def _next_settled(pending: list[_SectionPlan]) -> tuple[set[Future[Any]], float]:
+    """The futures to wait for, until the next one of them arrives or misses its deadline."""
+    unsettled = [s for p in pending for s in p.waits_for if not s.is_settled]
+    next_deadline = min(s.deadline for s in unsettled)
+    return {s.future for s in unsettled}, max(0, next_deadline - time.monotonic())
+
+
+def _render_sections(
+    plans: list[_SectionPlan], *, since: datetime
+) -> Iterator[tuple[str, Markup]]:
+    # Sections share sources, but every missing or stale source is reported only once
+    reported: set[str] = set()
+    for plan in _iter_finished_sections(plans):
+        yield _render_section(plan, reported, since=since)
+
+
+async def _render_sections_async(
+    plans: list[_SectionPlan], *, since: datetime
+) -> AsyncIterator[tuple[str, Markup]]:
+    reported: set[str] = set()
+    async for plan in _iter_finished_sections_async(plans):
+        yield _render_section(plan, reported, since=since)
+
+
+def _render_section(
+    plan: _SectionPlan, reported: set[str], *, since: datetime
+) -> tuple[str, Markup]:
+    missing_sources = [m for m in plan.missing_sources if m not in reported]
+    stale_sources = [m for m in plan.stale_sources if m not in reported]
+    reported.update(missing_sources, stale_sources)
+    try:
+        html = render_template(
+            "_report_section.html",
+            section=plan.section,
+            items=plan.build(),
+            missing_sources=missing_sources,
+            stale_sources=stale_sources,
+            since=since,
+        )
+    except StandupReportError as exc:
+        logger.error(f"Could not build section {plan.section}: {exc}")
+        html = render_template(
+            "_report_section.html", section=plan.section, section_error=str(exc)
+        )
+    except Exception as exc:
+        # The page is already streaming, the other sections still have to arrive
+        logger.error(f"Section {plan.section} failed: {exc}", exc_info=exc)
+        html = render_template(
+            "_report_section.html",
+            section=plan.section,
+            section_error=f"{type(exc).__name__}: {exc}",
+        )
+    return plan.element_id, Markup(html)
+
+
+def _sort_latest_prs(my_latest_prs: list[PR]) -> list[PR]:
+    # sort: first MERGED PRs, inside sort by last_change
+    my_latest_prs = sorted(my_latest_prs, key=attrgetter("last_change"))
+    return sorted(
+        my_latest_prs, key=lambda pr: pr.state == PRState.MERGED, reverse=True
+    )
+
+
+def _visible_items[T: (PR | Issue | Meeting)](
+    local_data: LocalData, items: list[T], category: NoteCategory
+) -> list[T]:
+    visible_items: list[T] = [
+        item
+        for item in items
+        if _get_item_key_for_ignoring(item) not in local_data.ignored_keys
+    ]
+    return _add_notes_to_items(visible_items, local_data.notes, category=category)
+
+
 ONE_DAY_HOURS = 24
 ONE_WEEK_HOURS = 7 * 24
 
 
-def _build_subtitle(hours: int, time_ago: datetime) -> str:
+def _build_subtitle(hours: int, time_ago: datetime, *, who: str = "I") -> str:
     weeks = hours // ONE_WEEK_HOURS
     remaining_hours = hours % ONE_WEEK_HOURS
     days = remaining_hours // ONE_DAY_HOURS
@@ -117,23 +414,33 @@ def _build_subtitle(hours: int, time_ago: datetime) -> str:
         parts.append(f"{remaining_hours}h")
 
     time_label = " ".join(parts) if parts else "0h"
-    return f"What I did in the last {time_label} (since: {time_ago.strftime('%Y-%m-%d %H:%M:%S UTC')})"
+    return f"What {who} did in the last {time_label} (since: {time_ago.strftime('%Y-%m-%d %H:%M:%S UTC')})"
+
 
+def _build_range_subtitle(window: ReportWindow) -> str:
+    since = window.since.strftime("%Y-%m-%d %H:%M UTC")
+    if window.until is None:
+        return f"What I did since {since}"
+    until = window.until.strftime("%Y-%m-%d %H:%M UTC")
+    return f"What I did between {since} and {until}"
 
-def _fetch_work_on_issues(
-    time_ago: datetime, my_latest_prs: list[PR], my_open_prs: list[PR]
-) -> tuple[list[IssueActivity], list[Issue]]:
-    my_linear_activity: list[IssueActivity] = list(linear.fetch_user_activity(time_ago))
+
+def _select_linear_activity(
+    my_linear_activity: list[IssueActivity], my_latest_prs: list[PR]
+) -> list[IssueActivity]:
     # We only want Linear activity that cannot be expressed in PRs. Because PRs are the most important.
     # So, we will exclude issues that have legit PRs.
     github_pr_urls: set[str] = {pr.url for pr in my_latest_prs}
-    selected_linear_activity: list[IssueActivity] = [
+    return [
         issue
         for issue in my_linear_activity
         if not issue.pr_attachment_urls.intersection(github_pr_urls)
     ]
 
-    my_open_issues: list[Issue] = list(linear.fetch_in_progress_issues())
+
+def _select_open_issues(
+    my_open_issues: list[Issue], my_open_prs: list[PR]
+) -> list[Issue]:
     # Again: remove the ones with known PR
     github_open_pr_urls: set[str] = {pr.url for pr in my_open_prs}
     selected_open_issues: list[Issue] = [
@@ -160,7 +467,7 @@ def _fetch_work_on_issues(
             if i.state and i.state >= LinearState.STARTED
         ]
 
-    return selected_linear_activity, selected_open_issues
+    return selected_open_issues
 
 
 def _get_item_key_for_ignoring(  # noqa: RET503
@@ -174,12 +481,18 @@ def _get_item_key_for_ignoring(  # noqa: RET503
         return ItemType.MEETING, pr_or_issue.remote_id
 
 
-def _add_notes_to_items(
-    all_done: Iterable[PR | Issue | Meeting],
+def _add_notes_to_items[T: (PR | Issue | Meeting)](
+    all_done: Iterable[T],
     notes: dict[tuple[ItemType, str, NoteCategory], str],
     *,
     category: NoteCategory,
-) -> None:
-    for item in all_done:
-        note_key = (item.ignore_item_type, item.ignore_item_id, category)
-        item.note = notes.get(note_key, "")
+) -> list[T]:
+    # Items can come from the snapshot cache and be shared between reports,
+    # so every report gets its own copies with its own notes.
+    return [
+        replace(
+            item,
+            note=notes.get((item.ignore_item_type, item.ignore_item_id, category), ""),
+        )
+        for item in all_done
+    ]
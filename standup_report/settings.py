@@ -2,13 +2,18 @@ import dataclasses
 import logging
 import os
 from dataclasses import dataclass
+from datetime import date
 from functools import cache
 from pathlib import Path
 from typing import Any
 from typing import cast
+from zoneinfo import ZoneInfo
+from zoneinfo import ZoneInfoNotFoundError
 
 import yaml
 
+from standup_report.cron import CronSchedule
+from standup_report.enum_utils import SafeStrEnum
 from standup_report.exceptions import SettingsError
 
 logger = logging.getLogger(__name__)
@@ -18,6 +23,34 @@ _CONFIG_FILE_NAME = "config.yml"
 _GOOGLE_CREDENTIALS_FILE = "credentials.json"
 _GOOGLE_TOKEN_FILE = "google_token.json"
 
+_DEFAULT_REPORT_BUDGET_SECONDS = 5.0
+_DEFAULT_CACHE_MEGABYTES = 32
+_DEFAULT_CACHE_MAX_STALE_SECONDS = 60 * 60
+_DEFAULT_DONE_TTL_SECONDS = 60
+_DEFAULT_NEXT_TTL_SECONDS = 5 * 60
+_DEFAULT_HISTORY_RETENTION_DAYS = 90
+_DEFAULT_HISTORY_COMPACT_AFTER_DAYS = 7
+_DEFAULT_SPRINT_DAYS = 14
+_DEFAULT_PREFETCH_WINDOWS_HOURS = [8]
+_DEFAULT_PREFETCH_TIMEZONE = "UTC"
+_DEFAULT_MINUTES_BEFORE_STANDUP = 5
+_DEFAULT_PREFETCH_JITTER_SECONDS = 30
+_DEFAULT_PREFETCH_MIN_INTERVAL_SECONDS = 5 * 60
+_DEFAULT_PAGE_SIZE = 100
+_DEFAULT_MAX_PAGES = 10
+_DEFAULT_POOL_SIZE = 16  # as many as the shared executor has workers
+_DEFAULT_REQUESTS_PER_SECOND = 10.0
+_DEFAULT_BUDGET_RESERVE = 0.1
+_DEFAULT_RETRIES = 2
+_DEFAULT_BACKOFF_SECONDS = 0.25
+_DEFAULT_MAX_BACKOFF_SECONDS = 4.0
+_DEFAULT_BREAKER_FAILURES = 5
+_DEFAULT_BREAKER_COOLDOWN_SECONDS = 30.0
+_DEFAULT_SQLITE_FILE = "standup_report.sqlite"
+_DEFAULT_SERVER_BIND = "127.0.0.1:2300"
+_DEFAULT_SERVER_WORKERS = 2
+_DEFAULT_SERVER_THREADS = 8
+
 
 @dataclass
 class GoogleSettings:
@@ -45,15 +78,147 @@ class GoogleSettings:
         return bool(self.HAS_CREDENTIALS and self.HAS_TOKEN)
 
 
+@dataclass
+class ReportSettings:
+    BUDGET_SECONDS: float  # how long a report waits for its sources, in total
+    SOURCE_DEADLINES: dict[str, float]  # provider (github, linear, google) -> seconds
+
+    def deadline_for(self, provider: str) -> float:
+        return min(
+            self.SOURCE_DEADLINES.get(provider, self.BUDGET_SECONDS),
+            self.BUDGET_SECONDS,
+        )
+
+
+@dataclass
+class CacheSettings:
+    MAX_BYTES: int  # 0 turns the cache off
+    MAX_STALE_SECONDS: float  # older results are never shown, not even while refreshing
+    DONE_TTL_SECONDS: float  # PRs, issues and meetings from the report window
+    NEXT_TTL_SECONDS: float  # open PRs and issues, they change more slowly
+
+    @property
+    def is_enabled(self) -> bool:
+        return self.MAX_BYTES > 0
+
+
+@dataclass
+class HistorySettings:
+    ENABLED: bool  # keep everything fetched in DuckDB and build reports from it
+    RETENTION_DAYS: int
+    COMPACT_AFTER_DAYS: int  # older PR versions are reduced to one per PR per day
+    SPRINT_START: date | None  # first day of any sprint, for "last sprint" reports
+    SPRINT_DAYS: int
+
+
+@dataclass
+class PrefetchSettings:
+    ENABLED: bool
+    WINDOWS_HOURS: list[int]  # the /report/<hours> pages to warm
+    SCHEDULE: list[str]  # cron expressions, in TIMEZONE
+    TIMEZONE: str
+    STANDUP_MEETING: str | None  # warm before the next meeting with this in its title
+    MINUTES_BEFORE_STANDUP: int
+    JITTER_SECONDS: float  # a random delay added to every run
+    MIN_INTERVAL_SECONDS: (
+        float  # between two runs, so upstream rate limits are respected
+    )
+
+    @property
+    def has_triggers(self) -> bool:
+        return bool(self.SCHEDULE or self.STANDUP_MEETING)
+
+
+@dataclass
+class RemoteSettings:
+    PAGE_SIZE: int  # items per page, capped by what each API allows
+    MAX_PAGES: int  # per query, whatever is beyond that is left out of the report
+    POOL_SIZE: int  # keep-alive connections kept per provider
+    POOL_SIZES: dict[str, int]  # provider (github, linear, google) -> connections
+    PREWARM: list[str]  # providers to connect to when the app starts
+    REQUESTS_PER_SECOND: dict[str, float]  # provider -> sustained request rate
+    # Below this share of a rate limit, reports make do with cached data
+    BUDGET_RESERVE: float
+    RETRIES: int  # extra attempts of an idempotent request after a transient failure
+    BACKOFF_SECONDS: float  # before the first retry, doubled for every next one
+    MAX_BACKOFF_SECONDS: float
+    HEDGE: (
+        bool  # send a second request when the first is slower than the provider's p95
+    )
+    BREAKER_FAILURES: int  # failures in a row that open a provider's circuit
+    BREAKER_COOLDOWN_SECONDS: float  # how long an open circuit fails fast
+
+    def pool_size_for(self, provider: str) -> int:
+        return self.POOL_SIZES.get(provider, self.POOL_SIZE)
+
+    def requests_per_second_for(self, provider: str) -> float:
+        return self.REQUESTS_PER_SECOND.get(provider, _DEFAULT_REQUESTS_PER_SECOND)
+
+
+class StorageBackend(SafeStrEnum):
+    DUCKDB = "duckdb"
+    SQLITE = "sqlite"
+
+
+@dataclass
+class StorageSettings:
+    BACKEND: StorageBackend  # of the ignored items and notes, the history is always in DuckDB
+    SQLITE_FILE: str
+
+
+@dataclass
+class ServerSettings:
+    BIND: str  # host:port of `make serve`
+    WORKERS: int  # processes, they share the databases but not what's kept in memory
+    THREADS: int  # per worker
+
+    @classmethod
+    def default(cls) -> "ServerSettings":
+        return cls(
+            BIND=_DEFAULT_SERVER_BIND,
+            WORKERS=_DEFAULT_SERVER_WORKERS,
+            THREADS=_DEFAULT_SERVER_THREADS,
+        )
+
+
+@dataclass
+class TeamMember:
+    NAME: str
+    GH_USERNAME: str
+    LINEAR_EMAIL: str
+    GOOGLE_EMAIL: (
+        str  # their primary calendar, it has to be shared with our Google account
+    )
+
+
+@dataclass
+class TeamSettings:
+    MEMBERS: list[TeamMember]  # on the /team report, in this order
+
+    @property
+    def is_enabled(self) -> bool:
+        return bool(self.MEMBERS)
+
+
 @dataclass
 class Settings:
     GH_LOGIN: str
     GH_TOKEN: str
     GH_USERNAME: str
+    GH_COMBINED_QUERY: bool  # latest and open PRs in one request
     LINEAR_TOKEN: str
     LINEAR_EMAIL: str
+    LINEAR_COMBINED_QUERY: bool  # activity and open issues in one request
     IGNORED_REPOS: set[str]
     GOOGLE: GoogleSettings
+    REPORT: ReportSettings
+    CACHE: CacheSettings
+    HISTORY: HistorySettings
+    PREFETCH: PrefetchSettings
+    REMOTE: RemoteSettings
+    STORAGE: StorageSettings
+    SERVER: ServerSettings
+    TEAM: TeamSettings
 
     @property
     def as_dict(self) -> dict[str, str | int | list[str]]:
@@ -103,16 +268,183 @@ def get_settings() -> Settings:
     ignored_repos = config.get("ignored_repos", [])
     ignored_calendars: list[str] = config.get("ignored_calendars", [])
     ignored_meetings: list[str] = config.get("ignored_meetings", [])
+    github_config: dict[str, Any] = config.get("github", {})
+    linear_config: dict[str, Any] = config.get("linear", {})
+    report_config: dict[str, Any] = config.get("report", {})
+    cache_config: dict[str, Any] = config.get("cache", {})
+    history_config: dict[str, Any] = config.get("history", {})
+    sprint_start: date | str | None = history_config.get("sprint_start")
+    prefetch_config: dict[str, Any] = config.get("prefetch", {})
+    remote_config: dict[str, Any] = config.get("remote", {})
+    storage_config: dict[str, Any] = config.get("storage", {})
+    server_config: dict[str, Any] = config.get("server", {})
+    team_config: dict[str, Any] = config.get("team", {})
+    storage_backend_name: str = storage_config.get("backend", StorageBackend.DUCKDB)
+    storage_backend = StorageBackend.from_string(storage_backend_name)
+    if storage_backend is None:
+        raise SettingsError(
+            f"Unknown storage.backend `{storage_backend_name}`, "
+            f"use one of {', '.join(StorageBackend)}"
+        )
+    prefetch_schedule: list[str] = prefetch_config.get("schedule", [])
+    prefetch_timezone: str = prefetch_config.get("timezone", _DEFAULT_PREFETCH_TIMEZONE)
+    _validate_prefetch_config(prefetch_schedule, prefetch_timezone)
 
     return Settings(
         GH_LOGIN=env_vars["GH_LOGIN"],
         GH_TOKEN=env_vars["GH_API_TOKEN"],
         GH_USERNAME=env_vars["GH_USERNAME"],
+        GH_COMBINED_QUERY=bool(github_config.get("combined_query", True)),
         LINEAR_TOKEN=env_vars["LINEAR_TOKEN"],
         LINEAR_EMAIL=env_vars["LINEAR_EMAIL"],
+        LINEAR_COMBINED_QUERY=bool(linear_config.get("combined_query", True)),
         IGNORED_REPOS=set(ignored_repos),
         GOOGLE=GoogleSettings(
             IGNORED_CALENDARS=set(ignored_calendars),
             IGNORED_MEETINGS=set(ignored_meetings),
         ),
+        REPORT=ReportSettings(
+            BUDGET_SECONDS=float(
+                report_config.get("budget_seconds", _DEFAULT_REPORT_BUDGET_SECONDS)
+            ),
+            SOURCE_DEADLINES={
+                provider: float(seconds)
+                for provider, seconds in report_config.get(
+                    "source_deadlines", {}
+                ).items()
+            },
+        ),
+        CACHE=CacheSettings(
+            MAX_BYTES=int(
+                float(cache_config.get("max_megabytes", _DEFAULT_CACHE_MEGABYTES))
+                * 1024
+                * 1024
+            ),
+            MAX_STALE_SECONDS=float(
+                cache_config.get("max_stale_seconds", _DEFAULT_CACHE_MAX_STALE_SECONDS)
+            ),
+            DONE_TTL_SECONDS=float(
+                cache_config.get("done_ttl_seconds", _DEFAULT_DONE_TTL_SECONDS)
+            ),
+            NEXT_TTL_SECONDS=float(
+                cache_config.get("next_ttl_seconds", _DEFAULT_NEXT_TTL_SECONDS)
+            ),
+        ),
+        HISTORY=HistorySettings(
+            ENABLED=bool(history_config.get("enabled", True)),
+            RETENTION_DAYS=int(
+                history_config.get("retention_days", _DEFAULT_HISTORY_RETENTION_DAYS)
+            ),
+            COMPACT_AFTER_DAYS=int(
+                history_config.get(
+                    "compact_after_days", _DEFAULT_HISTORY_COMPACT_AFTER_DAYS
+                )
+            ),
+            SPRINT_START=(
+                date.fromisoformat(sprint_start)
+                if isinstance(sprint_start, str)
+                else sprint_start
+            ),
+            SPRINT_DAYS=int(history_config.get("sprint_days", _DEFAULT_SPRINT_DAYS)),
+        ),
+        PREFETCH=PrefetchSettings(
+            ENABLED=bool(prefetch_config.get("enabled", True)),
+            WINDOWS_HOURS=[
+                int(hours)
+                for hours in prefetch_config.get(
+                    "windows_hours", _DEFAULT_PREFETCH_WINDOWS_HOURS
+                )
+            ],
+            SCHEDULE=prefetch_schedule,
+            TIMEZONE=prefetch_timezone,
+            STANDUP_MEETING=prefetch_config.get("standup_meeting"),
+            MINUTES_BEFORE_STANDUP=int(
+                prefetch_config.get(
+                    "minutes_before_standup", _DEFAULT_MINUTES_BEFORE_STANDUP
+                )
+            ),
+            JITTER_SECONDS=float(
+                prefetch_config.get("jitter_seconds", _DEFAULT_PREFETCH_JITTER_SECONDS)
+            ),
+            MIN_INTERVAL_SECONDS=float(
+                prefetch_config.get(
+                    "min_interval_seconds", _DEFAULT_PREFETCH_MIN_INTERVAL_SECONDS
+                )
+            ),
+        ),
+        REMOTE=RemoteSettings(
+            PAGE_SIZE=int(remote_config.get("page_size", _DEFAULT_PAGE_SIZE)),
+            MAX_PAGES=int(remote_config.get("max_pages", _DEFAULT_MAX_PAGES)),
+            POOL_SIZE=int(remote_config.get("pool_size", _DEFAULT_POOL_SIZE)),
+            POOL_SIZES={
+                provider: int(size)
+                for provider, size in remote_config.get("pool_sizes", {}).items()
+            },
+            PREWARM=list(remote_config.get("prewarm", [])),
+            REQUESTS_PER_SECOND={
+                provider: float(rate)
+                for provider, rate in remote_config.get(
+                    "requests_per_second", {}
+                ).items()
+            },
+            BUDGET_RESERVE=float(
+                remote_config.get("budget_reserve", _DEFAULT_BUDGET_RESERVE)
+            ),
+            RETRIES=int(remote_config.get("retries", _DEFAULT_RETRIES)),
+            BACKOFF_SECONDS=float(
+                remote_config.get("backoff_seconds", _DEFAULT_BACKOFF_SECONDS)
+            ),
+            MAX_BACKOFF_SECONDS=float(
+                remote_config.get("max_backoff_seconds", _DEFAULT_MAX_BACKOFF_SECONDS)
+            ),
+            HEDGE=bool(remote_config.get("hedge", False)),
+            BREAKER_FAILURES=int(
+                remote_config.get("breaker_failures", _DEFAULT_BREAKER_FAILURES)
+            ),
+            BREAKER_COOLDOWN_SECONDS=float(
+                remote_config.get(
+                    "breaker_cooldown_seconds", _DEFAULT_BREAKER_COOLDOWN_SECONDS
+                )
+            ),
+        ),
+        STORAGE=StorageSettings(
+            BACKEND=storage_backend,
+            SQLITE_FILE=str(storage_config.get("sqlite_file", _DEFAULT_SQLITE_FILE)),
+        ),
+        SERVER=ServerSettings(
+            BIND=str(server_config.get("bind", _DEFAULT_SERVER_BIND)),
+            WORKERS=max(1, int(server_config.get("workers", _DEFAULT_SERVER_WORKERS))),
+            THREADS=max(1, int(server_config.get("threads", _DEFAULT_SERVER_THREADS))),
+        ),
+        TEAM=TeamSettings(MEMBERS=_parse_team_members(team_config.get("members", []))),
     )
+
+
+def _parse_team_members(members_config: list[dict[str, Any]]) -> list[TeamMember]:
+    members: list[TeamMember] = []
+    for member_config in members_config:
+        if missing := [
+            key for key in ("github", "linear_email") if not member_config.get(key)
+        ]:
+            raise SettingsError(
+                f"Team member {member_config} is missing {', '.join(missing)}"
+            )
+        linear_email = str(member_config["linear_email"])
+        members.append(
+            TeamMember(
+                NAME=str(member_config.get("name", member_config["github"])),
+                GH_USERNAME=str(member_config["github"]),
+                LINEAR_EMAIL=linear_email,
+                GOOGLE_EMAIL=str(member_config.get("google_email", linear_email)),
+            )
+        )
+    return members
+
+
+def _validate_prefetch_config(schedule: list[str], timezone: str) -> None:
+    for expression in schedule:
+        CronSchedule.parse(expression)
+    try:
+        ZoneInfo(timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise SettingsError(f"Unknown prefetch timezone `{timezone}`") from None
@@ -0,0 +1,147 @@
+import logging
+import pickle
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from collections.abc import Hashable
+from concurrent.futures import Future
+from dataclasses import dataclass
+from datetime import UTC
+from datetime import datetime
+from functools import cache
+from threading import RLock
+from typing import Any
+
+from standup_report.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Snapshot[T]:
+    future: Future[T]
+    # None while it's being fetched for the first time
+    fetched_at: datetime | None = None
+    # True if a newer version is being fetched in the background
+    is_stale: bool = False
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    fetched_at: datetime
+    stored_at: float  # time.monotonic()
+
+
+class SnapshotCache:
+    """In-process LRU of source results, bounded by (pickled) bytes.
+
+    Stale entries are served right away while a fresh copy is fetched in the
+    background. Concurrent misses and refreshes of the same key share one fetch.
+    With several worker processes, each one has a cache of its own.
+    """
+
+    def __init__(self, max_bytes: int, max_stale_seconds: float):
+        self.max_bytes = max_bytes
+        self.max_stale_seconds = max_stale_seconds
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._in_flight: dict[Hashable, Future[Any]] = {}
+        self._size = 0
+        # Reentrant, because a fetch that is already done runs its callback right away
+        self._lock = RLock()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get[T](
+        self, key: Hashable, ttl: float, fetch: Callable[[], Future[T]]
+    ) -> Snapshot[T]:
+        with self._lock:
+            entry = self._entries.get(key)
+            age = time.monotonic() - entry.stored_at if entry else None
+            if entry and age is not None and age > self.max_stale_seconds:
+                self._remove(key)
+                entry = None
+
+            if entry and age is not None and age <= ttl:
+                self._entries.move_to_end(key)
+                return Snapshot(_resolved(entry.value), fetched_at=entry.fetched_at)
+
+            in_flight: Future[T] | None = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = self._start_fetch(key, fetch)
+
+            if entry:
+                logger.debug(f"Serving stale {key=}, refreshing in the background")
+                self._entries.move_to_end(key)
+                return Snapshot(
+                    _resolved(entry.value), fetched_at=entry.fetched_at, is_stale=True
+                )
+            return Snapshot(in_flight)
+
+    def refresh[T](self, key: Hashable, fetch: Callable[[], Future[T]]) -> Snapshot[T]:
+        """Fetch a fresh copy, whatever the age of the cached one. Joins a fetch in flight."""
+        with self._lock:
+            in_flight: Future[T] | None = self._in_flight.get(key)
+            if in_flight is None:
+                in_flight = self._start_fetch(key, fetch)
+            return Snapshot(in_flight)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _start_fetch[T](
+        self, key: Hashable, fetch: Callable[[], Future[T]]
+    ) -> Future[T]:
+        future = fetch()
+        self._in_flight[key] = future
+
+        def _on_done(done: Future[T]) -> None:
+            with self._lock:
+                self._in_flight.pop(key, None)
+                if not done.cancelled() and done.exception() is None:
+                    self._store(key, done.result())
+
+        future.add_done_callback(_on_done)
+        return future
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        size = len(pickle.dumps(value))
+        if size > self.max_bytes:
+            logger.warning(f"Not caching {key=}, {size} bytes is over the limit")
+            return
+
+        self._remove(key)
+        self._entries[key] = _Entry(
+            value=value,
+            size=size,
+            fetched_at=datetime.now(UTC),
+            stored_at=time.monotonic(),
+        )
+        self._size += size
+        while self._size > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def _remove(self, key: Hashable) -> None:
+        if entry := self._entries.pop(key, None):
+            self._size -= entry.size
+
+
+@cache
+def get_snapshot_cache() -> SnapshotCache:
+    cache_settings = get_settings().CACHE
+    return SnapshotCache(
+        max_bytes=cache_settings.MAX_BYTES,
+        max_stale_seconds=cache_settings.MAX_STALE_SECONDS,
+    )
+
+
+def _resolved[T](value: T) -> Future[T]:
+    future: Future[T] = Future()
+    future.set_result(value)
+    return future
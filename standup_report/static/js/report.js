@@ -91,6 +91,75 @@ function showMessage(message, type = "error") {
   }, 5000);
 }
 
+// Ignore and note edits are sent in batches: all changes made within
+// BATCH_DELAY_MS of the first one go to the server in a single request.
+const BATCH_DELAY_MS = 300;
+let pendingChanges = [];
+let flushTimer = null;
+// The batch that is on its way to the server, settles whatever the outcome
+let inFlight = Promise.resolve();
+
+// Resolves once the change is saved, rejects with the server's error
+function queueChange(change) {
+  return new Promise((resolve, reject) => {
+    pendingChanges.push({ change, resolve, reject });
+    if (flushTimer === null) {
+      flushTimer = setTimeout(flushChanges, BATCH_DELAY_MS);
+    }
+  });
+}
+
+async function flushChanges() {
+  clearTimeout(flushTimer);
+  flushTimer = null;
+  const batch = pendingChanges;
+  pendingChanges = [];
+  if (batch.length === 0) {
+    return;
+  }
+
+  let error = null;
+  try {
+    const request = fetch("/api/changes", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ changes: batch.map((p) => p.change) }),
+    });
+    inFlight = request.catch(() => null);
+    const response = await request;
+    if (!response.ok) {
+      const data = await response.json();
+      error = new Error(data.error);
+    }
+  } catch (e) {
+    error = new Error("Network error, please try again");
+  }
+  // The batch is applied all or nothing
+  batch.forEach((p) => (error ? p.reject(error) : p.resolve()));
+}
+
+// Queued notes would bring back what "Delete all notes" deletes after them
+function dropQueuedNoteChanges() {
+  const notes = pendingChanges.filter((p) => p.change.action === "note");
+  pendingChanges = pendingChanges.filter((p) => p.change.action !== "note");
+  notes.forEach((p) => p.resolve());
+}
+
+// Send what is still queued when the page is closed or reloaded
+window.addEventListener("pagehide", () => {
+  if (pendingChanges.length === 0) {
+    return;
+  }
+  const changes = pendingChanges.map((p) => p.change);
+  pendingChanges = [];
+  clearTimeout(flushTimer);
+  flushTimer = null;
+  navigator.sendBeacon(
+    "/api/changes",
+    new Blob([JSON.stringify({ changes })], { type: "application/json" }),
+  );
+});
+
 // Add item to ignored list
 function addToIgnoredList(itemType, itemId, itemTitle) {
   const section = document.getElementById("ignored-section");
@@ -122,33 +191,21 @@ async function handleIgnoreClick(e, action) {
   const itemTitle = btn.dataset.itemTitle;
   const itemRow = btn.closest("p");
 
-  let url = `/api/${action}/${itemType}/${itemId}`;
-  if (action === "ignore" && itemTitle) {
-    url += `?title=${encodeURIComponent(itemTitle)}`;
+  const change = { action, item_type: itemType, item_id: itemId };
+  if (action === "ignore") {
+    change.item_title = itemTitle;
   }
 
   try {
-    const response = await fetch(url, {
-      method: "GET",
-      headers: { "Content-Type": "application/json" },
-    });
-
-    if (response.ok) {
-      itemRow.remove();
-      if (action === "ignore") {
-        addToIgnoredList(itemType, itemId, itemTitle);
-      } else {
-        showMessage(
-          "Item unignored. Reload to see it in Done/Next. (We have to fetch all of its data again from the remote.)",
-          "info",
-        );
-      }
+    await queueChange(change);
+    itemRow.remove();
+    if (action === "ignore") {
+      addToIgnoredList(itemType, itemId, itemTitle);
     } else {
-      const data = await response.json();
-      showMessage(data.error);
+      showMessage("Item unignored. Reload to see it in Done/Next.", "info");
     }
   } catch (error) {
-    showMessage("Network error, please try again");
+    showMessage(error.message);
   }
 }
 
@@ -161,75 +218,89 @@ document.querySelectorAll(".unignore-btn").forEach((btn) => {
   btn.addEventListener("click", (e) => handleIgnoreClick(e, "unignore"));
 });
 
+// Notes are also saved while typing, once the input has been idle this long
+const NOTE_DEBOUNCE_MS = 800;
+
+// Queue the note, unless it is the one that was saved last
+function queueNoteChange(input) {
+  clearTimeout(input.saveTimer);
+  const note = input.value.trim();
+  if (note === input.dataset.savedNote) {
+    return Promise.resolve();
+  }
+  input.dataset.savedNote = note;
+  return queueChange({
+    action: "note",
+    item_type: input.dataset.itemType,
+    item_id: input.dataset.itemId,
+    category: input.dataset.category,
+    note,
+  }).catch((error) => {
+    // Saved again with the next edit
+    delete input.dataset.savedNote;
+    throw error;
+  });
+}
+
 // Handle note input changes
 async function saveNote(input) {
-  const itemType = input.dataset.itemType;
-  const itemId = input.dataset.itemId;
-  const category = input.dataset.category;
   const note = input.value.trim();
 
-  const url = `/api/note/${itemType}/${itemId}/${category}`;
-
-  // Show loading state
+  // Show loading state, the input stays editable
   input.classList.add("note-saving");
-  input.disabled = true;
   const startTime = Date.now();
   const minDuration = 500;
 
   try {
-    const response = await fetch(url, {
-      method: "POST",
-      headers: { "Content-Type": "application/json" },
-      body: JSON.stringify({ note }),
-    });
-
-    if (!response.ok) {
-      const data = await response.json();
-      showMessage(data.error);
+    await queueNoteChange(input);
+    const parent = input.closest(".activity-item");
+    let span = parent.querySelector(".note-display");
+
+    if (note) {
+      input.classList.remove("note-empty");
+      // Create or update span
+      if (!span) {
+        span = document.createElement("span");
+        span.className = "note-display";
+        input.insertAdjacentElement("beforebegin", span);
+      }
+      span.textContent = note;
+      // Show/hide based on editing mode
+      span.classList.toggle("hidden", showNoteInputs.checked);
+      input.classList.toggle("hidden", !showNoteInputs.checked);
     } else {
-      const parent = input.closest(".activity-item");
-      let span = parent.querySelector(".note-display");
-
-      if (note) {
-        input.classList.remove("note-empty");
-        // Create or update span
-        if (!span) {
-          span = document.createElement("span");
-          span.className = "note-display";
-          input.insertAdjacentElement("beforebegin", span);
-        }
-        span.textContent = note;
-        // Show/hide based on editing mode
-        span.classList.toggle("hidden", showNoteInputs.checked);
-        input.classList.toggle("hidden", !showNoteInputs.checked);
-      } else {
-        input.classList.add("note-empty");
-        // Remove span if exists
-        if (span) {
-          span.remove();
-        }
-        // Hide input if not editing
-        if (!showNoteInputs.checked) {
-          input.classList.add("hidden");
-        }
+      input.classList.add("note-empty");
+      // Remove span if exists
+      if (span) {
+        span.remove();
+      }
+      // Hide input if not editing
+      if (!showNoteInputs.checked) {
+        input.classList.add("hidden");
       }
-      // Update title for tooltip
-      input.title = note;
     }
+    // Update title for tooltip
+    input.title = note;
   } catch (error) {
-    showMessage("Network error saving note");
+    showMessage(error.message);
   } finally {
     // Remove loading state after minimum duration
     const elapsed = Date.now() - startTime;
     const remaining = Math.max(0, minDuration - elapsed);
     setTimeout(() => {
       input.classList.remove("note-saving");
-      input.disabled = false;
     }, remaining);
   }
 }
 
 document.querySelectorAll(".note-input").forEach((input) => {
+  input.dataset.savedNote = input.value.trim();
+  input.addEventListener("input", () => {
+    clearTimeout(input.saveTimer);
+    input.saveTimer = setTimeout(() => {
+      queueNoteChange(input).catch((error) => showMessage(error.message));
+    }, NOTE_DEBOUNCE_MS);
+  });
   input.addEventListener("blur", () => saveNote(input));
   input.addEventListener("keydown", (e) => {
     if (e.key === "Enter") {
@@ -253,7 +324,14 @@ if (clearAllNotesBtn) {
     clearAllNotesBtn.disabled = true;
     clearAllNotesBtn.textContent = "Deleting...";
 
+    document.querySelectorAll(".note-input").forEach((input) => {
+      clearTimeout(input.saveTimer);
+    });
+    dropQueuedNoteChanges();
+
     try {
+      // A batch that was already sent has to land before the notes are deleted
+      await inFlight;
       const response = await fetch("/api/notes/delete-all", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
@@ -264,6 +342,7 @@ if (clearAllNotesBtn) {
         // Clear all note inputs and displays
         document.querySelectorAll(".note-input").forEach((input) => {
           input.value = "";
+          input.dataset.savedNote = "";
           input.classList.add("note-empty");
         });
         document.querySelectorAll(".note-display").forEach((span) => {
@@ -0,0 +1,9 @@
+from standup_report.remote import gql_registry
+
+
+def test_queries_are_valid_against_the_schemas() -> None:
+    assert gql_registry.validate_against_schemas() == []
+
+
+def test_queries_are_within_their_cost_budgets() -> None:
+    assert gql_registry.check_costs() == []